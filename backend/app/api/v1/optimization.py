@@ -1,9 +1,48 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from threading import Event
+from typing import Iterator
 
-from app.optimization.per_plant_optimizer import PerPlantOptimizer, NoSolutionException, InfeasibleSolutionException
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.optimization.per_plant_optimizer import (
+    NoSolutionException,
+    InfeasibleSolutionException,
+    OptimizationCancelledException,
+    PreviousSolution
+)
+from app.optimization.cancellation import (
+    CancellationReason,
+    CancellationToken,
+    DISCONNECT_POLL_INTERVAL_SECONDS,
+    optimization_runs
+)
+from app.optimization.admission import RequestTooComplexException, check_admission, estimate_complexity
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.batch import batch_optimizer, BatchTooLargeException
+from app.optimization.candidate_cache import candidate_cache
+from app.optimization.metrics import search_metrics
+from app.optimization.pareto_front import ParetoFrontOptimizer
+from app.optimization.relaxation import NearestFeasibleOptimizer
+from app.optimization.top_k import TopKOptimizer, MAX_TOP_K
+from app.optimization.result_cache import result_cache
+from app.optimization.sessions import solution_sessions
+from app.optimization.jobs import job_manager, JobQueueFullException, OptimizationJob
+from app.optimization.streaming import stream_optimization, StreamQueueFullException
 from app.schemas.optimization import (
     PerPlantOptimizationRequest,
     PerPlantOptimizationResponse,
+    ReoptimizationRequest,
+    ComplexityEstimate,
+    ParetoFrontResponse,
+    TopKResponse,
+    RelaxationParameter,
+    RelaxedOptimizationResponse,
+    BatchOptimizationRequest,
+    BatchOptimizationResponse,
+    OptimizationJobRead,
+    OptimizationMetricsResponse,
     OptimizationErrorResponse
 )
 
@@ -19,18 +58,344 @@ print("Optimization router initialized")
     response_model=PerPlantOptimizationResponse,
     status_code=200,
 )
-def optimize_drippers(data: PerPlantOptimizationRequest):
-    optimizer = PerPlantOptimizer(data)
+async def optimize_drippers(
+    data: PerPlantOptimizationRequest,
+    request: Request,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the best solution found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response"),
+    zone_id: int | None = Query(None, description="Zone the result is applied to, linked to the stored result in place of an earlier link"),
+    session_id: str | None = Header(
+        None,
+        alias="X-Optimization-Session",
+        description="Re-optimizes incrementally from the session's last solution, a newer request of the same session cancels this one"
+    )
+):
+    # Checked before optimizing, without a result store there is no link and no check
+    if zone_id is not None and await run_in_threadpool(result_cache.has_zone, zone_id) is False:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    previous = solution_sessions.get(session_id) if session_id is not None else None
+
+    with optimization_runs.run(session_id) as token:
+        optimizer = _create_optimizer(
+            data,
+            engine,
+            time_budget_seconds=time_budget_seconds,
+            cancellation_token=token,
+            include_diagnostics=diagnostics,
+            previous_solution=previous,
+            result_cache=result_cache
+        )
+        response = await _optimize(request, token, optimizer.optimize)
+
+    if zone_id is not None and optimizer.result_key is not None and response.proven_optimal:
+        await run_in_threadpool(result_cache.link_zone, optimizer.result_key, zone_id)
+    if session_id is not None:
+        solution_sessions.put(session_id, PreviousSolution(response, optimizer.candidate_lists))
+    return response
+
+
+@router.post(
+    "/per-plant/reoptimize",
+    summary="Re-optimize an edited zone starting from its previous solution",
+    response_model=PerPlantOptimizationResponse,
+    status_code=200,
+)
+async def reoptimize_drippers(
+    data: ReoptimizationRequest,
+    request: Request,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the best solution found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response")
+):
+    with optimization_runs.run() as token:
+        optimizer = _create_optimizer(
+            data.request,
+            engine,
+            time_budget_seconds=time_budget_seconds,
+            cancellation_token=token,
+            include_diagnostics=diagnostics,
+            previous_solution=PreviousSolution(data.previous),
+            result_cache=result_cache
+        )
+        return await _optimize(request, token, optimizer.optimize)
+
+
+@router.post(
+    "/per-plant/front",
+    summary="Trade-offs between dripper count and irrigation time",
+    response_model=ParetoFrontResponse,
+    status_code=200,
+)
+async def optimize_drippers_front(
+    data: PerPlantOptimizationRequest,
+    request: Request,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the alternatives found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response")
+):
+    _admit(data)
+    with optimization_runs.run() as token:
+        optimizer = ParetoFrontOptimizer(
+            data,
+            time_budget_seconds=time_budget_seconds,
+            cancellation_token=token,
+            include_diagnostics=diagnostics
+        )
+        return await _optimize(request, token, optimizer.optimize_front)
+
+
+@router.post(
+    "/per-plant/top-k",
+    summary="Best few alternative dripper allocations",
+    response_model=TopKResponse,
+    status_code=200,
+)
+async def optimize_drippers_top_k(
+    data: PerPlantOptimizationRequest,
+    request: Request,
+    k: int = Query(3, ge=1, le=MAX_TOP_K, description="Number of alternatives"),
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the alternatives found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response")
+):
+    _admit(data)
+    with optimization_runs.run() as token:
+        optimizer = TopKOptimizer(
+            data,
+            k=k,
+            time_budget_seconds=time_budget_seconds,
+            cancellation_token=token,
+            include_diagnostics=diagnostics
+        )
+        return await _optimize(request, token, optimizer.optimize_top_k)
+
+
+@router.post(
+    "/per-plant/nearest-feasible",
+    summary="Optimize, relaxing the tolerance or emitter limit of the plants until a solution exists",
+    response_model=RelaxedOptimizationResponse,
+    status_code=200,
+)
+async def optimize_drippers_nearest_feasible(
+    data: PerPlantOptimizationRequest,
+    request: Request,
+    parameter: RelaxationParameter = Query(RelaxationParameter.TOLERANCE, description="Parameter relaxed when the request has no solution"),
+    time_budget_seconds: float | None = Query(None, gt=0, description="Time for the whole relaxation search"),
+    diagnostics: bool = Query(False, description="Include search counters and timings of the final optimization")
+):
+    _admit(data)
+    with optimization_runs.run() as token:
+        optimizer = NearestFeasibleOptimizer(
+            data,
+            parameter,
+            time_budget_seconds=time_budget_seconds,
+            cancellation_token=token,
+            include_diagnostics=diagnostics,
+            result_cache=result_cache
+        )
+        return await _optimize(request, token, optimizer.optimize)
+
+
+@router.post(
+    "/per-plant/estimate",
+    summary="Estimate the search size of a request without optimizing it",
+    response_model=ComplexityEstimate,
+    status_code=200,
+)
+def estimate_optimization(data: PerPlantOptimizationRequest):
+    # Dry run of the admission control, a request that would be rejected is still answered here
+    return estimate_complexity(data)
+
+
+def _too_complex(e: RequestTooComplexException) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail={"message": str(e), "plants": e.estimate.rejected_plants, "estimate": e.estimate.model_dump()}
+    )
+
+
+def _admit(data: PerPlantOptimizationRequest):
+    try:
+        check_admission(data)
+    except RequestTooComplexException as e:
+        raise _too_complex(e)
+
 
+def _create_optimizer(data: PerPlantOptimizationRequest, engine: OptimizationEngine, **kwargs):
     try:
-        response = optimizer.optimize()
+        return create_optimizer(data, engine, **kwargs)
+    except RequestTooComplexException as e:
+        raise _too_complex(e)
+
+
+async def _optimize(request: Request, token: CancellationToken, func):
+    try:
+        return await _run_until_disconnected(request, token, func)
     except NoSolutionException as e:
         raise HTTPException(status_code=400, detail=str(e))
     except InfeasibleSolutionException as e:
         raise HTTPException(status_code=400, detail=str(e))
     except TimeoutError as e:
         raise HTTPException(status_code=400, detail="Optimization timed out")
-    
-    return response
+    except OptimizationCancelledException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RequestTooComplexException as e:
+        raise _too_complex(e)
+
+
+async def _run_until_disconnected(request: Request, token: CancellationToken, func):
+    """
+    Run `func` in the thread pool, cancel its token when the client disconnects.
+    """
+    task = asyncio.ensure_future(run_in_threadpool(func))
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL_SECONDS)
+        if not task.done() and await request.is_disconnected():
+            optimization_runs.cancel(token, CancellationReason.DISCONNECTED)
+            break
+    return await task
+
+
+async def _stream_until_disconnected(request: Request, events: Iterator[str], disconnected: Event):
+    """
+    Send the chunks of `events`, advanced in the thread pool, and stop it when the client disconnects.
+
+    The connection is polled while the stream waits for its next event. A stream blocked in
+    the thread pool cannot be closed, it stops by itself once `disconnected` is set.
+    """
+    task = None
+    try:
+        while True:
+            task = asyncio.ensure_future(run_in_threadpool(next, events, None))
+            while not task.done():
+                await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL_SECONDS)
+                if not task.done() and await request.is_disconnected():
+                    return
+            chunk = await task
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        disconnected.set()
+        if task is None or task.done():
+            events.close()
 
-    
\ No newline at end of file
+
+@router.post(
+    "/per-plant/stream",
+    summary="Optimize dripper allocation and stream improving solutions",
+    response_class=StreamingResponse,
+    status_code=200,
+)
+async def stream_optimize_drippers(
+    data: PerPlantOptimizationRequest,
+    request: Request,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the best solution found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response"),
+    session_id: str | None = Header(
+        None,
+        alias="X-Optimization-Session",
+        description="Re-optimizes incrementally from the session's last solution, a newer request of the same session cancels this one"
+    )
+):
+    disconnected = Event()
+    try:
+        events = stream_optimization(
+            data,
+            engine,
+            time_budget_seconds,
+            session_id,
+            include_diagnostics=diagnostics,
+            disconnected=disconnected
+        )
+    except StreamQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RequestTooComplexException as e:
+        raise _too_complex(e)
+    return StreamingResponse(
+        _stream_until_disconnected(request, events, disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post(
+    "/per-plant/batch",
+    summary="Optimize dripper allocation for many zones",
+    response_model=BatchOptimizationResponse,
+    status_code=200,
+)
+def optimize_drippers_batch(
+    data: BatchOptimizationRequest,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the best solution found within this time, per zone")
+):
+    try:
+        return batch_optimizer.optimize(data.items, engine, time_budget_seconds)
+    except BatchTooLargeException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ----- Optimization Jobs -----
+
+def _job_read(job: OptimizationJob) -> OptimizationJobRead:
+    return OptimizationJobRead(
+        job_id=job.job_id,
+        status=job.status,
+        progress=job.progress,
+        result=job.result,
+        error=job.error
+    )
+
+
+@router.post(
+    "/jobs",
+    summary="Submit a per-plant optimization job",
+    response_model=OptimizationJobRead,
+    status_code=202,
+)
+def submit_optimization_job(
+    data: PerPlantOptimizationRequest,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = Query(None, gt=0, description="Return the best solution found within this time"),
+    diagnostics: bool = Query(False, description="Include search counters and timings in the response")
+):
+    try:
+        job = job_manager.submit(data, engine, time_budget_seconds=time_budget_seconds, include_diagnostics=diagnostics)
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RequestTooComplexException as e:
+        raise _too_complex(e)
+    return _job_read(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    summary="Get optimization job status and result",
+    response_model=OptimizationJobRead,
+    status_code=200,
+)
+def get_optimization_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Optimization job not found")
+    return _job_read(job)
+
+
+# ----- Monitoring -----
+
+@router.get(
+    "/metrics",
+    summary="Optimizer cache and runtime metrics",
+    response_model=OptimizationMetricsResponse,
+    status_code=200,
+)
+def get_optimization_metrics():
+    return OptimizationMetricsResponse(
+        candidate_cache=candidate_cache.stats(),
+        runs=optimization_runs.stats(),
+        search=search_metrics.stats(),
+        results=result_cache.stats(),
+        sessions=solution_sessions.stats()
+    )
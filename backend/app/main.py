@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routers import router as api_router
 from app.db.session import engine
+from app.optimization.result_cache import result_cache
+from app.optimization.result_store import ResultStore
 from sqlmodel import SQLModel
 
 app = FastAPI(title="Node Manager API")
@@ -19,4 +21,9 @@ app.add_middleware(
 
 SQLModel.metadata.create_all(bind=engine)
 
+# Optimization results are shared by all workers through the database, results of older optimizer versions are dropped
+result_store = ResultStore(engine)
+result_store.purge_stale()
+result_cache.store = result_store
+
 app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
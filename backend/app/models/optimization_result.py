@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field, Column, JSON, UniqueConstraint
+
+from datetime import datetime, timezone
+
+
+class OptimizationResult(SQLModel, table=True):
+    __tablename__ = "optimization_result"
+    __table_args__ = (UniqueConstraint("request_hash", "optimizer_version"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+
+    request_hash: str = Field(index=True) # see app.optimization.result_cache.request_fingerprint
+    optimizer_version: str = Field(index=True) # results of other versions are stale
+    zone_id: int | None = Field(default=None, foreign_key="zone.id", index=True) # zone the result was applied to
+
+    response: dict = Field(sa_column=Column(JSON)) # PerPlantOptimizationResponse
+    run_seconds: float # run time of the optimization that produced the result
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
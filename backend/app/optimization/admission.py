@@ -0,0 +1,154 @@
+import math
+import os
+from itertools import accumulate
+
+from app.optimization.candidate_cache import CandidateCache, candidate_cache as shared_candidate_cache
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.schemas.optimization import ComplexityEstimate, PerPlantOptimizationRequest, PlantComplexity
+
+
+# Requests with a plant above this many candidates are rejected, generating them alone is too slow.
+# Generating and reducing 50k candidates of a plant with many limited dripper types takes about
+# 2 seconds, so a zone with a few such plants still leaves most of MAX_RUNTIME_SECONDS to the search.
+OPTIMIZATION_MAX_PLANT_CANDIDATES = int(os.environ.get("OPTIMIZATION_MAX_PLANT_CANDIDATES", "50000"))
+
+# The `auto` engine runs the exact search up to this search space (log10 of the selections),
+# the MILP solver up to the next one and the sweep line heuristic above it. The unreduced
+# search space says little about how much of it branch and bound visits, so an engine picked
+# explicitly is never rejected on it.
+OPTIMIZATION_EXACT_MAX_LOG10 = float(os.environ.get("OPTIMIZATION_EXACT_MAX_LOG10", "24"))
+OPTIMIZATION_SOLVER_MAX_LOG10 = float(os.environ.get("OPTIMIZATION_SOLVER_MAX_LOG10", "40"))
+
+
+class RequestTooComplexException(Exception):
+    """
+    Raised when a request is rejected by the admission control, `estimate` tells which plants blow up the search.
+    """
+    def __init__(self, estimate: ComplexityEstimate):
+        super().__init__(estimate.reason)
+        self.estimate = estimate
+
+
+def estimate_complexity(
+    request: PerPlantOptimizationRequest,
+    candidate_cache: CandidateCache | None = shared_candidate_cache,
+    max_plant_candidates: int = OPTIMIZATION_MAX_PLANT_CANDIDATES,
+    exact_max_log10: float = OPTIMIZATION_EXACT_MAX_LOG10,
+    solver_max_log10: float = OPTIMIZATION_SOLVER_MAX_LOG10
+) -> ComplexityEstimate:
+    """
+    Estimate the size of the search for `request` without generating any candidate.
+
+    A plant's candidates are bounded by the number of dripper count vectors with 1 to
+    `max_emitter_quantity` emitters within the inventory, which is close to exact: any
+    flow reaches the volume window at some T, only the slowest combinations miss it
+    within MAX_TIME_HOURS. When the reduced list of the plant is already in the
+    candidate cache its exact length is used instead.
+
+    The search space counts the selections of one candidate per plant, interchangeable
+    plants (same parameters) as multisets since the search breaks their symmetry. Each
+    plant is given an equal share of its group's multisets.
+    """
+    drippers = sorted(request.available_drippers, key=PerPlantOptimizer._dripper_sort_key)
+    catalog_key = tuple((PerPlantOptimizer._dripper_flow_units(dripper), dripper.count) for dripper in drippers)
+    limits = [dripper.count for dripper in drippers]
+
+    # Plant key -> (candidates, exact, plants with that key)
+    groups = {}
+    plant_keys = []
+    for plant in request.plants:
+        plant_key = PerPlantOptimizer._plant_key(plant)
+        if plant_key not in groups:
+            cached = candidate_cache.peek((plant_key, catalog_key)) if candidate_cache is not None else None
+            if cached is not None:
+                groups[plant_key] = [len(cached), True, 0]
+            elif plant.tolerance_percent < 0:
+                groups[plant_key] = [0, True, 0]
+            else:
+                groups[plant_key] = [_combination_count(plant.max_emitter_quantity, limits, max_plant_candidates), False, 0]
+
+        groups[plant_key][2] += 1
+        plant_keys.append(plant_key)
+
+    # log10 of C(candidates + plant_count - 1, plant_count) per plant of the group,
+    # multisets of plant_count candidates
+    shares = {
+        plant_key: (
+            math.lgamma(candidates + plant_count) - math.lgamma(plant_count + 1) - math.lgamma(candidates)
+        ) / math.log(10) / plant_count
+        for plant_key, (candidates, _, plant_count) in groups.items() if candidates > 0
+    }
+
+    plants = [
+        PlantComplexity(
+            plant_id=plant.plant_id,
+            candidates=groups[plant_key][0],
+            exact=groups[plant_key][1],
+            search_space_log10=round(shares[plant_key], 2) if plant_key in shares else None
+        )
+        for plant, plant_key in zip(request.plants, plant_keys)
+    ]
+
+    search_space_log10 = None
+    if len(shares) == len(groups):
+        search_space_log10 = sum(share * groups[plant_key][2] for plant_key, share in shares.items())
+
+    if search_space_log10 is None or search_space_log10 <= exact_max_log10:
+        recommended_engine = "native"
+    elif search_space_log10 <= solver_max_log10:
+        recommended_engine = "milp"
+    else:
+        recommended_engine = "sweep_line"
+
+    rejected_plants = [plant.plant_id for plant in plants if plant.candidates > max_plant_candidates]
+    reason = None
+    if rejected_plants:
+        reason = (
+            f"{len(rejected_plants)} plant(s) have more than {max_plant_candidates} dripper combinations, "
+            f"lower their max_emitter_quantity or the dripper catalog: {', '.join(rejected_plants)}"
+        )
+
+    return ComplexityEstimate(
+        plants=plants,
+        search_space_log10=round(search_space_log10, 2) if search_space_log10 is not None else None,
+        recommended_engine=recommended_engine,
+        admitted=not rejected_plants,
+        rejected_plants=rejected_plants,
+        reason=reason
+    )
+
+
+def check_admission(request: PerPlantOptimizationRequest, **kwargs) -> ComplexityEstimate:
+    """
+    Estimate `request` (see `estimate_complexity`) and reject it if it is too complex.
+
+    :raises RequestTooComplexException: If a plant has more candidates than allowed.
+    """
+    estimate = estimate_complexity(request, **kwargs)
+    if not estimate.admitted:
+        raise RequestTooComplexException(estimate)
+    return estimate
+
+
+def _combination_count(max_emitters: int, limits: list[int | None], cap: int) -> int:
+    """
+    Number of dripper count vectors with 1 to `max_emitters` emitters, each type within
+    its limit (None = unlimited).
+
+    Past `cap` only a value above it is returned: every total from 1 to the largest
+    reachable one has at least one vector, so that total already exceeds `cap`.
+    """
+    caps = [max_emitters if limit is None else max(0, min(limit, max_emitters)) for limit in limits]
+    budget = min(max_emitters, sum(caps))
+    if budget <= 0:
+        return 0
+    if budget > cap:
+        return budget
+
+    # ways[s]: vectors over the types seen so far with s emitters in total
+    ways = [1] + [0] * budget
+    for type_cap in caps:
+        prefix = [0] + list(accumulate(ways))
+        ways = [prefix[s + 1] - prefix[max(0, s - type_cap)] for s in range(budget + 1)]
+
+    return sum(ways) - 1
@@ -0,0 +1,139 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock
+from time import monotonic
+
+from app.optimization.admission import RequestTooComplexException
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.per_plant_optimizer import NoSolutionException, InfeasibleSolutionException, MAX_RUNTIME_SECONDS
+from app.optimization.result_cache import result_cache
+from app.schemas.optimization import (
+    BatchOptimizationItem,
+    BatchOptimizationResponse,
+    BatchOptimizationResultItem
+)
+
+
+OPTIMIZATION_BATCH_WORKERS = int(os.environ.get("OPTIMIZATION_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+OPTIMIZATION_BATCH_MAX_ITEMS = int(os.environ.get("OPTIMIZATION_BATCH_MAX_ITEMS", "100"))
+
+# Per item on top of its runtime limit: starting a worker process, admission, pickling the result
+BATCH_ITEM_OVERHEAD_SECONDS = 10
+
+
+class BatchTooLargeException(Exception):
+    """
+    Raised when a batch has more items than OPTIMIZATION_BATCH_MAX_ITEMS.
+    """
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class BatchOptimizer:
+    """
+    Optimizes many zones at once on a process pool.
+
+    The pool is created on first use and kept for the lifetime of the process, so
+    every worker keeps its candidate cache warm across items and batches. The caches
+    and search metrics of a worker are its own, they are not shared with the server
+    process or the other workers. Items are
+    submitted largest first, which keeps the batch close to the time of its slowest
+    zone when there are more items than workers. A failing item only fails itself, an
+    item whose worker does not answer in time fails as timed out.
+
+    With a single worker (or a single item) the batch runs in the calling thread and
+    shares the process-wide candidate cache.
+    """
+
+    def __init__(self, workers: int = OPTIMIZATION_BATCH_WORKERS, max_items: int = OPTIMIZATION_BATCH_MAX_ITEMS):
+        self.workers = workers
+        self.max_items = max_items
+        self._executor = None
+        self._lock = Lock()
+
+
+    def optimize(
+        self,
+        items: list[BatchOptimizationItem],
+        engine: OptimizationEngine = OptimizationEngine.NATIVE,
+        time_budget_seconds: float | None = None
+    ) -> BatchOptimizationResponse:
+        """
+        :raises BatchTooLargeException: If the batch has more than `max_items` items.
+        """
+        if len(items) > self.max_items:
+            raise BatchTooLargeException(f"Batch has {len(items)} items, at most {self.max_items} are allowed")
+
+        # The batch is already spread over processes, nested process pools are not allowed in workers
+        if OptimizationEngine(engine) == OptimizationEngine.PARALLEL:
+            engine = OptimizationEngine.NATIVE
+
+        order = sorted(range(len(items)), key=lambda i: -len(items[i].plants))
+        outcomes = [None] * len(items)
+
+        if self.workers <= 1 or len(items) <= 1:
+            for i in order:
+                outcomes[i] = _optimize_item(items[i], engine, time_budget_seconds)
+        else:
+            executor = self._get_executor()
+            futures = {i: executor.submit(_optimize_item, items[i], engine, time_budget_seconds) for i in order}
+
+            # Every item stops at its runtime limit, the batch takes at most one limit per round of workers
+            runtime = MAX_RUNTIME_SECONDS if time_budget_seconds is None else min(time_budget_seconds, MAX_RUNTIME_SECONDS)
+            rounds = math.ceil(len(items) / self.workers)
+            deadline = monotonic() + rounds * (runtime + BATCH_ITEM_OVERHEAD_SECONDS)
+
+            for i, future in futures.items():
+                try:
+                    outcomes[i] = future.result(timeout=max(0.0, deadline - monotonic()))
+                except FutureTimeoutError:
+                    future.cancel()
+                    outcomes[i] = (None, "Optimization timed out")
+                except Exception as e:
+                    # The worker itself failed (e.g. it was killed), not the optimization
+                    outcomes[i] = (None, f"Optimization failed: {e}")
+
+        results = [
+            BatchOptimizationResultItem(index=i, zone_id=item.zone_id, result=result, error=error)
+            for i, (item, (result, error)) in enumerate(zip(items, outcomes))
+        ]
+        succeeded = sum(1 for item in results if item.error is None)
+
+        return BatchOptimizationResponse(items=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: a fork of this threaded server could inherit locks held by other threads
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+
+def _optimize_item(item: BatchOptimizationItem, engine: OptimizationEngine, time_budget_seconds: float | None):
+    """
+    Optimize one item, return (result, None) or (None, error detail).
+    """
+    try:
+        # Workers have their own result cache, repeated zones hit it when they land on the same worker
+        optimizer = create_optimizer(item, engine, time_budget_seconds=time_budget_seconds, result_cache=result_cache)
+        return optimizer.optimize(), None
+    except (NoSolutionException, InfeasibleSolutionException, RequestTooComplexException) as e:
+        return None, str(e)
+    except TimeoutError:
+        return None, "Optimization timed out"
+    except Exception as e:
+        return None, f"Optimization failed: {e}"
+
+
+# Process-wide batch optimizer used by the optimization endpoints
+batch_optimizer = BatchOptimizer()
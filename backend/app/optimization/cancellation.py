@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from enum import Enum
+from threading import Event, Lock
+
+
+# How often a waiting endpoint checks whether its client is still connected
+DISCONNECT_POLL_INTERVAL_SECONDS = 0.1
+
+
+class CancellationReason(str, Enum):
+    DISCONNECTED = "disconnected"   # the client went away
+    SUPERSEDED = "superseded"       # a newer request of the same session replaced the run
+
+
+class CancellationToken:
+    """
+    Thread-safe flag an optimizer polls during its search.
+
+    Checking `cancelled` is a single Event lookup, cheap enough for the search loops.
+    Callbacks let engines forward the cancellation, e.g. to worker processes.
+    """
+
+    def __init__(self):
+        self.reason = None
+        self._event = Event()
+        self._callbacks = []
+        self._lock = Lock()
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+    def cancel(self, reason: CancellationReason):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+
+        for callback in callbacks:
+            callback()
+
+
+    def add_callback(self, callback):
+        """
+        Call `callback` once the token is cancelled, immediately if it already is.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+
+class OptimizationRunRegistry:
+    """
+    Tracks running optimizations, one cancellation token per run.
+
+    A run started with a session id supersedes the active run of the same session,
+    which is cancelled. Cancellations of active runs are counted per reason.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._active = {}       # token -> session id
+        self._sessions = {}     # session id -> token of its latest run
+        self._cancelled = {reason: 0 for reason in CancellationReason}
+
+
+    def start(self, session_id: str | None = None) -> CancellationToken:
+        token = CancellationToken()
+
+        with self._lock:
+            previous = self._sessions.get(session_id) if session_id is not None else None
+            self._active[token] = session_id
+            if session_id is not None:
+                self._sessions[session_id] = token
+
+        if previous is not None:
+            self.cancel(previous, CancellationReason.SUPERSEDED)
+        return token
+
+
+    def finish(self, token: CancellationToken):
+        with self._lock:
+            session_id = self._active.pop(token, None)
+            if session_id is not None and self._sessions.get(session_id) is token:
+                del self._sessions[session_id]
+
+
+    @contextmanager
+    def run(self, session_id: str | None = None):
+        token = self.start(session_id)
+        try:
+            yield token
+        finally:
+            self.finish(token)
+
+
+    def cancel(self, token: CancellationToken, reason: CancellationReason) -> bool:
+        """
+        Cancel a run that is still active.
+
+        :return: False if the run already finished (nothing to cancel).
+        """
+        with self._lock:
+            if token not in self._active or token.cancelled:
+                return False
+            self._cancelled[reason] += 1
+
+        token.cancel(reason)
+        return True
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "cancelled_disconnected": self._cancelled[CancellationReason.DISCONNECTED],
+                "cancelled_superseded": self._cancelled[CancellationReason.SUPERSEDED]
+            }
+
+
+# Process-wide registry used by the optimization endpoints
+optimization_runs = OptimizationRunRegistry()
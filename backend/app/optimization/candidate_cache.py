@@ -0,0 +1,84 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+
+
+CANDIDATE_CACHE_SIZE = int(os.environ.get("OPTIMIZER_CANDIDATE_CACHE_SIZE", "256"))
+
+
+class CandidateCache:
+    """
+    Bounded LRU of per-plant candidate lists.
+
+    Keys are built by the optimizer from the plant parameters and the canonical
+    dripper catalog, values are the (immutable) reduced candidate lists. The
+    cache is shared by all optimizer runs in the process and is safe to use
+    from the FastAPI worker threads.
+    """
+
+    def __init__(self, max_size: int = CANDIDATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def get_or_create(self, key, factory):
+        """
+        Return the cached value for `key`, calling `factory()` to create it on a miss.
+
+        The factory runs outside of the lock, so two threads missing the same key
+        at once may both compute it; the value is the same either way.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = factory()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+
+    def peek(self, key):
+        """
+        Return the cached value for `key` or None, without counting a hit or miss
+        and without refreshing its LRU position.
+        """
+        with self._lock:
+            return self._entries.get(key)
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size
+            }
+
+
+# Process-wide cache used by default by every PerPlantOptimizer
+candidate_cache = CandidateCache()
@@ -0,0 +1,42 @@
+from enum import Enum
+
+from app.optimization.admission import check_admission
+from app.optimization.milp_optimizer import MilpOptimizer
+from app.optimization.parallel_optimizer import ParallelOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.optimization.sweep_line_optimizer import SweepLineOptimizer
+
+
+class OptimizationEngine(str, Enum):
+    NATIVE = "native"
+    SWEEP_LINE = "sweep_line"
+    MILP = "milp"
+    PARALLEL = "parallel"
+    AUTO = "auto"  # picked per request by the complexity estimate
+
+
+ENGINES = {
+    OptimizationEngine.NATIVE: PerPlantOptimizer,
+    OptimizationEngine.SWEEP_LINE: SweepLineOptimizer,
+    OptimizationEngine.MILP: MilpOptimizer,
+    OptimizationEngine.PARALLEL: ParallelOptimizer,
+}
+
+
+def create_optimizer(request, engine: OptimizationEngine = OptimizationEngine.NATIVE, **kwargs) -> PerPlantOptimizer:
+    """
+    Create an optimizer for `request` using the selected engine.
+
+    :param request: PerPlantOptimizationRequest to optimize.
+    :param engine: Engine to use, the native branch and bound search by default. `auto`
+        runs the engine recommended by the request's complexity estimate.
+    :param kwargs: Extra arguments passed to the optimizer constructor.
+    :return: Optimizer instance, call `optimize()` on it.
+    :raises RequestTooComplexException: If the admission control rejects the request.
+    """
+    estimate = check_admission(request)
+
+    engine = OptimizationEngine(engine)
+    if engine == OptimizationEngine.AUTO:
+        engine = OptimizationEngine(estimate.recommended_engine)
+    return ENGINES[engine](request, **kwargs)
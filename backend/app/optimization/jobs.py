@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
+from uuid import uuid4
+
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.per_plant_optimizer import NoSolutionException, InfeasibleSolutionException
+from app.optimization.result_cache import result_cache
+from app.schemas.optimization import OptimizationJobStatus, PerPlantOptimizationRequest
+
+
+OPTIMIZATION_JOB_WORKERS = int(os.environ.get("OPTIMIZATION_JOB_WORKERS", "2"))
+OPTIMIZATION_JOB_TTL_SECONDS = float(os.environ.get("OPTIMIZATION_JOB_TTL_SECONDS", "600"))
+OPTIMIZATION_JOB_MAX_PENDING = int(os.environ.get("OPTIMIZATION_JOB_MAX_PENDING", "32"))
+OPTIMIZATION_JOB_MAX_KEPT = int(os.environ.get("OPTIMIZATION_JOB_MAX_KEPT", "1000"))
+
+
+class JobQueueFullException(Exception):
+    """
+    Raised when too many optimization jobs are waiting to run.
+    """
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class OptimizationJob:
+    def __init__(self, job_id: str, optimizer):
+        self.job_id = job_id
+        self.optimizer = optimizer  # dropped once the job finished, with its candidate lists
+        self.status = OptimizationJobStatus.PENDING
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+    @property
+    def progress(self) -> float:
+        # A finished job has no optimizer any more, its progress stays at 1
+        if self.status in (OptimizationJobStatus.COMPLETED, OptimizationJobStatus.FAILED):
+            return 1.0
+        return getattr(self.optimizer, "progress", 0.0)
+
+
+class OptimizationJobManager:
+    """
+    Runs optimizations in the background on a bounded thread pool.
+
+    Jobs are kept in memory; finished jobs are dropped `ttl_seconds` after they
+    finished, or earlier (oldest first) when more than `max_kept` jobs are kept.
+    Jobs are purged whenever jobs are submitted or read.
+    """
+
+    def __init__(
+        self,
+        workers: int = OPTIMIZATION_JOB_WORKERS,
+        ttl_seconds: float = OPTIMIZATION_JOB_TTL_SECONDS,
+        max_pending: int = OPTIMIZATION_JOB_MAX_PENDING,
+        max_kept: int = OPTIMIZATION_JOB_MAX_KEPT
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self.max_kept = max_kept
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="optimization-job")
+        self._jobs = {}
+        self._lock = Lock()
+
+
+    def submit(
+        self,
+        request: PerPlantOptimizationRequest,
+        engine: OptimizationEngine = OptimizationEngine.NATIVE,
+        time_budget_seconds: float | None = None,
+        include_diagnostics: bool = False
+    ) -> OptimizationJob:
+        """
+        Queue an optimization and return its job immediately.
+
+        With `time_budget_seconds` the job completes with the best solution found in
+        that time instead of failing on timeout.
+
+        :raises JobQueueFullException: If `max_pending` jobs are already waiting.
+        :raises RequestTooComplexException: If the admission control rejects the request.
+        """
+        # The admission control runs outside of the lock, it does not touch the jobs
+        optimizer = create_optimizer(
+            request,
+            engine,
+            time_budget_seconds=time_budget_seconds,
+            include_diagnostics=include_diagnostics,
+            result_cache=result_cache
+        )
+
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status == OptimizationJobStatus.PENDING)
+            if pending >= self.max_pending:
+                raise JobQueueFullException(f"Too many pending optimization jobs ({pending})")
+
+            job = OptimizationJob(uuid4().hex, optimizer)
+            self._jobs[job.job_id] = job
+            self._purge_expired()
+
+        self._executor.submit(self._run, job)
+        return job
+
+
+    def get(self, job_id: str) -> OptimizationJob | None:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def _run(self, job: OptimizationJob):
+        job.status = OptimizationJobStatus.RUNNING
+        status = OptimizationJobStatus.FAILED
+        try:
+            job.result = job.optimizer.optimize()
+            status = OptimizationJobStatus.COMPLETED
+        except (NoSolutionException, InfeasibleSolutionException) as e:
+            job.error = str(e)
+        except TimeoutError:
+            job.error = "Optimization timed out"
+        except Exception as e:
+            job.error = f"Optimization failed: {e}"
+        finally:
+            job.finished_at = time()
+            job.optimizer = None
+            # Set last, a job seen as finished is already released
+            job.status = status
+
+
+    def _purge_expired(self):
+        now = time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at >= self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        # Over the limit, drop the oldest finished jobs; pending and running ones are bounded by max_pending
+        excess = len(self._jobs) - self.max_kept
+        if excess > 0:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+            for job_id in finished[:excess]:
+                del self._jobs[job_id]
+
+
+# Process-wide manager used by the optimization endpoints
+job_manager = OptimizationJobManager()
@@ -0,0 +1,104 @@
+import os
+from threading import Lock
+
+
+# Number of slowest runs kept to track down pathological inputs
+SLOWEST_RUNS_KEPT = int(os.environ.get("OPTIMIZER_SLOWEST_RUNS_KEPT", "5"))
+
+COUNTERS = (
+    "nodes_visited",
+    "leaves_evaluated",
+    "infeasible_t_rejections",
+    "inventory_rejections",
+    "bound_prunes",
+)
+
+TIMERS = (
+    "generation_seconds",
+    "search_seconds",
+    "build_seconds",
+)
+
+
+class SearchMetrics:
+    """
+    Process-wide aggregates of finished optimizer runs, safe to update from the
+    FastAPI worker threads.
+    """
+
+    def __init__(self, slowest_runs_kept: int = SLOWEST_RUNS_KEPT):
+        self.slowest_runs_kept = slowest_runs_kept
+        self._lock = Lock()
+        self.reset()
+
+
+    def record_run(
+        self,
+        diagnostics,
+        timed_out: bool,
+        first_solution_seconds: float | None = None,
+        warm_start_emitters: int | None = None,
+        final_emitters: int | None = None
+    ):
+        """
+        Add one run. `diagnostics` is the run's OptimizationDiagnostics; the solution
+        arguments are only given for runs that returned a result.
+        """
+        total_seconds = sum(getattr(diagnostics, timer) for timer in TIMERS)
+
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.runs += 1
+                self._first_solution_seconds_total += first_solution_seconds
+                if warm_start_emitters is not None:
+                    self.warm_start_found += 1
+                    if warm_start_emitters == final_emitters:
+                        self.warm_start_optimal += 1
+                    self._warm_start_gap_total += (warm_start_emitters - final_emitters) / warm_start_emitters
+
+            for name in COUNTERS + TIMERS:
+                self._totals[name] += getattr(diagnostics, name)
+
+            if len(self._slowest) < self.slowest_runs_kept or total_seconds > self._slowest[-1]["total_seconds"]:
+                self._slowest.append({
+                    "total_seconds": round(total_seconds, 6),
+                    "timed_out": timed_out,
+                    "plant_count": len(diagnostics.candidates_per_plant),
+                    "candidates_per_plant": list(diagnostics.candidates_per_plant),
+                    "nodes_visited": diagnostics.nodes_visited
+                })
+                self._slowest.sort(key=lambda run: -run["total_seconds"])
+                del self._slowest[self.slowest_runs_kept:]
+
+
+    def reset(self):
+        with self._lock:
+            self.runs = 0
+            self.timeouts = 0
+            self.warm_start_found = 0       # runs where the warm start produced a solution
+            self.warm_start_optimal = 0     # ... and no better solution was found afterwards
+            self._warm_start_gap_total = 0.0
+            self._first_solution_seconds_total = 0.0
+            self._totals = {name: 0 for name in COUNTERS + TIMERS}
+            self._slowest = []
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "timeouts": self.timeouts,
+                "warm_start_found": self.warm_start_found,
+                "warm_start_optimal": self.warm_start_optimal,
+                # Relative emitter excess of the warm start over the returned solution
+                "mean_warm_start_gap": self._warm_start_gap_total / self.warm_start_found if self.warm_start_found else 0.0,
+                "mean_first_solution_seconds": self._first_solution_seconds_total / self.runs if self.runs else 0.0,
+                **self._totals,
+                "slowest_runs": [dict(run) for run in self._slowest]
+            }
+
+
+# Process-wide metrics updated by every optimizer run
+search_metrics = SearchMetrics()
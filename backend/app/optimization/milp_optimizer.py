@@ -0,0 +1,169 @@
+import math
+from time import time
+
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, SearchInterrupted, MAX_TIME_HOURS
+
+# Weight of T in the objective. Emitter counts are integers and T <= MAX_TIME_HOURS,
+# so the T term stays below 1 and only breaks ties between equal emitter counts.
+T_WEIGHT = 1 / (2 * MAX_TIME_HOURS)
+
+
+class MilpOptimizer(PerPlantOptimizer):
+    """
+    Per-plant optimizer that solves the global selection as a mixed integer program
+    with the HiGHS solver bundled in SciPy.
+
+    One binary variable per (plant, candidate) picks exactly one candidate per plant,
+    which linearizes the per-plant flow * T window into
+    `sum(t_min * x) <= T <= sum(t_max * x)`. Limited dripper types add one inventory
+    row each. Candidate generation, reduction and `_build_response` are shared with
+    the native engine.
+
+    When SciPy is not installed, or the solver does not return a verified solution,
+    the native branch and bound search runs instead (`used_fallback` is set).
+    """
+
+    used_fallback = False
+
+    def _search(self):
+        # Nothing to solve without plants, the native search records the empty selection
+        if not self._plant_candidates:
+            super()._search()
+            return
+
+        if not self._solve_milp():
+            self.used_fallback = True
+            super()._search()
+
+
+    def _solve_milp(self) -> bool:
+        """
+        Build and solve the integer program, record its solution.
+
+        :return: True if the solver finished (with a verified solution or proven infeasibility).
+        """
+        try:
+            import numpy as np
+            from scipy.optimize import Bounds, LinearConstraint, milp
+            from scipy.sparse import coo_array
+        except ImportError:
+            return False
+
+        # Variable layout: candidates of plant 0, plant 1, ..., then T as the last variable
+        offsets = []
+        variable_count = 0
+        for candidates in self._plant_candidates:
+            offsets.append(variable_count)
+            variable_count += len(candidates)
+        t_column = variable_count
+        variable_count += 1
+
+        cost = np.zeros(variable_count)
+        cost[t_column] = T_WEIGHT
+
+        rows, columns, values = [], [], []
+        lower, upper = [], []
+
+        def add_row(entries, row_lower, row_upper):
+            row = len(lower)
+            for column, value in entries:
+                rows.append(row)
+                columns.append(column)
+                values.append(value)
+            lower.append(row_lower)
+            upper.append(row_upper)
+
+        limited_rows = {}
+
+        for plant_index, candidates in enumerate(self._plant_candidates):
+            offset = offsets[plant_index]
+
+            # Exactly one candidate per plant
+            add_row([(offset + i, 1.0) for i in range(len(candidates))], 1, 1)
+
+            # T >= t_min and T <= t_max of the chosen candidate
+            add_row([(t_column, 1.0)] + [(offset + i, -c.t_min) for i, c in enumerate(candidates)], 0, np.inf)
+            add_row([(t_column, 1.0)] + [(offset + i, -min(c.t_max, MAX_TIME_HOURS)) for i, c in enumerate(candidates)], -np.inf, 0)
+
+            for i, candidate in enumerate(candidates):
+                cost[offset + i] = candidate.emitters
+                for dripper_index, count in candidate.limited:
+                    limited_rows.setdefault(dripper_index, []).append((offset + i, float(count)))
+
+        # Shared inventory of limited dripper types
+        for dripper_index, entries in limited_rows.items():
+            add_row(entries, -np.inf, self._limits[dripper_index])
+
+        matrix = coo_array((values, (rows, columns)), shape=(len(lower), variable_count))
+
+        integrality = np.ones(variable_count)
+        integrality[t_column] = 0
+
+        bounds_lower = np.zeros(variable_count)
+        bounds_upper = np.ones(variable_count)
+        bounds_upper[t_column] = MAX_TIME_HOURS
+
+        time_left = self._deadline - time()
+        if time_left <= 0:
+            return False
+
+        # HiGHS cannot be interrupted, a cancellation is only seen before and after solving
+        self._check_cancelled()
+
+        result = milp(
+            cost,
+            constraints=LinearConstraint(matrix, lower, upper),
+            integrality=integrality,
+            bounds=Bounds(bounds_lower, bounds_upper),
+            options={"time_limit": time_left, "mip_rel_gap": 0}
+        )
+
+        self._check_cancelled()
+        self._nodes += getattr(result, "mip_node_count", None) or 0
+
+        # Proven infeasible, there is no global solution
+        if result.status == 2:
+            return True
+
+        if result.x is None:
+            return False
+
+        picks = []
+        for plant_index, candidates in enumerate(self._plant_candidates):
+            offset = offsets[plant_index]
+            chosen = max(range(len(candidates)), key=lambda i: result.x[offset + i])
+            picks.append(candidates[chosen])
+
+        if not self._is_feasible(picks):
+            return False
+
+        self._selection = picks
+        self._record_solution(
+            sum(c.emitters for c in picks),
+            max(c.t_min for c in picks)
+        )
+
+        # Time limit reached with a solution: report it as best-so-far. The T term of
+        # the objective is at most 0.5, which bounds the emitters from the dual bound.
+        if result.status == 1:
+            dual_bound = getattr(result, "mip_dual_bound", None)
+            if dual_bound is not None and math.isfinite(dual_bound):
+                self._open_bound = math.ceil(dual_bound - 0.5 - 1e-6)
+            raise SearchInterrupted()
+
+        return True
+
+
+    def _is_feasible(self, picks) -> bool:
+        # Re-check the solver's choice exactly, its tolerances allow tiny violations
+        t_min = max(c.t_min for c in picks)
+        t_max = min(min(c.t_max for c in picks), MAX_TIME_HOURS)
+        if t_min > t_max:
+            return False
+
+        usage = [0] * len(self._limits)
+        for pick in picks:
+            for i, count in pick.limited:
+                usage[i] += count
+
+        return all(limit is None or used <= limit for used, limit in zip(usage, self._limits))
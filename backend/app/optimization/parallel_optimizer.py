@@ -0,0 +1,363 @@
+import math
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from time import time
+
+from app.optimization.per_plant_optimizer import (
+    PerPlantOptimizer,
+    OptimizationCancelledException,
+    SearchInterrupted,
+    SearchStrategy,
+    MAX_TIME_HOURS
+)
+
+
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", "0")) or os.cpu_count() or 1
+
+# Split by the first two plants when the first one has fewer candidates than this per worker
+MIN_TASKS_PER_WORKER = 4
+
+# Search nodes between two reads of the shared incumbent
+SYNC_INTERVAL = 256
+
+# Header of the shared memory block of a search, doubles: incumbent emitters, T and partition, cancellation flag
+_EMITTERS, _T, _PARTITION, _CANCELLED = range(4)
+_HEADER_SIZE = 4 * 8
+
+
+class ParallelOptimizer(PerPlantOptimizer):
+    """
+    Per-plant optimizer that runs the branch and bound search on a process pool.
+
+    The search tree is split by the candidates of the first (or first two) plants in
+    search order, and every subtree is searched by a worker. Workers publish their
+    incumbent (emitters, T, partition) to shared memory and periodically tighten their
+    own bound with it, so pruning stays effective across workers.
+
+    Partitions are numbered in the sequential search order. A worker only cuts ties
+    with an incumbent of an earlier partition, and results are merged by
+    (emitters, T, partition), so the solution is the same as the sequential search.
+
+    All searches share one pool of OPTIMIZER_WORKERS spawned processes, created on
+    first use; `workers` only sets how finely the tree is split.
+    """
+
+    def __init__(self, request, workers: int | None = None, **kwargs):
+        super().__init__(request, **kwargs)
+        self.workers = workers or OPTIMIZER_WORKERS
+
+
+    def _search(self):
+        # Nothing to partition without plants, the sequential search records the empty selection
+        if not self._plant_candidates:
+            super()._search()
+            return
+
+        tasks = self._partition_tasks()
+
+        if self.strategy == SearchStrategy.BRUTE_FORCE or self.workers <= 1 or len(tasks) <= 1:
+            super()._search()
+            return
+
+        shared = _SharedSearch.create((self._plant_candidates, self._same_group, self._limits, self._deadline))
+        # A warm start incumbent counts as coming after every partition, so ties with it are still searched
+        seeded = self._best_selection is not None
+        shared.header[_EMITTERS] = self._best_emitters
+        shared.header[_T] = self._best_T if seeded else math.inf
+        shared.header[_PARTITION] = len(tasks) if seeded else -1
+
+        # Workers cannot see the token, forward the cancellation through shared memory
+        if self.cancellation_token is not None:
+            self.cancellation_token.add_callback(shared.cancel)
+
+        pool = _get_pool()
+        open_bounds = []
+        try:
+            # Results arrive in partition order, so recording only strict improvements
+            # merges them by (emitters, T, partition)
+            results = pool.map(_search_partition, repeat(shared.name), range(len(tasks)), tasks)
+            for done, (found, open_bound, counters) in enumerate(results, start=1):
+                self._add_counters(counters)
+                if found:
+                    emitters, chosen_T, self._selection = found
+                    self._record_solution(emitters, chosen_T)
+                # Partitions cut short by the deadline report the lower bound of their unexplored part
+                if open_bound is not None:
+                    open_bounds.append(open_bound)
+                self.progress = done / len(tasks)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+        finally:
+            # Stops the partitions still running after a failure, a later cancellation is a no-op
+            shared.cancel()
+            shared.release()
+
+        self._check_cancelled()
+
+        if open_bounds:
+            self._open_bound = min(open_bounds)
+            raise SearchInterrupted()
+
+
+    def _add_counters(self, counters):
+        nodes, leaves, t_rejections, inventory_rejections, bound_prunes = counters
+        self._nodes += nodes
+        self._leaves += leaves
+        self._t_rejections += t_rejections
+        self._inventory_rejections += inventory_rejections
+        self._bound_prunes += bound_prunes
+
+
+    def _partition_tasks(self) -> list[tuple[int, ...]]:
+        """
+        Candidate index prefixes that split the search tree, in sequential search order.
+        """
+        first = range(len(self._plant_candidates[0]))
+        if len(self._plant_candidates) < 2 or len(first) >= self.workers * MIN_TASKS_PER_WORKER:
+            return [(i,) for i in first]
+
+        second_count = len(self._plant_candidates[1])
+        return [
+            (i, j)
+            for i in first
+            for j in range(i if self._same_group[1] else 0, second_count)
+        ]
+
+
+class _PartitionSearch(PerPlantOptimizer):
+    """
+    Branch and bound over one subtree, run inside a worker process.
+
+    Built from the parent's prepared candidate lists instead of a request.
+    """
+
+    def __init__(self, shared: "_SharedSearch", lock):
+        self._plant_candidates, self._same_group, self._limits, self._deadline = shared.state()
+        self._shared = shared
+        self._lock = lock
+
+        self._prepare_branch_and_bound()
+
+
+    def search(self, partition, prefix):
+        """
+        Search the subtree below `prefix`.
+
+        :return: (found, open_bound, counters) where found is (emitters, T, selection) or
+            None, open_bound is the emitters lower bound of the part left unexplored at
+            the deadline (None when the subtree was searched completely) and counters
+            are the search counters added up by the parent.
+        """
+        self._partition = partition
+        self._nodes = 0
+        self._leaves = 0
+        self._t_rejections = 0
+        self._inventory_rejections = 0
+        self._bound_prunes = 0
+        self._found = None
+        self._open_bound = None
+        self._selection = []
+        # Fresh inventory usage, an interrupted search does not unwind its own
+        self._usage = [0] * len(self._limits)
+        self._best_selection = None
+        self._best_emitters = math.inf
+        self._best_T = None
+        self._sync_incumbent()
+
+        # Apply the prefix, the partition may already be infeasible
+        t_min_global = 0
+        t_max_global = MAX_TIME_HOURS
+        emitters = 0
+        for index, candidate_index in enumerate(prefix):
+            candidate = self._plant_candidates[index][candidate_index]
+            t_min_global = max(t_min_global, candidate.t_min)
+            t_max_global = min(t_max_global, candidate.t_max)
+            emitters += candidate.emitters
+            for i, count in candidate.limited:
+                self._usage[i] += count
+            self._selection.append(candidate)
+
+        feasible = t_min_global <= t_max_global and all(
+            limit is None or used <= limit for used, limit in zip(self._usage, self._limits)
+        )
+
+        self._check_cancelled()
+
+        depth = len(prefix)
+        if feasible and time() > self._deadline:
+            self._open_bound = emitters + self._min_emitters_suffix[depth]
+        elif feasible:
+            next_in_group = depth < len(self._same_group) and self._same_group[depth]
+            try:
+                self._bnb_recursive(depth, t_min_global, t_max_global, emitters, prefix[-1] if next_in_group else 0)
+            except SearchInterrupted as interrupt:
+                # Interrupted before the first branch, nothing of the partition was searched
+                if interrupt.fresh:
+                    self._open_bound = emitters + self._min_emitters_suffix[depth]
+
+        counters = (self._nodes, self._leaves, self._t_rejections, self._inventory_rejections, self._bound_prunes)
+        return self._found, self._open_bound, counters
+
+
+    def _check_runtime(self):
+        self._nodes += 1
+        if self._nodes % SYNC_INTERVAL == 0:
+            self._check_cancelled()
+            if time() > self._deadline:
+                raise SearchInterrupted()
+            self._sync_incumbent()
+
+
+    def _check_cancelled(self):
+        if self._shared.header[_CANCELLED]:
+            raise OptimizationCancelledException("Optimization was cancelled")
+
+
+    def _sync_incumbent(self):
+        header = self._shared.header
+        with self._lock:
+            emitters = header[_EMITTERS]
+            chosen_T = header[_T]
+            partition = header[_PARTITION]
+
+        if partition < 0:
+            return
+
+        # Ties with a later partition must still be found here, so its T is made exclusive
+        if partition > self._partition:
+            chosen_T = math.nextafter(chosen_T, math.inf)
+
+        local_T = self._best_T if self._best_T is not None else math.inf
+        if (emitters, chosen_T) < (self._best_emitters, local_T):
+            self._best_emitters = emitters
+            self._best_T = chosen_T
+
+
+    def _record_solution(self, total_emitters, chosen_T):
+        if total_emitters < self._best_emitters or (
+            total_emitters == self._best_emitters and chosen_T < self._best_T
+        ):
+            self._best_emitters = total_emitters
+            self._best_T = chosen_T
+            self._found = (total_emitters, chosen_T, tuple(self._selection))
+
+            header = self._shared.header
+            with self._lock:
+                shared = (header[_EMITTERS], header[_T], header[_PARTITION])
+                if shared[2] < 0 or (total_emitters, chosen_T, self._partition) < shared:
+                    header[_EMITTERS] = total_emitters
+                    header[_T] = chosen_T
+                    header[_PARTITION] = self._partition
+
+
+class _SharedSearch:
+    """
+    Shared memory block of one parallel search, attached by name in the workers.
+
+    Holds the shared incumbent, the cancellation flag and the pickled candidate lists,
+    so a task of the shared pool only carries the block's name. Writes after `release`
+    are ignored, a cancellation may arrive after the search ended.
+    """
+
+    def __init__(self, memory: SharedMemory, owner: bool):
+        self.name = memory.name
+        self.header = memory.buf[:_HEADER_SIZE].cast("d")
+        self._memory = memory
+        self._owner = owner
+        self._lock = Lock()
+
+
+    @classmethod
+    def create(cls, state) -> "_SharedSearch":
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        memory = SharedMemory(create=True, size=_HEADER_SIZE + len(data))
+        memory.buf[_HEADER_SIZE:_HEADER_SIZE + len(data)] = data
+        shared = cls(memory, owner=True)
+        shared.header[_CANCELLED] = 0
+        return shared
+
+
+    @classmethod
+    def attach(cls, name: str) -> "_SharedSearch":
+        return cls(SharedMemory(name=name), owner=False)
+
+
+    def state(self):
+        # The block may be larger than requested, unpickling stops at the end of the data
+        return pickle.loads(self._memory.buf[_HEADER_SIZE:])
+
+
+    def cancel(self):
+        with self._lock:
+            if self._memory is not None:
+                self.header[_CANCELLED] = 1
+
+
+    def release(self):
+        with self._lock:
+            if self._memory is None:
+                return
+            self.header.release()
+            self._memory.close()
+            if self._owner:
+                self._memory.unlink()
+            self._memory = None
+
+
+# One pool for all searches, spawned: a fork of the threaded server could inherit locks held by other threads
+_pool = None
+_pool_lock = Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(
+                max_workers=OPTIMIZER_WORKERS,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(context.Lock(),)
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    # A worker died, the next search starts a new pool
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Per-process state: the lock guarding the shared incumbents, the search of the last task
+_worker_lock = None
+_worker_search = None
+
+
+def _init_worker(lock):
+    global _worker_lock
+    _worker_lock = lock
+
+
+def _search_partition(name, partition, prefix):
+    global _worker_search
+    if _worker_search is None or _worker_search._shared.name != name:
+        try:
+            shared = _SharedSearch.attach(name)
+        except FileNotFoundError:
+            # The search already ended, e.g. it was cancelled while this task was queued
+            return None, None, (0, 0, 0, 0, 0)
+        if _worker_search is not None:
+            _worker_search._shared.release()
+        _worker_search = _PartitionSearch(shared, _worker_lock)
+    return _worker_search.search(partition, prefix)
@@ -0,0 +1,234 @@
+import math
+from bisect import bisect_left, bisect_right
+from time import time
+
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, MAX_TIME_HOURS
+from app.schemas.optimization import ParetoFrontResponse
+
+
+class ParetoFrontOptimizer(PerPlantOptimizer):
+    """
+    Per-plant optimizer that finds every non-dominated trade-off between the total
+    emitters and the base irrigation time T in one branch and bound pass.
+
+    Instead of a single incumbent the search keeps an archive of the solutions found
+    so far that no other solution beats in both emitters and T. A branch is cut when
+    none of its completions can leave the region the archive dominates: for every T
+    the completion could reach, the remaining plants need at least the sum of their
+    fewest emitters among candidates starting before T (see `_prepare_front_bounds`).
+
+    Candidate reduction stays valid: a dominating candidate never needs more emitters
+    or a longer T. `optimize()` returns the fewest-emitter point of the front, the
+    same solution as the native engine; `optimize_front()` returns the whole front.
+    """
+
+    def optimize_front(self) -> ParetoFrontResponse:
+        """
+        Alternatives ordered by emitters (ascending), each one with a strictly shorter
+        T than the previous one.
+
+        With a time budget the front found in time is returned and `complete` is False.
+        """
+        # The result cache only knows the fewest-emitter point, always search
+        self._optimize()
+
+        alternatives = [self._build_response((selection, T)) for _, T, selection in self._front]
+        return ParetoFrontResponse(
+            alternatives=alternatives,
+            complete=not self._interrupted,
+            diagnostics=self.diagnostics if self.include_diagnostics else None
+        )
+
+
+    def _warm_start(self):
+        # A single seeded incumbent does not help to bound the whole front
+        pass
+
+
+    def _seed_incumbent(self, picks):
+        pass
+
+
+    def _search(self):
+        # Archive as parallel lists, emitters ascending and T descending
+        self._front_emitters = []
+        self._front_T = []
+        self._front_selections = []
+
+        self._prepare_branch_and_bound()
+        self._prepare_front_bounds()
+        try:
+            self._front_recursive(index=0, t_min_global=0, t_max_global=MAX_TIME_HOURS, current_emitters=0, start=0)
+        finally:
+            self._front = list(zip(self._front_emitters, self._front_T, self._front_selections))
+
+
+    def _prepare_front_bounds(self):
+        """
+        `_front_bound_T[index]` (ascending) and `_front_bound_emitters[index]`: the fewest
+        emitters plants[index:] need when T is at least the given value, i.e. the sum of
+        each plant's fewest emitters among its candidates with t_min <= T.
+        """
+        plant_count = len(self._plant_candidates)
+
+        self._front_bound_T = [[] for _ in range(plant_count + 1)]
+        self._front_bound_emitters = [[] for _ in range(plant_count + 1)]
+
+        for index in range(plant_count):
+            events = sorted(
+                (c.t_min, position, c.emitters)
+                for position in range(index, plant_count)
+                for c in self._plant_candidates[position]
+            )
+            fewest = {}
+            total = 0
+            for t_min, position, emitters in events:
+                if position not in fewest:
+                    fewest[position] = emitters
+                    total += emitters
+                elif emitters < fewest[position]:
+                    total -= fewest[position] - emitters
+                    fewest[position] = emitters
+                else:
+                    continue
+
+                bound_T = self._front_bound_T[index]
+                bound_emitters = self._front_bound_emitters[index]
+                needed = total if len(fewest) == plant_count - index else float("inf")
+                if bound_T and bound_T[-1] == t_min:
+                    bound_emitters[-1] = needed
+                else:
+                    bound_T.append(t_min)
+                    bound_emitters.append(needed)
+
+
+    def _can_improve(self, index, emitters, t_min, t_max) -> bool:
+        """
+        Whether a branch with `emitters` so far and T in [`t_min`, `t_max`], completed by
+        plants[index:], can reach a point the archive does not dominate.
+
+        A point is dominated iff some archived point has no more emitters and no longer T.
+        Between two consecutive archived T values a fixed emitter count must be beaten,
+        and the completion is cheapest at the longest T of that range.
+        """
+        front_emitters = self._front_emitters
+        front_T = self._front_T
+        bound_T = self._front_bound_T[index]
+        bound_emitters = self._front_bound_emitters[index]
+        last = index == len(self._plant_candidates)
+
+        # Range k is T in [front_T[k], front_T[k - 1]), points in it escape with fewer than front_emitters[k]
+        upper_T = math.inf
+        for k in range(len(front_emitters) + 1):
+            if upper_T <= t_min:
+                return False
+            lower_T = front_T[k] if k < len(front_emitters) else -math.inf
+
+            if max(lower_T, t_min) <= t_max:
+                # Fewest emitters of the remaining plants at the longest T of the range
+                if t_max < upper_T:
+                    position = bisect_right(bound_T, t_max) - 1
+                else:
+                    position = bisect_left(bound_T, upper_T) - 1
+
+                if last or position >= 0:
+                    needed = 0 if last else bound_emitters[position]
+                    limit = front_emitters[k] if k < len(front_emitters) else math.inf
+                    if emitters + needed < limit:
+                        return True
+
+            upper_T = lower_T
+
+        return False
+
+
+    def _dominated(self, emitters, T) -> bool:
+        # The archived point with the most emitters not above `emitters` has the shortest T among them
+        position = bisect_right(self._front_emitters, emitters) - 1
+        return position >= 0 and self._front_T[position] <= T
+
+
+    def _front_recursive(self, index, t_min_global, t_max_global, current_emitters, start):
+        self._check_runtime()
+
+        if index >= len(self._plant_candidates):
+            self._leaves += 1
+            self._record_solution(current_emitters, t_min_global)
+            return
+
+        selection = self._selection
+        usage = self._usage
+        limits = self._limits
+        candidates = self._plant_candidates[index]
+        next_in_group = index + 1 < len(self._same_group) and self._same_group[index + 1]
+
+        t_rejections = bound_prunes = inventory_rejections = 0
+        try:
+            for candidate_index in range(start, len(candidates)):
+                candidate = candidates[candidate_index]
+
+                new_t_min = t_min_global if t_min_global >= candidate.t_min else candidate.t_min
+                new_t_max = t_max_global if t_max_global <= candidate.t_max else candidate.t_max
+                if new_t_min > new_t_max:
+                    t_rejections += 1
+                    continue
+
+                new_emitters = current_emitters + candidate.emitters
+                if not self._can_improve(index + 1, new_emitters, new_t_min, new_t_max):
+                    bound_prunes += 1
+                    continue
+
+                if any(usage[i] + count > limits[i] for i, count in candidate.limited):
+                    inventory_rejections += 1
+                    continue
+
+                for i, count in candidate.limited:
+                    usage[i] += count
+                selection.append(candidate)
+
+                self._front_recursive(
+                    index + 1,
+                    new_t_min,
+                    new_t_max,
+                    new_emitters,
+                    candidate_index if next_in_group else 0
+                )
+
+                selection.pop()
+                for i, count in candidate.limited:
+                    usage[i] -= count
+
+                if index == 0:
+                    self.progress = (candidate_index + 1) / len(candidates)
+        finally:
+            self._t_rejections += t_rejections
+            self._bound_prunes += bound_prunes
+            self._inventory_rejections += inventory_rejections
+
+
+    def _record_solution(self, total_emitters, chosen_T):
+        # Equal points are dominated too, the first one found is kept
+        if self._dominated(total_emitters, chosen_T):
+            return
+
+        # Drop the archived points the new one dominates, they follow each other from `position` on
+        position = bisect_left(self._front_emitters, total_emitters)
+        end = position
+        while end < len(self._front_T) and self._front_T[end] >= chosen_T:
+            end += 1
+
+        self._front_emitters[position:end] = [total_emitters]
+        self._front_T[position:end] = [chosen_T]
+        self._front_selections[position:end] = [tuple(self._selection)]
+
+        if self._first_solution_seconds is None:
+            self._first_solution_seconds = time() - self._start_time
+
+        # The fewest-emitter point is the incumbent of `optimize()`
+        if position == 0:
+            self._best_selection = self._front_selections[0]
+            self._best_emitters = total_emitters
+            self._best_T = chosen_T
+
+            if self.on_improvement is not None:
+                self._notify_improvement()
@@ -1,16 +1,44 @@
-from copy import deepcopy
+import math
+from bisect import bisect_left, bisect_right
+from enum import Enum
+from itertools import product
 from time import time
+from typing import Callable, NamedTuple
 
+from app.optimization.cancellation import CancellationToken
+from app.optimization.candidate_cache import CandidateCache, candidate_cache as shared_candidate_cache
+from app.optimization.metrics import search_metrics
+from app.optimization.result_cache import ResultCache, request_fingerprint
 from app.schemas.optimization import (
     PerPlantOptimizationRequest,
     PerPlantOptimizationResponse,
     DripperAllocation,
-    PlantOptimizationResult
+    PlantOptimizationResult,
+    OptimizationImprovement,
+    OptimizationDiagnostics
 )
 
-MAX_TIME_HOURS = 3
+# Stored results of other versions are discarded, bump it when a change can alter the result of a request
+OPTIMIZER_VERSION = "2"
+
+MAX_TIME_HOURS = 3  # an integer, the exact flow bounds below multiply by it
+
+# Integer units of the optimizer core. Request values are rounded to them once, after that
+# flow sums and volume windows are exact and candidates are hashable by flow.
+FLOW_UNITS_PER_LPH = 1000                   # ml/h
+TOLERANCE_UNITS_PER_PERCENT = 1000          # 0.001 %
+VOLUME_UNITS_PER_LITER = 1000 * 100 * TOLERANCE_UNITS_PER_PERCENT   # ml, scaled by the tolerance resolution
+
+# T in hours = volume units / (flow units * T_SCALE)
+T_SCALE = VOLUME_UNITS_PER_LITER // FLOW_UNITS_PER_LPH
 MAX_RUNTIME_SECONDS = 30
 
+# Catalogs with at least this many dripper types use NumPy candidate generation when available
+VECTORIZED_MIN_DRIPPERS = 4
+
+# Search nodes between two runtime checks
+RUNTIME_CHECK_INTERVAL = 1024
+
 # TODO (Phase 2 improvement):
 # Currently irrigation time is limited by hard constant MAX_TIME_HOURS.
 # In the future this should:
@@ -26,7 +54,7 @@ class NoSolutionException(Exception):
     """
     def __init__(self, message):
         super().__init__(message)
-    
+
 class InfeasibleSolutionException(Exception):
     """
     Raised when a solution is found but it does not meet the constraints (e.g. T intersection is empty).
@@ -34,12 +62,170 @@ class InfeasibleSolutionException(Exception):
     def __init__(self, message):
         super().__init__(message)
 
+class OptimizationCancelledException(Exception):
+    """
+    Raised when the optimization was cancelled through its cancellation token.
+    """
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class SearchInterrupted(Exception):
+    """
+    Raised inside the search (or the candidate generation) when its deadline passed.
+    `optimize()` turns it into a best-so-far result (with a time budget) or a TimeoutError.
+    """
+    def __init__(self):
+        super().__init__("Search deadline passed")
+        # True until the first branch and bound frame has accounted for the interrupted node
+        self.fresh = True
+
+
+class SearchStrategy(str, Enum):
+    BRUTE_FORCE = "brute_force"
+    BRANCH_AND_BOUND = "branch_and_bound"
+
+
+class Candidate(NamedTuple):
+    """
+    One dripper combination for a single plant.
+
+    Candidates are immutable and do not reference the plant, so the same record can be
+    shared by any plant with the same parameters. Dripper types are referenced by their
+    index in the optimizer's (canonically ordered) dripper list.
+    """
+    allocations: tuple[tuple[int, int], ...]    # (dripper index, count) pairs, in dripper order
+    limited: tuple[tuple[int, int], ...]        # subset of allocations using limited dripper types
+    flow: int                                   # total flow in FLOW_UNITS_PER_LPH
+    t_min: float                                # shortest irrigation time in hours, see `_hours`
+    t_max: float                                # longest irrigation time in hours
+    emitters: int
+
+
+class PreviousSolution(NamedTuple):
+    """
+    Result of an earlier run on the same zone, used to re-optimize it after small edits.
+
+    `candidates` are the candidate lists of that run (the optimizer's `candidate_lists`),
+    reused for every plant whose parameters did not change. It may be left empty when
+    only the response is known, e.g. when the client sends it back.
+    """
+    response: PerPlantOptimizationResponse
+    candidates: dict | None = None
+
+
+class _WindowStaircase:
+    """
+    T windows none of which contains another, sorted by start (their ends then increase too).
+    Tells in logarithmic time whether any of them contains a given window.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+
+    def covers(self, start, end) -> bool:
+        # Of the windows starting at or before `start`, the last one ends last
+        index = bisect_right(self.starts, start)
+        return index > 0 and self.ends[index - 1] >= end
+
+
+    def add(self, start, end):
+        # Windows contained in the new one start at or after it and form a run of the staircase
+        index = stop = bisect_left(self.starts, start)
+        while stop < len(self.ends) and self.ends[stop] <= end:
+            stop += 1
+        self.starts[index:stop] = [start]
+        self.ends[index:stop] = [end]
+
 
 class PerPlantOptimizer:
 
-    def __init__(self, request):
+    def __init__(
+        self,
+        request,
+        strategy: SearchStrategy = SearchStrategy.BRANCH_AND_BOUND,
+        candidate_cache: CandidateCache | None = shared_candidate_cache,
+        vectorized_generation: bool | None = None,
+        time_budget_seconds: float | None = None,
+        on_improvement: Callable[[OptimizationImprovement], None] | None = None,
+        cancellation_token: CancellationToken | None = None,
+        warm_start: bool = True,
+        include_diagnostics: bool = False,
+        previous_solution: PreviousSolution | None = None,
+        result_cache: ResultCache | None = None
+    ):
+        self.request = request
         self.plants = request.plants
-        self.drippers = request.available_drippers
+        self.strategy = SearchStrategy(strategy)
+
+        # With a time budget the best solution found in time is returned instead of a TimeoutError
+        self.time_budget_seconds = time_budget_seconds
+
+        # Set by optimize(), the candidate generation counts against it too
+        self._deadline = None
+        self._generation_steps = 0
+
+        # Called from the search thread with every strictly better incumbent
+        self.on_improvement = on_improvement
+
+        # Polled together with the deadline, stops the search early when cancelled
+        self.cancellation_token = cancellation_token
+
+        # Seed the incumbent with a greedy solution before the exact search
+        self.warm_start = warm_start
+
+        # Incremental mode: reuse the candidates of unchanged plants and seed the incumbent
+        # with the previous solution (instead of the warm start) when it is still feasible
+        self.previous_solution = previous_solution
+        self._previous_candidates = (previous_solution.candidates or {}) if previous_solution is not None else {}
+
+        # Candidate list of every plant key used by the last run, for a later PreviousSolution
+        self.candidate_lists = {}
+
+        # Proven optimal results are stored here and identical requests are answered from it
+        # (not when diagnostics are requested, they describe a search)
+        self.result_cache = result_cache
+        self.result_key = None  # fingerprint of the request, once optimize() looked it up
+
+        # Search counters are always collected (see `diagnostics`), this only adds them to the response
+        self.include_diagnostics = include_diagnostics
+        self.diagnostics = None
+
+        # Drippers are kept in a canonical order (by flow rate and limit) so that
+        # candidate tables can be shared by any request with the same catalog.
+        # The request order is only restored in _build_response.
+        order = sorted(
+            range(len(request.available_drippers)),
+            key=lambda i: self._dripper_sort_key(request.available_drippers[i])
+        )
+        self.drippers = [request.available_drippers[i] for i in order]
+        self._request_position = order
+        self._flow_units = [self._dripper_flow_units(dripper) for dripper in self.drippers]
+        self._catalog_key = tuple(
+            (flow_units, dripper.count) for flow_units, dripper in zip(self._flow_units, self.drippers)
+        )
+
+        # Without a shared cache identical plants are still generated only once per run
+        self._candidate_cache = candidate_cache if candidate_cache is not None else CandidateCache(max_size=len(self.plants) or 1)
+
+        # Inventory limit per dripper index (None = unlimited)
+        self._limits = [dripper.count for dripper in self.drippers]
+
+        # (flow rate, limit) of drippers[index:], fastest first, for flow bounds in candidate generation
+        self._fastest_drippers_suffix = [
+            sorted(
+                ((flow_units, dripper.count) for flow_units, dripper in zip(self._flow_units[index:], self.drippers[index:])),
+                key=lambda rate_and_limit: -rate_and_limit[0]
+            )
+            for index in range(len(self.drippers) + 1)
+        ]
+
+        # None = decide by catalog size and NumPy availability
+        if vectorized_generation is None:
+            vectorized_generation = len(self.drippers) >= VECTORIZED_MIN_DRIPPERS and self._numpy_available()
+        self.vectorized_generation = vectorized_generation
 
 
     # ===============================
@@ -47,64 +233,361 @@ class PerPlantOptimizer:
     # ===============================
 
     def optimize(self) -> PerPlantOptimizationResponse:
-        self._best_solution = None
+        # Share of the search done, for progress reporting while optimize() runs in another thread
+        self.progress = 0.0
 
-        # 1) Generate candidates per plant
-        plant_candidates = {}
+        if self.result_cache is None:
+            return self._optimize()
 
-        for plant in self.plants:
-            candidates = self._generate_candidates_for_plant(plant)
-            if not candidates:
-                raise NoSolutionException(f"No candidates found for plant {plant.plant_id} with target volume {plant.target_volume_liters}L and tolerance {plant.tolerance_percent}%")
-            plant_candidates[plant.plant_id] = candidates
+        key = self.result_key = request_fingerprint(self.request, type(self).__name__)
+        if key is not None and not self.include_diagnostics:
+            cached = self.result_cache.get(key, self.request)
+            if cached is not None:
+                self.progress = 1.0
+                return cached
 
-        # 2) Brute force all plant combinations
-        best_solution = None
-        best_emitters_count = float("inf")
-        best_T = None
+        response = self._optimize()
+        if key is not None and response.proven_optimal:
+            self.result_cache.put(key, response, time() - self._start_time)
+        return response
+
+
+    def _optimize(self) -> PerPlantOptimizationResponse:
 
-        # Recursively search for the best combination of candidates across all plants
         self._start_time = time()
-        self._search_combinations(
-            plant_ids=list(plant_candidates.keys()),
-            plant_candidates=plant_candidates,
-            index=0,
-            current_selection=[],
-            best_holder={
-                "solution": None,
-                "emitters": best_emitters_count,
-                "T": best_T
-            }
+        runtime = MAX_RUNTIME_SECONDS
+        if self.time_budget_seconds is not None:
+            runtime = min(self.time_budget_seconds, MAX_RUNTIME_SECONDS)
+        self._deadline = self._start_time + runtime
+
+        # 1) Generate candidates per plant
+        plant_candidates = []
+        self.candidate_lists = {}
+
+        try:
+            for plant in self.plants:
+                self._check_generation_runtime()
+                candidates = self._candidates_for_plant(plant)
+                if not candidates:
+                    raise NoSolutionException(f"No candidates found for plant {plant.plant_id} with target volume {plant.target_volume_liters}L and tolerance {plant.tolerance_percent}%")
+                plant_candidates.append(candidates)
+        except SearchInterrupted:
+            # Nothing was searched, so there is no solution to return even with a time budget
+            self.diagnostics = OptimizationDiagnostics(
+                candidates_per_plant=[len(candidates) for candidates in plant_candidates],
+                nodes_visited=0,
+                leaves_evaluated=0,
+                infeasible_t_rejections=0,
+                inventory_rejections=0,
+                bound_prunes=0,
+                generation_seconds=round(time() - self._start_time, 6),
+                warm_start_seconds=0.0,
+                search_seconds=0.0
+            )
+            search_metrics.record_run(self.diagnostics, timed_out=True)
+            raise TimeoutError("Optimization exceeded maximum runtime of {} seconds".format(runtime))
+
+        self._check_cancelled()
+        generation_end = time()
+
+        # 2) Search all plant combinations, interchangeable plants next to each other
+        self._prepare_search_order()
+        self._plant_candidates = [plant_candidates[i] for i in self._search_order]
+        self._selection = []
+        self._best_selection = None
+        self._best_emitters = float("inf")
+        self._best_T = None
+
+        self._nodes = 0
+        self._interrupted = False
+        self._heuristic = False     # set by engines whose complete search is not exact
+        self._open_bound = None     # lower bound on emitters of the unexplored part, if the engine knows one
+
+        # Search counters, see OptimizationDiagnostics
+        self._leaves = 0
+        self._t_rejections = 0
+        self._inventory_rejections = 0
+        self._bound_prunes = 0
+
+        self._first_solution_seconds = None
+        self._warm_start_selection = None
+        self._warm_start_emitters = None
+        self._previous_plants_reused = 0
+
+        warm_start_end = None
+        try:
+            seeded = self.previous_solution is not None and self._seed_from_previous()
+            if self.warm_start and not seeded:
+                self._warm_start()
+            warm_start_end = time()
+            self._search()
+        except SearchInterrupted:
+            self._interrupted = True
+
+        self.progress = 1.0
+        search_end = time()
+
+        self.diagnostics = OptimizationDiagnostics(
+            candidates_per_plant=[len(candidates) for candidates in plant_candidates],
+            nodes_visited=self._nodes,
+            leaves_evaluated=self._leaves,
+            infeasible_t_rejections=self._t_rejections,
+            inventory_rejections=self._inventory_rejections,
+            bound_prunes=self._bound_prunes,
+            generation_seconds=round(generation_end - self._start_time, 6),
+            search_seconds=round(search_end - generation_end, 6),
+            warm_start_seconds=round((warm_start_end or search_end) - generation_end, 6),
+            previous_plants_reused=self._previous_plants_reused
         )
 
-        best_solution = self._best_solution
+        # Nothing better than the warm start was found (interrupted search), undo the T offset
+        if self._best_selection is not None and self._best_selection is self._warm_start_selection:
+            self._best_T = self._warm_start_T
+
+        if self._interrupted and (self.time_budget_seconds is None or self._best_selection is None):
+            search_metrics.record_run(self.diagnostics, timed_out=True)
+            raise TimeoutError("Optimization exceeded maximum runtime of {} seconds".format(runtime))
 
-        if best_solution is None:
+        if self._best_selection is None:
             raise NoSolutionException("No global solution found that satisfies all constraints.")
 
-        return self._build_response(best_solution)
+        response = self._build_response((self._best_selection, self._best_T))
+        self.diagnostics.build_seconds = round(time() - search_end, 6)
+
+        search_metrics.record_run(
+            self.diagnostics,
+            timed_out=False,
+            first_solution_seconds=self._first_solution_seconds,
+            warm_start_emitters=self._warm_start_emitters,
+            final_emitters=self._best_emitters
+        )
+
+        if self.include_diagnostics:
+            response.diagnostics = self.diagnostics
+        return response
+
+
+    def _warm_start(self):
+        """
+        Seed the incumbent with the best greedy sweep selection (see `warm_start.sweep_selections`).
+        """
+        from app.optimization.warm_start import sweep_selections
+
+        # Every yielded selection improves on the previous one, keep the last
+        picks = None
+        for selection in sweep_selections(self._plant_candidates, self._limits):
+            self._check_runtime()
+            if selection is not None:
+                picks = selection
+
+        if picks is not None:
+            self._seed_incumbent(picks)
+
+
+    def _seed_from_previous(self) -> bool:
+        """
+        Seed the incumbent with the previous solution of the zone, see `_seed_incumbent`.
+
+        Plants whose previous allocation is still one of their candidates keep it. The
+        others (new or edited plants) greedily take their fewest-emitter candidate that
+        keeps the T window non-empty and fits the remaining inventory. Returns False
+        when no feasible selection is found this way.
+        """
+        dripper_index = {dripper.dripper_id: index for index, dripper in enumerate(self.drippers)}
+        previous_allocations = {}
+        for result in self.previous_solution.response.plants:
+            if all(alloc.dripper_id in dripper_index for alloc in result.assigned_drippers):
+                previous_allocations[result.plant_id] = tuple(sorted(
+                    (dripper_index[alloc.dripper_id], alloc.count) for alloc in result.assigned_drippers if alloc.count
+                ))
+
+        picks = [None] * len(self._plant_candidates)
+        for position, candidates in enumerate(self._plant_candidates):
+            allocations = previous_allocations.get(self.plants[self._search_order[position]].plant_id)
+            picks[position] = next((c for c in candidates if c.allocations == allocations), None)
+
+        t_min_global = 0
+        t_max_global = MAX_TIME_HOURS
+        usage = [0] * len(self._limits)
+        for pick in picks:
+            if pick is not None:
+                t_min_global = max(t_min_global, pick.t_min)
+                t_max_global = min(t_max_global, pick.t_max)
+                for i, count in pick.limited:
+                    usage[i] += count
+
+        limits = self._limits
+        if t_min_global > t_max_global or any(limit is not None and used > limit for used, limit in zip(usage, limits)):
+            return False
+
+        reused = sum(1 for pick in picks if pick is not None)
+
+        for position, candidates in enumerate(self._plant_candidates):
+            if picks[position] is not None:
+                continue
+
+            # Candidates are sorted by emitters, the first fitting one is the cheapest
+            for candidate in candidates:
+                if max(t_min_global, candidate.t_min) > min(t_max_global, candidate.t_max):
+                    continue
+                if any(usage[i] + count > limits[i] for i, count in candidate.limited):
+                    continue
+                break
+            else:
+                return False
+
+            picks[position] = candidate
+            t_min_global = max(t_min_global, candidate.t_min)
+            t_max_global = min(t_max_global, candidate.t_max)
+            for i, count in candidate.limited:
+                usage[i] += count
+
+        self._previous_plants_reused = reused
+        self._seed_incumbent(picks)
+        return True
+
+
+    def _seed_incumbent(self, picks):
+        """
+        Make a feasible selection (in search order) the incumbent before the search.
+
+        The seeded T is nudged up by one ulp, so the exact search still finds every
+        solution equal to the seed and returns the same selection as without it;
+        only worse branches are pruned earlier.
+        """
+        emitters = sum(c.emitters for c in picks)
+        chosen_T = max(c.t_min for c in picks)
+        self._warm_start_selection = tuple(picks)
+        self._warm_start_emitters = emitters
+        self._warm_start_T = chosen_T
+
+        self._best_selection = self._warm_start_selection
+        self._best_emitters = emitters
+        self._best_T = math.nextafter(chosen_T, math.inf)
+        self._first_solution_seconds = time() - self._start_time
+
+        if self.on_improvement is not None:
+            self._notify_improvement()
+
+
+    def _emitters_lower_bound(self) -> int:
+        """
+        Lower bound on the emitters of any solution, equal to the best solution's
+        emitters when the search proved it optimal.
+        """
+        if not self._interrupted and not self._heuristic:
+            return self._best_emitters
+
+        bound = sum(min(c.emitters for c in candidates) for candidates in self._plant_candidates)
+        if self._open_bound is not None:
+            bound = max(bound, self._open_bound)
+        return min(self._best_emitters, math.ceil(bound))
 
 
     # ===============================
     # GENERATE CANDIDATES PER PLANT
     # ===============================
 
-    def _generate_candidates_for_plant(self, plant):
+    @staticmethod
+    def _numpy_available() -> bool:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+
+    @staticmethod
+    def _dripper_sort_key(dripper):
+        return (dripper.flow_rate_lph, dripper.count is None, dripper.count or 0, dripper.dripper_id)
+
+
+    @staticmethod
+    def _dripper_flow_units(dripper) -> int:
+        return round(dripper.flow_rate_lph * FLOW_UNITS_PER_LPH)
+
+
+    @staticmethod
+    def _plant_key(plant):
+        # Plants with equal keys have the same candidates and are interchangeable
+        return (*PerPlantOptimizer._volume_window(plant), plant.max_emitter_quantity)
+
+
+    @staticmethod
+    def _volume_window(plant) -> tuple[int, int]:
+        """
+        (min, max) volume the plant accepts, in VOLUME_UNITS_PER_LITER.
+        """
+        target = round(plant.target_volume_liters * 1000)
+        tolerance = round(plant.tolerance_percent * TOLERANCE_UNITS_PER_PERCENT)
+        full = 100 * TOLERANCE_UNITS_PER_PERCENT
+        return target * (full - tolerance), target * (full + tolerance)
+
+
+    @staticmethod
+    def _min_flow(min_volume: int) -> int:
+        # Slowest flow (in flow units) that reaches `min_volume` within MAX_TIME_HOURS
+        return -(-max(min_volume, 0) // (MAX_TIME_HOURS * T_SCALE))
+
+
+    @staticmethod
+    def _hours(volume: int, flow: int) -> float:
+        """
+        Irrigation time in hours that gives `volume` at `flow`.
+
+        Integer true division is correctly rounded, so equal exact times always get the
+        same float and the float order never contradicts the exact one. Within a plant
+        (same volume) distinct flows give distinct floats; times of different plants
+        are told apart unless they differ by less than one float ulp.
+        """
+        return volume / (flow * T_SCALE)
+
+
+    def _candidates_for_plant(self, plant) -> list[Candidate]:
+        """
+        Reduced candidate list for `plant`, shared with every plant (in this or
+        earlier requests) that has the same parameters and dripper catalog.
+        """
+        key = (self._plant_key(plant), self._catalog_key)
+
+        # Lists of a previous run are reused as they are, even if the cache evicted them since
+        candidates = self._previous_candidates.get(key)
+        if candidates is None:
+            candidates = self._candidate_cache.get_or_create(
+                key,
+                lambda: self._reduce_candidates(self._generate_candidates_for_plant(plant))
+            )
+
+        self.candidate_lists[key] = candidates
+        return candidates
+
+
+    def _generate_candidates_for_plant(self, plant) -> list[Candidate]:
 
         candidates = []
 
-        tolerance_volume = plant.target_volume_liters * (plant.tolerance_percent / 100)
-        min_volume = plant.target_volume_liters - tolerance_volume
-        max_volume = plant.target_volume_liters + tolerance_volume
+        min_volume, max_volume = self._volume_window(plant)
+
+        # Admissible flow window: any flow gives a non-empty T window unless the
+        # tolerance is negative, and flows below `_min_flow` can never reach the
+        # minimum volume in time.
+        if min_volume > max_volume:
+            return candidates
+        min_flow = self._min_flow(min_volume)
+
+        if self.vectorized_generation:
+            from app.optimization.vectorized_candidates import generate_candidates_vectorized
+            return generate_candidates_vectorized(self, plant, min_volume, max_volume, min_flow)
 
         # Recursively generate all combinations of drippers for this plant and calculate their flow and T intervals
         self._generate_combinations_recursive(
             plant,
             min_volume,
             max_volume,
+            min_flow,
             dripper_index=0,
             current_allocations=[],
-            current_flow=0.0,
+            current_flow=0,
             current_count=0,
             candidates=candidates
         )
@@ -112,33 +595,51 @@ class PerPlantOptimizer:
         return candidates
 
 
+    def _max_remaining_flow(self, dripper_index, budget):
+        """
+        Highest flow the drippers from `dripper_index` on can add with at most
+        `budget` more emitters (greedy over the fastest dripper types).
+        """
+        flow = 0
+        for flow_rate, count in self._fastest_drippers_suffix[dripper_index]:
+            if budget <= 0:
+                break
+            qty = budget if count is None else min(count, budget)
+            flow += flow_rate * qty
+            budget -= qty
+        return flow
+
+
     def _generate_combinations_recursive(
         self,
         plant,
         min_volume,
         max_volume,
+        min_flow,
         dripper_index,
         current_allocations,
         current_flow,
         current_count,
         candidates
     ):
-
-        # If current flow is within the acceptable range, add it as a candidate
-        if current_flow > 0:
-
-            t_min = min_volume / current_flow
-            t_max = max_volume / current_flow
-
-            if t_min <= t_max:
-                candidates.append({
-                    "plant_id": plant.plant_id,
-                    "allocations": deepcopy(current_allocations),
-                    "total_flow": current_flow,
-                    "t_min": t_min,
-                    "t_max": t_max,
-                    "total_emitters": current_count
-                })
+        # `current_allocations` is a single stack shared by the whole recursion,
+        # it is only copied (as a tuple) when a candidate is recorded.
+        self._generation_checkpoint()
+
+        # If current flow is within the acceptable range, add it as a candidate.
+        # Each combination is recorded once, right after its last dripper type was added.
+        # The T window is not empty (min_volume <= max_volume) and starts within MAX_TIME_HOURS
+        # exactly when the flow reaches `min_flow`.
+        if current_flow > 0 and current_allocations[-1][0] == dripper_index - 1 and current_flow >= min_flow:
+            allocations = tuple(current_allocations)
+            candidates.append(Candidate(
+                allocations=allocations,
+                limited=tuple(alloc for alloc in allocations if self._limits[alloc[0]] is not None),
+                flow=current_flow,
+                t_min=self._hours(min_volume, current_flow),
+                t_max=self._hours(max_volume, current_flow),
+                emitters=current_count
+            ))
 
         # Stop conditions
         if dripper_index >= len(self.drippers):
@@ -148,6 +649,7 @@ class PerPlantOptimizer:
             return
 
         dripper = self.drippers[dripper_index]
+        flow_units = self._flow_units[dripper_index]
 
         max_available = dripper.count if dripper.count is not None else plant.max_emitter_quantity
 
@@ -159,117 +661,368 @@ class PerPlantOptimizer:
         # Try all quantities of the current dripper type from 0 to max_possible
         for qty in range(0, max_possible + 1):
 
-            new_allocations = deepcopy(current_allocations)
-            new_flow = current_flow
-            new_count = current_count
+            new_flow = current_flow + flow_units * qty
+            new_count = current_count + qty
+
+            # Skip subtrees that cannot reach the admissible flow window
+            reachable_flow = new_flow + self._max_remaining_flow(dripper_index + 1, plant.max_emitter_quantity - new_count)
+            if reachable_flow < min_flow:
+                continue
 
             if qty > 0:
-                new_allocations.append({
-                    "dripper_id": dripper.dripper_id,
-                    "flow_rate_lph": dripper.flow_rate_lph,
-                    "count": qty
-                })
-                new_flow += dripper.flow_rate_lph * qty
-                new_count += qty
+                current_allocations.append((dripper_index, qty))
 
             self._generate_combinations_recursive(
                 plant,
                 min_volume,
                 max_volume,
+                min_flow,
                 dripper_index + 1,
-                new_allocations,
+                current_allocations,
                 new_flow,
                 new_count,
                 candidates
             )
 
+            if qty > 0:
+                current_allocations.pop()
+
+
+    # ===============================
+    # CANDIDATE REDUCTION
+    # ===============================
+
+    def _reduce_candidates(self, candidates: list[Candidate]) -> list[Candidate]:
+        """
+        Remove candidates that can never be part of a better solution than another
+        candidate of the same plant.
+
+        Candidate A dominates candidate B when A's T window (capped by MAX_TIME_HOURS)
+        contains B's, A needs no more emitters and A uses no more of any limited
+        dripper type. Any solution using B stays feasible and is not worse with A,
+        so B can be dropped. Candidates equal in all of these (e.g. the same flow
+        built from different unlimited drippers) are merged into the first one.
+
+        Flows are exact integers, so candidates with the same flow and limited usage
+        (hence the same T window) are first merged through a dict, in linear time.
+        """
+        limited_indices = [index for index, limit in enumerate(self._limits) if limit is not None]
+
+        # (flow, limited usage) -> key of the fewest-emitter (then first) candidate
+        groups = {}
+        for position, candidate in enumerate(candidates):
+            usage = dict.fromkeys(limited_indices, 0)
+            for dripper_index, count in candidate.limited:
+                usage[dripper_index] += count
+            usage = tuple(usage.values())
+
+            group = (candidate.flow, usage)
+            if group not in groups or candidate.emitters < groups[group][0]:
+                groups[group] = (
+                    candidate.emitters,
+                    sum(usage),
+                    candidate.t_min,
+                    -min(candidate.t_max, MAX_TIME_HOURS),
+                    usage,
+                    position
+                )
+        keyed = list(groups.values())
+
+        # Every dominating candidate sorts before the candidates it dominates
+        keyed.sort()
+
+        # Kept windows per limited usage. Emitters come first in the order, so every kept
+        # candidate needs no more emitters than the current one: the check only looks for a
+        # containing window among the usages that are nowhere larger than the current one.
+        staircases = {key[4]: _WindowStaircase() for key in keyed}
+        covering = {}
+        for usage in staircases:
+            # Enumerate the smaller usages, or filter the existing ones when there are fewer of them
+            if math.prod(used + 1 for used in usage) <= len(staircases):
+                smaller = [k_usage for k_usage in product(*(range(used + 1) for used in usage)) if k_usage in staircases]
+            else:
+                smaller = [k_usage for k_usage in staircases if all(k <= u for k, u in zip(k_usage, usage))]
+            covering[usage] = [staircases[k_usage] for k_usage in smaller]
+
+        kept = []
+        for key in keyed:
+            self._generation_checkpoint()
+            _, _, t_min, neg_t_max, usage, _ = key
+            if not any(staircase.covers(t_min, -neg_t_max) for staircase in covering[usage]):
+                staircases[usage].add(t_min, -neg_t_max)
+                kept.append(key)
+
+        # Fewest emitters (then shortest T) first, so the depth-first search reaches
+        # good solutions early; the generation order breaks the remaining ties
+        return [candidates[key[-1]] for key in sorted(kept, key=lambda key: (key[0], key[2], key[-1]))]
+
 
     # ===============================
     # GLOBAL SEARCH
     # ===============================
 
-    def _search_combinations(
-        self,
-        plant_ids,
-        plant_candidates,
-        index,
-        current_selection,
-        best_holder
-    ):
-        if time() - self._start_time > MAX_RUNTIME_SECONDS:
-            raise TimeoutError("Optimization exceeded maximum runtime of {} seconds".format(MAX_RUNTIME_SECONDS))
+    def _prepare_search_order(self):
+        """
+        Order plants for the search so that interchangeable plants are adjacent.
+
+        `_search_order[position]` is the index of the plant (in `self.plants`) searched at
+        `position`, `_same_group[position]` tells whether it is interchangeable with the
+        plant at `position - 1`. Within such a group only non-decreasing candidate
+        indices are enumerated, which skips the k! permutations of the same assignment.
+        """
+        group_start = {}
+        for index, plant in enumerate(self.plants):
+            group_start.setdefault(self._plant_key(plant), index)
+
+        self._search_order = sorted(
+            range(len(self.plants)),
+            key=lambda index: (group_start[self._plant_key(self.plants[index])], index)
+        )
+        self._same_group = [
+            position > 0 and self._plant_key(self.plants[index]) == self._plant_key(self.plants[self._search_order[position - 1]])
+            for position, index in enumerate(self._search_order)
+        ]
+
+
+    def _search(self):
+        """
+        Find the best selection of candidates (one per plant, in search order) and
+        store it through `_record_solution`. Other engines override this step.
+        """
+        # Recursively search for the best combination of candidates across all plants
+        if self.strategy == SearchStrategy.BRUTE_FORCE:
+            self._search_combinations(index=0)
+        else:
+            self._branch_and_bound()
+
+
+    def _check_runtime(self):
+        # Reading the clock at every node is measurable, check it every RUNTIME_CHECK_INTERVAL nodes
+        self._nodes += 1
+        if self._nodes % RUNTIME_CHECK_INTERVAL == 0:
+            self._check_cancelled()
+            if time() > self._deadline:
+                raise SearchInterrupted()
+
+
+    def _generation_checkpoint(self):
+        # Candidate generation and reduction steps, checked at the same cadence as search nodes
+        self._generation_steps += 1
+        if self._generation_steps % RUNTIME_CHECK_INTERVAL == 0:
+            self._check_generation_runtime()
+
+
+    def _check_generation_runtime(self):
+        """
+        Stop the candidate generation when the run is cancelled or its deadline has passed.
+        Generation before any optimize() (no deadline yet) is only stopped by a cancellation.
+        """
+        self._check_cancelled()
+        if self._deadline is not None and time() > self._deadline:
+            raise SearchInterrupted()
+
+
+    def _check_cancelled(self):
+        token = self.cancellation_token
+        if token is not None and token.cancelled:
+            raise OptimizationCancelledException(f"Optimization was cancelled ({token.reason.value})")
+
 
-        if index >= len(plant_ids):
-            self._evaluate_solution(current_selection, best_holder)
+    def _search_combinations(self, index):
+        self._check_runtime()
+
+        if index >= len(self._plant_candidates):
+            self._evaluate_solution()
             return
 
-        plant_id = plant_ids[index]
+        selection = self._selection
+
+        for candidate in self._plant_candidates[index]:
+            selection.append(candidate)
+            self._search_combinations(index + 1)
+            selection.pop()
+
+
+    def _branch_and_bound(self):
+        """
+        Depth-first search over the same tree as `_search_combinations`, but the
+        T intersection, emitter total and limited dripper usage are carried down
+        the tree so that hopeless branches are cut before reaching the leaves.
+
+        Candidates are visited in the same order as in the brute force search and
+        only branches that cannot strictly improve the incumbent are cut. Within a
+        group of interchangeable plants only non-decreasing candidate indices are
+        visited; the first optimal assignment in brute force order is always of
+        that form, so the returned solution is identical to the brute force one.
+        """
+        self._prepare_branch_and_bound()
+
+        self._bnb_recursive(
+            index=0,
+            t_min_global=0,
+            t_max_global=MAX_TIME_HOURS,
+            current_emitters=0,
+            start=0
+        )
 
-        for candidate in plant_candidates[plant_id]:
-            self._search_combinations(
-                plant_ids,
-                plant_candidates,
-                index + 1,
-                current_selection + [candidate],
-                best_holder
-            )
 
+    def _prepare_branch_and_bound(self):
+        plant_count = len(self._plant_candidates)
 
-    def _evaluate_solution(self, selection, best_holder):
+        # Minimum emitters any completion of plants[index:] needs
+        self._min_emitters_suffix = [0] * (plant_count + 1)
+        for index in range(plant_count - 1, -1, -1):
+            min_emitters = min(c.emitters for c in self._plant_candidates[index])
+            self._min_emitters_suffix[index] = self._min_emitters_suffix[index + 1] + min_emitters
+
+        self._usage = [0] * len(self._limits)
+
+
+    def _bnb_recursive(self, index, t_min_global, t_max_global, current_emitters, start):
+        self._check_runtime()
+
+        if index >= len(self._plant_candidates):
+            self._leaves += 1
+            self._record_solution(current_emitters, t_min_global)
+            return
+
+        selection = self._selection
+        usage = self._usage
+        limits = self._limits
+        remaining_min = self._min_emitters_suffix[index + 1]
+        candidates = self._plant_candidates[index]
+        next_in_group = index + 1 < len(self._same_group) and self._same_group[index + 1]
+
+        # Rejections are counted in locals and added to the diagnostics once per node
+        t_rejections = bound_prunes = inventory_rejections = 0
+        try:
+            for candidate_index in range(start, len(candidates)):
+                candidate = candidates[candidate_index]
+
+                # 1) T intersection must stay non-empty
+                new_t_min = t_min_global if t_min_global >= candidate.t_min else candidate.t_min
+                new_t_max = t_max_global if t_max_global <= candidate.t_max else candidate.t_max
+                if new_t_min > new_t_max:
+                    t_rejections += 1
+                    continue
+
+                # 2) Bound: emitters can only grow and T can only move up deeper in the tree
+                new_emitters = current_emitters + candidate.emitters
+                lower_bound = new_emitters + remaining_min
+                if lower_bound > self._best_emitters or (
+                    lower_bound == self._best_emitters and new_t_min >= self._best_T
+                ):
+                    bound_prunes += 1
+                    continue
+
+                # 3) Limited dripper inventory must not be exceeded
+                if any(usage[i] + count > limits[i] for i, count in candidate.limited):
+                    inventory_rejections += 1
+                    continue
+
+                for i, count in candidate.limited:
+                    usage[i] += count
+                selection.append(candidate)
+
+                try:
+                    self._bnb_recursive(
+                        index + 1,
+                        new_t_min,
+                        new_t_max,
+                        new_emitters,
+                        candidate_index if next_in_group else 0
+                    )
+                except SearchInterrupted as interrupt:
+                    self._record_open_bound(interrupt, lower_bound, current_emitters, candidates[candidate_index + 1:], remaining_min)
+                    raise
+
+                selection.pop()
+                for i, count in candidate.limited:
+                    usage[i] -= count
+
+                if index == 0:
+                    self.progress = (candidate_index + 1) / len(candidates)
+        finally:
+            self._t_rejections += t_rejections
+            self._bound_prunes += bound_prunes
+            self._inventory_rejections += inventory_rejections
+
+
+    def _record_open_bound(self, interrupt, child_bound, current_emitters, remaining_candidates, remaining_min):
+        """
+        Fold the lower bound of the unexplored part of one search level into `_open_bound`
+        while an interrupt unwinds the recursion: the interrupted node itself (deepest
+        level only) and the siblings not visited yet.
+        """
+        bounds = []
+        if interrupt.fresh:
+            bounds.append(child_bound)
+            interrupt.fresh = False
+        if remaining_candidates:
+            bounds.append(current_emitters + min(c.emitters for c in remaining_candidates) + remaining_min)
+
+        for bound in bounds:
+            if self._open_bound is None or bound < self._open_bound:
+                self._open_bound = bound
+
+
+    def _evaluate_solution(self):
+        self._leaves += 1
 
         # 1) Check T intersection
         t_min_global = 0
         t_max_global = MAX_TIME_HOURS
 
         total_emitters = 0
-        dripper_usage = {}
+        dripper_usage = [0] * len(self.drippers)
 
-        for candidate in selection:
+        for candidate in self._selection:
 
-            t_min_global = max(t_min_global, candidate["t_min"])
-            t_max_global = min(t_max_global, candidate["t_max"])
+            t_min_global = max(t_min_global, candidate.t_min)
+            t_max_global = min(t_max_global, candidate.t_max)
 
-            total_emitters += candidate["total_emitters"]
+            total_emitters += candidate.emitters
 
-            for alloc in candidate["allocations"]:
-                dripper_id = alloc["dripper_id"]
-                if dripper_id not in dripper_usage:
-                    dripper_usage[dripper_id] = 0
-                dripper_usage[dripper_id] += alloc["count"]
+            for dripper_index, count in candidate.limited:
+                dripper_usage[dripper_index] += count
 
         if t_min_global > t_max_global:
+            self._t_rejections += 1
             return
 
         # 2) Check global availability
-        for dripper in self.drippers:
-            if dripper.count is not None:
-                used = dripper_usage.get(dripper.dripper_id, 0)
-                if used > dripper.count:
-                    return
-
-        chosen_T = t_min_global
+        for used, limit in zip(dripper_usage, self._limits):
+            if limit is not None and used > limit:
+                self._inventory_rejections += 1
+                return
 
         # 3) Compare with best
-        if best_holder["solution"] is None:
-            best_holder["solution"] = selection
-            best_holder["emitters"] = total_emitters
-            best_holder["T"] = chosen_T
-            self._best_solution = (selection, chosen_T)
-            return
+        self._record_solution(total_emitters, t_min_global)
+
+
+    def _record_solution(self, total_emitters, chosen_T):
+        # Fewest emitters first, then the shortest irrigation time
+        if total_emitters < self._best_emitters or (
+            total_emitters == self._best_emitters and chosen_T < self._best_T
+        ):
+            self._best_selection = tuple(self._selection)
+            self._best_emitters = total_emitters
+            self._best_T = chosen_T
+
+            if self._first_solution_seconds is None:
+                self._first_solution_seconds = time() - self._start_time
+
+            if self.on_improvement is not None:
+                self._notify_improvement()
 
-        if total_emitters < best_holder["emitters"]:
-            best_holder["solution"] = selection
-            best_holder["emitters"] = total_emitters
-            best_holder["T"] = chosen_T
-            self._best_solution = (selection, chosen_T)
-            return
 
-        if total_emitters == best_holder["emitters"]:
-            if chosen_T < best_holder["T"]:
-                best_holder["solution"] = selection
-                best_holder["emitters"] = total_emitters
-                best_holder["T"] = chosen_T
-                self._best_solution = (selection, chosen_T)
+    def _notify_improvement(self):
+        self.on_improvement(OptimizationImprovement(
+            total_drippers_used=self._best_emitters,
+            base_irrigation_time_seconds=round(self._best_T * 3600, 2),
+            elapsed_seconds=round(time() - self._start_time, 4),
+            nodes_explored=self._nodes
+        ))
 
 
         # ===============================
@@ -280,6 +1033,11 @@ class PerPlantOptimizer:
 
         selection, chosen_T_hours = best_solution_tuple
 
+        # Selection is in search order, map it back to the plants of the request
+        plant_selection = [None] * len(self.plants)
+        for position, candidate in enumerate(selection):
+            plant_selection[self._search_order[position]] = candidate
+
         plants_results = []
 
         total_flow_lph = 0.0
@@ -288,11 +1046,9 @@ class PerPlantOptimizer:
 
         drippers_summary = {}
 
-        for candidate in selection:
+        for plant, candidate in zip(self.plants, plant_selection):
 
-            plant_id = candidate["plant_id"]
-            allocations = candidate["allocations"]
-            plant_flow = candidate["total_flow"]
+            plant_flow = candidate.flow / FLOW_UNITS_PER_LPH
 
             # Skutečný objem pro tuto rostlinu
             actual_volume = plant_flow * chosen_T_hours
@@ -303,32 +1059,37 @@ class PerPlantOptimizer:
             # Převod alokací na Pydantic modely
             assigned_drippers = []
 
-            for alloc in allocations:
+            # Dripper order of the request
+            allocations = sorted(candidate.allocations, key=lambda alloc: self._request_position[alloc[0]])
+
+            for dripper_index, count in allocations:
+
+                dripper = self.drippers[dripper_index]
 
                 dripper_model = DripperAllocation(
-                    dripper_id=alloc["dripper_id"],
-                    flow_rate_lph=alloc["flow_rate_lph"],
-                    count=alloc["count"]
+                    dripper_id=dripper.dripper_id,
+                    flow_rate_lph=dripper.flow_rate_lph,
+                    count=count
                 )
 
                 assigned_drippers.append(dripper_model)
 
                 # Aktualizace globálního summary
-                if alloc["dripper_id"] not in drippers_summary:
-                    drippers_summary[alloc["dripper_id"]] = DripperAllocation(
-                        dripper_id=alloc["dripper_id"],
-                        flow_rate_lph=alloc["flow_rate_lph"],
+                if dripper.dripper_id not in drippers_summary:
+                    drippers_summary[dripper.dripper_id] = DripperAllocation(
+                        dripper_id=dripper.dripper_id,
+                        flow_rate_lph=dripper.flow_rate_lph,
                         count=0
                     )
 
-                drippers_summary[alloc["dripper_id"]].count += alloc["count"]
+                drippers_summary[dripper.dripper_id].count += count
 
-                total_drippers_used += alloc["count"]
+                total_drippers_used += count
 
             # Přidání výsledku pro rostlinu
             plants_results.append(
                 PlantOptimizationResult(
-                    plant_id=plant_id,
+                    plant_id=plant.plant_id,
                     actual_volume_liters=actual_volume,
                     assigned_drippers=assigned_drippers
                 )
@@ -343,11 +1104,19 @@ class PerPlantOptimizer:
 
         base_irrigation_time_seconds = round(chosen_T_hours * 3600, 2)
 
+        # Interrupted searches report how far the result may be from the optimum
+        lower_bound = self._emitters_lower_bound()
+        optimality_gap = (total_drippers_used - lower_bound) / total_drippers_used if total_drippers_used else 0.0
+
         return PerPlantOptimizationResponse(
             plants=plants_results,
             total_drippers_used=total_drippers_used,
             drippers_used_detail=list(drippers_summary.values()),
             total_base_volume_liters=total_base_volume_liters,
             total_flow_lph=total_flow_lph,
-            base_irrigation_time_seconds=base_irrigation_time_seconds
+            base_irrigation_time_seconds=base_irrigation_time_seconds,
+            proven_optimal=not self._interrupted and not self._heuristic,
+            emitters_lower_bound=lower_bound,
+            optimality_gap=round(optimality_gap, 4),
+            warm_start_drippers_used=self._warm_start_emitters
         )
@@ -0,0 +1,258 @@
+import math
+import os
+from time import time
+
+from app.optimization.admission import check_admission
+from app.optimization.cancellation import CancellationToken
+from app.optimization.candidate_cache import CandidateCache
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, Candidate, NoSolutionException, MAX_RUNTIME_SECONDS
+from app.optimization.result_cache import ResultCache
+from app.schemas.optimization import (
+    PerPlantOptimizationRequest,
+    RelaxationParameter,
+    RelaxedOptimizationResponse,
+    RelaxedPlant
+)
+
+
+# Widest relaxation tried, in tolerance percentage points and in emitters per plant
+OPTIMIZATION_RELAX_MAX_TOLERANCE_PERCENT = float(os.environ.get("OPTIMIZATION_RELAX_MAX_TOLERANCE_PERCENT", "50"))
+OPTIMIZATION_RELAX_MAX_EMITTERS = int(os.environ.get("OPTIMIZATION_RELAX_MAX_EMITTERS", "10"))
+
+# Resolution of the tolerance relaxation, in percentage points
+OPTIMIZATION_RELAX_TOLERANCE_STEP_PERCENT = float(os.environ.get("OPTIMIZATION_RELAX_TOLERANCE_STEP_PERCENT", "0.1"))
+
+
+class _FeasibleFound(Exception):
+    pass
+
+
+class _FeasibilityProbe(PerPlantOptimizer):
+    """
+    Per-plant optimizer that stops at the first solution, it only tells whether the request has one.
+    """
+
+    def _search(self):
+        # The warm start already found one
+        if self._best_selection is not None:
+            return
+        try:
+            super()._search()
+        except _FeasibleFound:
+            pass
+
+
+    def _record_solution(self, total_emitters, chosen_T):
+        super()._record_solution(total_emitters, chosen_T)
+        raise _FeasibleFound()
+
+
+class NearestFeasibleOptimizer:
+    """
+    Optimizes a request and, when it has no solution, the nearest request that has one.
+
+    The relaxation adds the same amount to one parameter of every plant: tolerance
+    percentage points (in steps of OPTIMIZATION_RELAX_TOLERANCE_STEP_PERCENT) or
+    emitters. Widening either one only adds solutions, so the smallest feasible
+    relaxation is found by a binary search of feasibility probes, each one stopping at
+    its first solution. The relaxed request is then optimized exactly.
+
+    Dripper combinations are generated once, for the widest relaxation. A plant's
+    candidates at a smaller relaxation are the combinations within its emitter limit
+    (or with the T window of its tolerance) in the same order, so every probe derives
+    and reduces them instead of generating them again; the result is the same as
+    optimizing the relaxed request from scratch.
+
+    The whole relaxation shares `time_budget_seconds` (MAX_RUNTIME_SECONDS without one),
+    every run gets an equal share of the time left for the runs still to come. A probe
+    interrupted before its first solution is inconclusive and counts as infeasible, the
+    relaxation found may then be wider than the smallest one.
+    """
+
+    def __init__(
+        self,
+        request: PerPlantOptimizationRequest,
+        parameter: RelaxationParameter = RelaxationParameter.TOLERANCE,
+        time_budget_seconds: float | None = None,
+        cancellation_token: CancellationToken | None = None,
+        include_diagnostics: bool = False,
+        result_cache: ResultCache | None = None,
+        max_tolerance_percent: float = OPTIMIZATION_RELAX_MAX_TOLERANCE_PERCENT,
+        max_emitters: int = OPTIMIZATION_RELAX_MAX_EMITTERS,
+        tolerance_step_percent: float = OPTIMIZATION_RELAX_TOLERANCE_STEP_PERCENT
+    ):
+        self.request = request
+        self.parameter = RelaxationParameter(parameter)
+
+        # Shared by every probe and the final optimization
+        self.time_budget_seconds = time_budget_seconds
+        self.cancellation_token = cancellation_token
+
+        self.include_diagnostics = include_diagnostics
+        self.result_cache = result_cache
+
+        self.tolerance_step_percent = tolerance_step_percent
+        if self.parameter == RelaxationParameter.TOLERANCE:
+            self.max_steps = round(max_tolerance_percent / tolerance_step_percent)
+        else:
+            self.max_steps = max_emitters
+
+        self.probes = 0
+
+
+    def optimize(self) -> RelaxedOptimizationResponse:
+        """
+        :raises NoSolutionException: If even the widest relaxation has no solution.
+        :raises RequestTooComplexException: If the widest relaxation is rejected by the admission control.
+        :raises TimeoutError: If the time budget ran out before a relaxation was found.
+        """
+        self._start_time = time()
+        self._budget = self.time_budget_seconds if self.time_budget_seconds is not None else MAX_RUNTIME_SECONDS
+        # The unrelaxed optimization, the widest probe, the binary search and the final optimization
+        self._runs_left = 3 + math.ceil(math.log2(max(self.max_steps, 1)))
+
+        # A feasible request is not relaxed, one without a solution in its share of the time is
+        try:
+            return self._response(0, PerPlantOptimizer(self.request, **self._optimizer_arguments()).optimize())
+        except (NoSolutionException, TimeoutError):
+            pass
+
+        self._generate_combinations()
+        widest = self._feasible(self.max_steps)
+        if widest is None:
+            raise TimeoutError("Relaxation search found no solution within its time budget of {} seconds".format(self._budget))
+        if not widest:
+            raise NoSolutionException(
+                f"No solution found even with {self.parameter.value} relaxed by {self._amount(self.max_steps):g}"
+            )
+
+        # Infeasible at `low`, feasible at `high`
+        low, high = 0, self.max_steps
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._feasible(middle):
+                high = middle
+            else:
+                low = middle
+
+        optimizer = PerPlantOptimizer(
+            self._relaxed_request(high),
+            candidate_cache=self._candidate_cache(high),
+            **self._optimizer_arguments()
+        )
+        return self._response(high, optimizer.optimize())
+
+
+    def _optimizer_arguments(self) -> dict:
+        remaining = self._budget - (time() - self._start_time)
+        if remaining <= 0:
+            raise TimeoutError("Relaxation search exceeded its time budget of {} seconds".format(self._budget))
+
+        # Time a run does not use is left to the later ones, the final optimization gets the rest
+        time_budget_seconds = remaining / max(self._runs_left, 1)
+        self._runs_left -= 1
+
+        return {
+            "time_budget_seconds": time_budget_seconds,
+            "cancellation_token": self.cancellation_token,
+            "include_diagnostics": self.include_diagnostics,
+            "result_cache": self.result_cache
+        }
+
+
+    def _amount(self, steps: int) -> float:
+        if self.parameter == RelaxationParameter.TOLERANCE:
+            return round(steps * self.tolerance_step_percent, 6)
+        return steps
+
+
+    def _relaxed_request(self, steps: int) -> PerPlantOptimizationRequest:
+        if steps == 0:
+            return self.request
+
+        amount = self._amount(steps)
+        if self.parameter == RelaxationParameter.TOLERANCE:
+            plants = [plant.model_copy(update={"tolerance_percent": round(plant.tolerance_percent + amount, 6)}) for plant in self.request.plants]
+        else:
+            plants = [plant.model_copy(update={"max_emitter_quantity": plant.max_emitter_quantity + amount}) for plant in self.request.plants]
+
+        return self.request.model_copy(update={"plants": plants})
+
+
+    def _generate_combinations(self):
+        """
+        Candidates of every distinct plant at the widest relaxation, unreduced and in generation order.
+        """
+        widest = self._relaxed_request(self.max_steps)
+        check_admission(widest)
+
+        self._generator = PerPlantOptimizer(widest, candidate_cache=None)
+        self._combinations = {}
+        for plant, relaxed in zip(self.request.plants, widest.plants):
+            key = PerPlantOptimizer._plant_key(plant)
+            if key not in self._combinations:
+                self._combinations[key] = self._generator._generate_candidates_for_plant(relaxed)
+
+
+    def _candidate_cache(self, steps: int) -> CandidateCache:
+        """
+        Private candidate cache holding the reduced lists of the request relaxed by `steps`.
+        """
+        cache = CandidateCache(max_size=len(self._combinations) or 1)
+        for plant, relaxed in zip(self.request.plants, self._relaxed_request(steps).plants):
+            key = (PerPlantOptimizer._plant_key(relaxed), self._generator._catalog_key)
+            combinations = self._combinations[PerPlantOptimizer._plant_key(plant)]
+            cache.get_or_create(key, lambda: self._generator._reduce_candidates(self._derive(combinations, relaxed)))
+        return cache
+
+
+    def _derive(self, combinations: list[Candidate], plant) -> list[Candidate]:
+        """
+        Candidates of `plant` among the combinations generated at the widest relaxation.
+        """
+        if self.parameter == RelaxationParameter.MAX_EMITTERS:
+            return [c for c in combinations if c.emitters <= plant.max_emitter_quantity]
+
+        # Same T windows as the generation computes from the (identical) flows
+        min_volume, max_volume = PerPlantOptimizer._volume_window(plant)
+        if min_volume > max_volume:
+            return []
+        min_flow = PerPlantOptimizer._min_flow(min_volume)
+        return [
+            c._replace(t_min=PerPlantOptimizer._hours(min_volume, c.flow), t_max=PerPlantOptimizer._hours(max_volume, c.flow))
+            for c in combinations if c.flow >= min_flow
+        ]
+
+
+    def _feasible(self, steps: int) -> bool | None:
+        """
+        Whether the request relaxed by `steps` has a solution, None when the probe was interrupted before knowing.
+        """
+        self.probes += 1
+        arguments = self._optimizer_arguments()
+        arguments.update(include_diagnostics=False, result_cache=None)
+        probe = _FeasibilityProbe(self._relaxed_request(steps), candidate_cache=self._candidate_cache(steps), **arguments)
+        try:
+            probe.optimize()
+        except NoSolutionException:
+            return False
+        except TimeoutError:
+            return None
+        return True
+
+
+    def _response(self, steps: int, result) -> RelaxedOptimizationResponse:
+        return RelaxedOptimizationResponse(
+            result=result,
+            parameter=self.parameter,
+            relaxation=self._amount(steps),
+            plants=[
+                RelaxedPlant(
+                    plant_id=plant.plant_id,
+                    tolerance_percent=plant.tolerance_percent,
+                    max_emitter_quantity=plant.max_emitter_quantity
+                )
+                for plant in self._relaxed_request(steps).plants
+            ],
+            probes=self.probes
+        )
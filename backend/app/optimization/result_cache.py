@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from app.schemas.optimization import DripperAllocation, PerPlantOptimizationRequest, PerPlantOptimizationResponse
+
+
+OPTIMIZATION_RESULT_CACHE_SIZE = int(os.environ.get("OPTIMIZATION_RESULT_CACHE_SIZE", "512"))
+OPTIMIZATION_RESULT_CACHE_TTL_SECONDS = float(os.environ.get("OPTIMIZATION_RESULT_CACHE_TTL_SECONDS", "3600"))
+
+
+def request_fingerprint(request: PerPlantOptimizationRequest, engine: str = "") -> str | None:
+    """
+    Content hash of `request` for `engine`, independent of the order of plants and
+    drippers and of how the numbers were written (10 and 10.0 hash the same).
+
+    Returns None when plant or dripper ids are not unique, such requests are not cached
+    because a cached result could not be mapped back to their plants.
+    """
+    plant_ids = [plant.plant_id for plant in request.plants]
+    dripper_ids = [dripper.dripper_id for dripper in request.available_drippers]
+    if len(set(plant_ids)) != len(plant_ids) or len(set(dripper_ids)) != len(dripper_ids):
+        return None
+
+    canonical = {
+        "engine": engine,
+        "plants": sorted(
+            [plant.plant_id, _number(plant.target_volume_liters), _number(plant.tolerance_percent), plant.max_emitter_quantity]
+            for plant in request.plants
+        ),
+        "drippers": sorted(
+            [dripper.dripper_id, _number(dripper.flow_rate_lph), dripper.count]
+            for dripper in request.available_drippers
+        )
+    }
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+def _number(value: float) -> str:
+    # Adding 0.0 turns -0.0 into 0.0
+    return repr(float(value) + 0.0)
+
+
+class ResultCache:
+    """
+    Bounded LRU of proven optimal optimization results, keyed by `request_fingerprint`.
+
+    Entries expire `ttl_seconds` after they were stored. Every hit adds the run time of
+    the cached run to `saved_seconds`. Safe to use from the FastAPI worker threads.
+
+    An optional `store` (see `result_store.ResultStore`) is the second level: it is read
+    on a miss and written with every result. A failing store only counts `store_errors`,
+    the optimization itself never fails because of it.
+    """
+
+    def __init__(
+        self,
+        max_size: int = OPTIMIZATION_RESULT_CACHE_SIZE,
+        ttl_seconds: float = OPTIMIZATION_RESULT_CACHE_TTL_SECONDS,
+        store=None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries = OrderedDict()   # fingerprint -> (expires at, run seconds, response)
+        self._lock = Lock()
+        self.clear()
+
+
+    def get(self, key: str, request: PerPlantOptimizationRequest) -> PerPlantOptimizationResponse | None:
+        """
+        Cached result for `key`, in the plant and dripper order of `request`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= monotonic():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return _in_request_order(entry[2], request)
+
+        stored = self._call_store("get", key)
+
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+
+            response, run_seconds = stored
+            self._insert(key, response, run_seconds)
+            self.hits += 1
+            self.store_hits += 1
+            self.saved_seconds += run_seconds
+
+        return _in_request_order(response, request)
+
+
+    def put(self, key: str, response: PerPlantOptimizationResponse, run_seconds: float):
+        response = response.model_copy(update={"diagnostics": None}, deep=True)
+
+        with self._lock:
+            self._insert(key, response, run_seconds)
+
+        self._call_store("put", key, response, run_seconds)
+
+
+    def link_zone(self, key: str, zone_id: int) -> bool:
+        """
+        Link the stored result for `key` to the zone it was applied to (store only).
+        """
+        return bool(self._call_store("link_zone", key, zone_id))
+
+
+    def has_zone(self, zone_id: int) -> bool | None:
+        """
+        Whether the zone exists in the store, None without a store or when it failed.
+        """
+        return self._call_store("has_zone", zone_id)
+
+
+    def _insert(self, key, response, run_seconds):
+        self._entries[key] = (monotonic() + self.ttl_seconds, run_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def _call_store(self, method: str, *args):
+        if self.store is None:
+            return None
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception:
+            with self._lock:
+                self.store_errors += 1
+            return None
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.evictions = 0
+            self.saved_seconds = 0.0
+            self.store_hits = 0     # hits served by the store, included in `hits`
+            self.store_errors = 0
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 6),
+                "store_hits": self.store_hits,
+                "store_errors": self.store_errors
+            }
+
+
+def _in_request_order(response: PerPlantOptimizationResponse, request: PerPlantOptimizationRequest) -> PerPlantOptimizationResponse:
+    """
+    Copy of a cached response ordered like `request`, as the optimizer would order it:
+    plants in request order, each plant's drippers in catalog order and the summary
+    in order of first use.
+    """
+    results = {result.plant_id: result for result in response.plants}
+    dripper_position = {dripper.dripper_id: position for position, dripper in enumerate(request.available_drippers)}
+
+    plants = []
+    summary = {}
+    for plant in request.plants:
+        result = results[plant.plant_id]
+        assigned = sorted(
+            (allocation.model_copy() for allocation in result.assigned_drippers),
+            key=lambda allocation: dripper_position[allocation.dripper_id]
+        )
+        plants.append(result.model_copy(update={"assigned_drippers": assigned}))
+
+        for allocation in assigned:
+            if allocation.dripper_id not in summary:
+                summary[allocation.dripper_id] = DripperAllocation(
+                    dripper_id=allocation.dripper_id,
+                    flow_rate_lph=allocation.flow_rate_lph,
+                    count=0
+                )
+            summary[allocation.dripper_id].count += allocation.count
+
+    return response.model_copy(update={"plants": plants, "drippers_used_detail": list(summary.values())})
+
+
+# Process-wide result cache used by the optimization endpoints
+result_cache = ResultCache()
@@ -0,0 +1,89 @@
+import os
+
+from sqlmodel import Session
+
+from app.models.optimization_result import OptimizationResult
+from app.optimization.per_plant_optimizer import OPTIMIZER_VERSION
+from app.repositories.optimization_result_repository import OptimizationResultRepository
+from app.repositories.zone_repository import ZoneRepository
+from app.schemas.optimization import PerPlantOptimizationResponse
+
+
+class ResultStore:
+    """
+    Optimization results persisted in the application database, the second level
+    of `ResultCache`. Shared by all uvicorn workers and kept across restarts.
+
+    Only results of `optimizer_version` are read, results of other versions are
+    stale and removed by `purge_stale()`.
+    """
+
+    def __init__(self, engine, optimizer_version: str = OPTIMIZER_VERSION):
+        self.engine = engine
+        self.optimizer_version = optimizer_version
+        self._pid = os.getpid()
+
+
+    def get(self, key: str) -> tuple[PerPlantOptimizationResponse, float] | None:
+        """
+        Stored response for `key` and the run time that produced it.
+        """
+        with self._session() as session:
+            result = OptimizationResultRepository(session).get(key, self.optimizer_version)
+            if result is None:
+                return None
+            return PerPlantOptimizationResponse.model_validate(result.response), result.run_seconds
+
+
+    def put(self, key: str, response: PerPlantOptimizationResponse, run_seconds: float):
+        with self._session() as session:
+            OptimizationResultRepository(session).save(OptimizationResult(
+                request_hash=key,
+                optimizer_version=self.optimizer_version,
+                response=response.model_dump(mode="json", exclude={"diagnostics"}),
+                run_seconds=run_seconds
+            ))
+            session.commit()
+
+
+    def link_zone(self, key: str, zone_id: int) -> bool:
+        """
+        Link the stored result for `key` to the zone it was applied to.
+
+        A result is linked to a single zone, linking it again (the same request applied
+        to another zone) replaces the earlier link.
+
+        :return: False if no result is stored for `key`.
+        """
+        with self._session() as session:
+            repository = OptimizationResultRepository(session)
+            result = repository.get(key, self.optimizer_version)
+            if result is None:
+                return False
+            result.zone_id = zone_id
+            session.commit()
+            return True
+
+
+    def has_zone(self, zone_id: int) -> bool:
+        with self._session() as session:
+            return ZoneRepository(session).get(zone_id) is not None
+
+
+    def purge_stale(self) -> int:
+        """
+        Delete the results of other optimizer versions, return how many were deleted.
+        """
+        with self._session() as session:
+            deleted = OptimizationResultRepository(session).delete_stale(self.optimizer_version)
+            session.commit()
+            return deleted
+
+
+    def _session(self) -> Session:
+        # Connections must not be shared with a forked parent (e.g. batch worker processes)
+        if os.getpid() != self._pid:
+            self.engine.dispose(close=False)
+            self._pid = os.getpid()
+        return Session(self.engine)
+
@@ -0,0 +1,82 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from app.optimization.per_plant_optimizer import PreviousSolution
+
+
+OPTIMIZATION_SESSION_TTL_SECONDS = float(os.environ.get("OPTIMIZATION_SESSION_TTL_SECONDS", "1800"))
+OPTIMIZATION_SESSION_MAX = int(os.environ.get("OPTIMIZATION_SESSION_MAX", "256"))
+
+
+class SolutionSessionStore:
+    """
+    Last solution of each optimization session (the `X-Optimization-Session` header),
+    so that the next request of the session is re-optimized incrementally.
+
+    Bounded LRU, sessions idle for longer than `ttl_seconds` are dropped. Safe to use
+    from the FastAPI worker threads.
+    """
+
+    def __init__(self, ttl_seconds: float = OPTIMIZATION_SESSION_TTL_SECONDS, max_size: int = OPTIMIZATION_SESSION_MAX):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()   # session id -> (expires at, PreviousSolution)
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+
+    def get(self, session_id: str) -> PreviousSolution | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] <= monotonic():
+                del self._entries[session_id]
+                self.expired += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[1]
+
+
+    def put(self, session_id: str, previous: PreviousSolution):
+        with self._lock:
+            self._entries[session_id] = (monotonic() + self.ttl_seconds, previous)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.evictions = 0
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size
+            }
+
+
+# Process-wide session store used by the optimization endpoints
+solution_sessions = SolutionSessionStore()
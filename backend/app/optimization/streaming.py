@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from threading import BoundedSemaphore, Event
+from time import monotonic
+from typing import Iterator
+
+from app.optimization.cancellation import (
+    CancellationReason,
+    CancellationToken,
+    DISCONNECT_POLL_INTERVAL_SECONDS,
+    optimization_runs
+)
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.per_plant_optimizer import (
+    NoSolutionException,
+    InfeasibleSolutionException,
+    OptimizationCancelledException,
+    PreviousSolution
+)
+from app.optimization.result_cache import result_cache
+from app.optimization.sessions import solution_sessions
+from app.schemas.optimization import PerPlantOptimizationRequest
+
+
+# Improvements closer together than this are coalesced, only the latest one is sent
+OPTIMIZATION_STREAM_MIN_INTERVAL_SECONDS = float(os.environ.get("OPTIMIZATION_STREAM_MIN_INTERVAL_SECONDS", "0.1"))
+OPTIMIZATION_STREAM_WORKERS = int(os.environ.get("OPTIMIZATION_STREAM_WORKERS", "4"))
+OPTIMIZATION_STREAM_MAX_PENDING = int(os.environ.get("OPTIMIZATION_STREAM_MAX_PENDING", "8"))
+
+
+class StreamQueueFullException(Exception):
+    """
+    Raised when too many streamed optimizations are running or waiting to run.
+    """
+    def __init__(self, message):
+        super().__init__(message)
+
+
+# Streamed runs share a bounded pool, a slot is held from the start of a stream until its run finished
+_executor = ThreadPoolExecutor(max_workers=OPTIMIZATION_STREAM_WORKERS, thread_name_prefix="optimization-stream")
+_slots = BoundedSemaphore(OPTIMIZATION_STREAM_WORKERS + OPTIMIZATION_STREAM_MAX_PENDING)
+
+
+def stream_optimization(
+    request: PerPlantOptimizationRequest,
+    engine: OptimizationEngine = OptimizationEngine.NATIVE,
+    time_budget_seconds: float | None = None,
+    session_id: str | None = None,
+    min_interval: float = OPTIMIZATION_STREAM_MIN_INTERVAL_SECONDS,
+    include_diagnostics: bool = False,
+    disconnected: Event | None = None
+) -> Iterator[str]:
+    """
+    Start an optimization on the stream worker pool and return an iterator of its
+    progress as Server-Sent Events.
+
+    - `improvement`: a strictly better incumbent (OptimizationImprovement), at most one
+      per `min_interval`; a burst of improvements is reduced to its latest one.
+    - `result`: the final PerPlantOptimizationResponse, always the last event on success.
+    - `error`: the optimization failed, `data` is the error detail.
+
+    Closing the iterator (the client disconnected) cancels the optimization. A caller
+    that cannot close it while it waits for the next event sets `disconnected` instead,
+    the iterator then stops within DISCONNECT_POLL_INTERVAL_SECONDS. A newer
+    run of the same `session_id` cancels it as well. With a `session_id` the run starts
+    from the session's last solution and stores its own result for the next one.
+
+    :raises StreamQueueFullException: If `OPTIMIZATION_STREAM_MAX_PENDING` streams already wait for a worker.
+    :raises RequestTooComplexException: If the admission control rejects the request.
+    """
+    if not _slots.acquire(blocking=False):
+        raise StreamQueueFullException("Too many streamed optimizations running")
+
+    events = Queue()
+    token = optimization_runs.start(session_id)
+
+    try:
+        optimizer = create_optimizer(
+            request,
+            engine,
+            time_budget_seconds=time_budget_seconds,
+            on_improvement=lambda improvement: events.put(("improvement", improvement)),
+            cancellation_token=token,
+            include_diagnostics=include_diagnostics,
+            previous_solution=solution_sessions.get(session_id) if session_id is not None else None,
+            result_cache=result_cache
+        )
+    except Exception:
+        # No run to finish the token, e.g. rejected by the admission control
+        optimization_runs.finish(token)
+        _slots.release()
+        raise
+
+    def run():
+        try:
+            final = ("result", optimizer.optimize())
+            if session_id is not None:
+                solution_sessions.put(session_id, PreviousSolution(final[1], optimizer.candidate_lists))
+        except (NoSolutionException, InfeasibleSolutionException, OptimizationCancelledException) as e:
+            final = ("error", str(e))
+        except TimeoutError:
+            final = ("error", "Optimization timed out")
+        except Exception as e:
+            final = ("error", f"Optimization failed: {e}")
+
+        # Finish before the final event, so closing the stream afterwards is not a cancellation
+        optimization_runs.finish(token)
+        _slots.release()
+        events.put(final)
+
+    _executor.submit(run)
+    return _stream_events(events, token, min_interval, disconnected)
+
+
+def _stream_events(events: Queue, token: CancellationToken, min_interval: float, disconnected: Event | None) -> Iterator[str]:
+    try:
+        yield from _throttled_events(events, min_interval, disconnected)
+    finally:
+        # No-op when the run already finished
+        optimization_runs.cancel(token, CancellationReason.DISCONNECTED)
+
+
+def _throttled_events(events: Queue, min_interval: float, disconnected: Event | None) -> Iterator[str]:
+    pending = None
+    last_sent = None
+
+    while True:
+        timeout = None
+        if pending is not None:
+            timeout = max(0.0, last_sent + min_interval - monotonic())
+        if disconnected is not None:
+            timeout = DISCONNECT_POLL_INTERVAL_SECONDS if timeout is None else min(timeout, DISCONNECT_POLL_INTERVAL_SECONDS)
+
+        try:
+            event, payload = events.get(timeout=timeout)
+        except Empty:
+            if disconnected is not None and disconnected.is_set():
+                return
+            if pending is not None and monotonic() - last_sent >= min_interval:
+                # Throttle interval passed, send the improvement held back
+                yield _format_event("improvement", pending.model_dump_json())
+                last_sent = monotonic()
+                pending = None
+            continue
+
+        if event == "improvement":
+            if last_sent is None or monotonic() - last_sent >= min_interval:
+                yield _format_event(event, payload.model_dump_json())
+                last_sent = monotonic()
+                pending = None
+            else:
+                pending = payload
+            continue
+
+        # Final event, a held back improvement is superseded by the result
+        if event == "result":
+            yield _format_event(event, payload.model_dump_json())
+        else:
+            yield _format_event(event, payload)
+        return
+
+
+def _format_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
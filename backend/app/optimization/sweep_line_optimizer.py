@@ -0,0 +1,51 @@
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, MAX_TIME_HOURS
+from app.optimization.warm_start import sweep_selections
+
+
+class SweepLineOptimizer(PerPlantOptimizer):
+    """
+    Per-plant optimizer that sweeps the irrigation time T instead of walking the
+    product of all candidate lists.
+
+    The chosen T of any solution is the largest t_min of its candidates, so only
+    candidate t_min values (the events) have to be tried. At each event T every
+    plant takes its fewest-emitter candidate whose window contains T, which is
+    exact while no limited dripper type is involved. When the picks exceed the
+    inventory they are repaired greedily, so with limited drippers the result is
+    a feasible but not necessarily optimal allocation.
+
+    The sweep itself lives in `warm_start.sweep_selections`, which also seeds the
+    other engines.
+    """
+
+    def _warm_start(self):
+        # The warm start would run this same sweep
+        pass
+
+
+    def _search(self):
+        # Without plants there are no events, the empty selection is the solution
+        if not self._plant_candidates:
+            self._selection = []
+            self._record_solution(0, 0)
+            return
+
+        # Repaired picks are feasible but not necessarily optimal
+        self._heuristic = any(c.limited for candidates in self._plant_candidates for c in candidates)
+
+        event_count = len({
+            c.t_min for candidates in self._plant_candidates for c in candidates if c.t_min <= MAX_TIME_HOURS
+        })
+
+        for event_index, picks in enumerate(sweep_selections(self._plant_candidates, self._limits)):
+            self._check_runtime()
+            self.progress = event_index / event_count
+
+            if picks is None:
+                continue
+
+            self._selection = picks
+            self._record_solution(
+                sum(c.emitters for c in picks),
+                max(c.t_min for c in picks)
+            )
@@ -0,0 +1,104 @@
+from heapq import heappush, heappop
+from time import time
+
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, Candidate
+from app.schemas.optimization import TopKResponse
+
+
+# Upper limit of `k` accepted by the API
+MAX_TOP_K = 20
+
+
+class TopKOptimizer(PerPlantOptimizer):
+    """
+    Per-plant optimizer that finds the `k` best distinct solutions under the usual
+    objective (fewest emitters, then the shortest irrigation time).
+
+    The search keeps the k best solutions found so far in a bounded heap and prunes
+    against the k-th best instead of the best one, so the branch and bound (and its
+    tie handling) stays the same as in the native engine. Solutions are ordered by
+    objective and then by the order the search found them, the first one is the
+    native engine's solution.
+
+    Candidate reduction is disabled: a dominated candidate never improves the best
+    solution, but it can be part of the second best (e.g. one that uses an unlimited
+    dripper type instead of a scarce one). Assignments that only permute the
+    candidates of interchangeable plants count as the same solution.
+    """
+
+    def __init__(self, request, k: int = 3, **kwargs):
+        super().__init__(request, **kwargs)
+        self.k = k
+
+
+    def optimize_top_k(self) -> TopKResponse:
+        """
+        Up to `k` alternatives, best first. With a time budget the best ones found in
+        time are returned and `complete` is False.
+        """
+        # The result cache only knows the best solution, always search
+        self._optimize()
+
+        alternatives = [self._build_response((selection, T)) for _, T, selection in self._top]
+        return TopKResponse(
+            alternatives=alternatives,
+            complete=not self._interrupted,
+            diagnostics=self.diagnostics if self.include_diagnostics else None
+        )
+
+
+    def _warm_start(self):
+        # A seeded incumbent would prune the alternatives worse than the best solution
+        pass
+
+
+    def _seed_incumbent(self, picks):
+        pass
+
+
+    def _candidates_for_plant(self, plant) -> list[Candidate]:
+        """
+        Every candidate of `plant`, in the search order of the reduced lists.
+        """
+        key = (self._plant_key(plant), self._catalog_key, "unreduced")
+        candidates = self._candidate_cache.get_or_create(
+            key,
+            lambda: sorted(self._generate_candidates_for_plant(plant), key=lambda c: (c.emitters, c.t_min))
+        )
+        self.candidate_lists[key] = candidates
+        return candidates
+
+
+    def _search(self):
+        # Max-heap of the k best solutions as (-emitters, -T, -found, selection)
+        self._heap = []
+        self._found = 0
+
+        try:
+            super()._search()
+        finally:
+            ranked = sorted((-emitters, -T, -found, selection) for emitters, T, found, selection in self._heap)
+            self._top = [(emitters, T, selection) for emitters, T, _, selection in ranked]
+
+            # optimize() returns the best solution
+            if self._top:
+                self._best_emitters, self._best_T, self._best_selection = self._top[0]
+
+
+    def _record_solution(self, total_emitters, chosen_T):
+        # `_best_emitters` / `_best_T` hold the k-th best solution once k are known, the
+        # search prunes against them; an equal solution found later ranks after it
+        if len(self._heap) == self.k and (total_emitters, chosen_T) >= (self._best_emitters, self._best_T):
+            return
+
+        self._found += 1
+        heappush(self._heap, (-total_emitters, -chosen_T, -self._found, tuple(self._selection)))
+        if len(self._heap) > self.k:
+            heappop(self._heap)
+
+        if len(self._heap) == self.k:
+            self._best_emitters = -self._heap[0][0]
+            self._best_T = -self._heap[0][1]
+
+        if self._first_solution_seconds is None:
+            self._first_solution_seconds = time() - self._start_time
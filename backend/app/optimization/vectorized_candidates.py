@@ -0,0 +1,93 @@
+import numpy as np
+
+from app.optimization.per_plant_optimizer import Candidate
+
+
+def generate_candidates_vectorized(
+    optimizer,
+    plant,
+    min_volume,
+    max_volume,
+    min_flow,
+    merge_equivalent=True
+) -> list[Candidate]:
+    """
+    NumPy version of `PerPlantOptimizer._generate_combinations_recursive`.
+
+    Quantity vectors are built one dripper type at a time as integer arrays: every
+    surviving prefix is expanded with all quantities of the next type, and rows over
+    the emitter budget or unable to reach `min_flow` are masked out, exactly like the
+    recursion prunes its subtrees. Flows are exact integers (int64), so the rows match
+    the recursive candidates in the same (lexicographic) order, and their T windows are
+    computed by the same `_hours` on Python ints.
+
+    With `merge_equivalent`, rows with the same flow and limited dripper usage are
+    merged into the one `_reduce_candidates` would keep (fewest emitters, then first)
+    before any Candidate record is built. Reducing the result gives the same list as
+    reducing the recursive candidates, at a fraction of the materialization cost.
+    """
+    max_quantity = plant.max_emitter_quantity
+
+    counts = np.zeros((1, 0), dtype=np.int32)
+    flows = np.zeros(1, dtype=np.int64)
+    emitters = np.zeros(1, dtype=np.int32)
+
+    for dripper_index, dripper in enumerate(optimizer.drippers):
+        optimizer._check_generation_runtime()
+        cap = max_quantity if dripper.count is None else min(dripper.count, max_quantity)
+        quantities = np.arange(cap + 1, dtype=np.int32)
+        flow_units = optimizer._flow_units[dripper_index]
+
+        # Highest flow the remaining drippers can add, per remaining emitter budget
+        remaining_flow = np.array([
+            optimizer._max_remaining_flow(dripper_index + 1, budget)
+            for budget in range(max_quantity + 1)
+        ], dtype=np.int64)
+
+        # Each row expanded with every quantity, in row-major order
+        new_flows = (flows[:, None] + flow_units * quantities[None, :].astype(np.int64)).ravel()
+        new_emitters = (emitters[:, None] + quantities[None, :]).ravel()
+
+        budget = max_quantity - new_emitters
+        keep = budget >= 0
+        keep &= new_flows + remaining_flow[np.maximum(budget, 0)] >= min_flow
+
+        rows = np.repeat(np.arange(len(flows)), len(quantities))[keep]
+        counts = np.hstack([counts[rows], np.tile(quantities, len(flows))[keep][:, None]])
+        flows = new_flows[keep]
+        emitters = new_emitters[keep]
+
+    # The caller checked that the T window is not empty, it starts in time from `min_flow` on
+    feasible = (flows > 0) & (flows >= min_flow)
+    counts, flows, emitters = counts[feasible], flows[feasible], emitters[feasible]
+
+    limited = [limit is not None for limit in optimizer._limits]
+
+    if merge_equivalent and len(flows):
+        usage = counts[:, [index for index, is_limited in enumerate(limited) if is_limited]]
+
+        # Sort by (flow, usage, emitters, position) and keep the first row of every (flow, usage) group
+        keys = [np.arange(len(flows)), emitters] + [usage[:, column] for column in range(usage.shape[1] - 1, -1, -1)] + [flows]
+        order = np.lexsort(keys)
+        group_start = np.ones(len(order), dtype=bool)
+        group_start[1:] = flows[order[1:]] != flows[order[:-1]]
+        if usage.shape[1]:
+            group_start[1:] |= (usage[order[1:]] != usage[order[:-1]]).any(axis=1)
+
+        kept = np.sort(order[group_start])
+        counts, flows, emitters = counts[kept], flows[kept], emitters[kept]
+
+    candidates = []
+    for row, flow, row_emitters in zip(counts.tolist(), flows.tolist(), emitters.tolist()):
+        optimizer._generation_checkpoint()
+        allocations = tuple((index, count) for index, count in enumerate(row) if count)
+        candidates.append(Candidate(
+            allocations=allocations,
+            limited=tuple(alloc for alloc in allocations if limited[alloc[0]]),
+            flow=flow,
+            t_min=optimizer._hours(min_volume, flow),
+            t_max=optimizer._hours(max_volume, flow),
+            emitters=row_emitters
+        ))
+
+    return candidates
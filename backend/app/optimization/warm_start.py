@@ -0,0 +1,169 @@
+from heapq import heappush, heappop
+from typing import Iterator
+
+from app.optimization.per_plant_optimizer import Candidate, MAX_TIME_HOURS
+
+
+def sweep_selections(plant_candidates: list[list[Candidate]], limits: list[int | None]) -> Iterator[list[Candidate] | None]:
+    """
+    Sweep the irrigation time T over the candidate t_min values (the events), in
+    ascending order, and yield one item per event.
+
+    At each event T every plant takes its fewest-emitter candidate whose window
+    contains T. When the picks exceed the inventory they are repaired greedily
+    (`repair_inventory`). The selection is yielded only if it uses fewer emitters
+    than every selection yielded before (T only grows, so nothing else can be
+    better); None is yielded for all other events.
+
+    Without limited dripper types the last yielded selection is optimal.
+    """
+    # Interchangeable plants share one candidate list, sweep each list once
+    lists = []
+    list_of_position = []
+    for candidates in plant_candidates:
+        for list_index, known in enumerate(lists):
+            if known is candidates:
+                break
+        else:
+            list_index = len(lists)
+            lists.append(candidates)
+        list_of_position.append(list_index)
+
+    by_t_min = [sorted(candidates, key=lambda c: c.t_min) for candidates in lists]
+    next_to_add = [0] * len(lists)
+    active = [[] for _ in lists]    # heaps of (emitters, t_min, order, candidate)
+
+    has_limited = any(c.limited for candidates in lists for c in candidates)
+
+    events = sorted({c.t_min for candidates in lists for c in candidates if c.t_min <= MAX_TIME_HOURS})
+    best_emitters = float("inf")
+    vectors = {}
+
+    for T in events:
+        # Activate candidates starting at T, drop the ones that ended before T.
+        # T only grows, so dropped candidates never become active again.
+        for list_index, sorted_candidates in enumerate(by_t_min):
+            heap = active[list_index]
+            position = next_to_add[list_index]
+            while position < len(sorted_candidates) and sorted_candidates[position].t_min <= T:
+                candidate = sorted_candidates[position]
+                heappush(heap, (candidate.emitters, candidate.t_min, position, candidate))
+                position += 1
+            next_to_add[list_index] = position
+
+            while heap and heap[0][3].t_max < T:
+                heappop(heap)
+
+        if any(not heap for heap in active):
+            yield None
+            continue
+
+        picks = [active[list_index][0][3] for list_index in list_of_position]
+
+        # Repairs only add emitters, skip events that cannot improve before repairing
+        if sum(pick.emitters for pick in picks) >= best_emitters:
+            yield None
+            continue
+
+        if has_limited and not repair_inventory(picks, active, list_of_position, limits, T, best_emitters, vectors):
+            yield None
+            continue
+
+        emitters = sum(pick.emitters for pick in picks)
+        if emitters >= best_emitters:
+            yield None
+            continue
+
+        best_emitters = emitters
+        yield picks
+
+
+def repair_inventory(picks, active, list_of_position, limits, T, max_emitters=float("inf"), vectors=None) -> bool:
+    """
+    Greedily swap picks for other candidates active at T until no limited dripper
+    type is over its inventory. Each swap must use no more of any over-used type
+    and strictly less of at least one, so the loop terminates.
+
+    Returns False when the picks cannot be repaired, or the repair reaches
+    `max_emitters` (a solution that good is already known). `vectors` caches the
+    dense usage vector of each candidate (by id) between calls.
+    """
+    if vectors is None:
+        vectors = {}
+
+    def usage_vector(candidate):
+        vector = vectors.get(id(candidate))
+        if vector is None:
+            vector = [0] * len(limits)
+            for i, count in candidate.limited:
+                vector[i] = count
+            vectors[id(candidate)] = vector
+        return vector
+
+    usage = [0] * len(limits)
+    for pick in picks:
+        for i, count in pick.limited:
+            usage[i] += count
+    emitters = sum(pick.emitters for pick in picks)
+
+    limited_types = [i for i, limit in enumerate(limits) if limit is not None]
+
+    # Active candidates per list, cheapest first
+    alternatives = {}
+
+    while True:
+        over = [i for i in limited_types if usage[i] > limits[i]]
+        if not over:
+            return True
+        not_over = [i for i in limited_types if usage[i] <= limits[i]]
+
+        best_swap = None
+        scanned = set()
+
+        for position, pick in enumerate(picks):
+            pick_usage = usage_vector(pick)
+            if not any(pick_usage[i] for i in over):
+                continue
+
+            # Interchangeable plants with the same pick have the same swaps, the first one wins ties
+            list_index = list_of_position[position]
+            if (list_index, id(pick)) in scanned:
+                continue
+            scanned.add((list_index, id(pick)))
+
+            if list_index not in alternatives:
+                alternatives[list_index] = sorted(
+                    (entry for entry in active[list_index] if entry[3].t_max >= T),
+                    key=lambda entry: entry[:3]
+                )
+
+            for _, _, _, alternative in alternatives[list_index]:
+                # Alternatives are sorted by cost, stop once none can beat the best swap or the bound
+                cost = (alternative.emitters - pick.emitters, alternative.t_min)
+                if best_swap is not None and cost >= best_swap[0]:
+                    break
+                if emitters + cost[0] >= max_emitters:
+                    break
+
+                alternative_usage = usage_vector(alternative)
+                if any(alternative_usage[i] > pick_usage[i] for i in over):
+                    continue
+                if not any(alternative_usage[i] < pick_usage[i] for i in over):
+                    continue
+                if any(usage[i] - pick_usage[i] + alternative_usage[i] > limits[i] for i in not_over):
+                    continue
+
+                # Cheapest valid alternative of this plant, cheaper than the best swap so far
+                best_swap = (cost, position, alternative)
+                break
+
+        if best_swap is None:
+            return False
+
+        _, position, alternative = best_swap
+        emitters += alternative.emitters - picks[position].emitters
+        for i, count in picks[position].limited:
+            usage[i] -= count
+        for i, count in alternative.limited:
+            usage[i] += count
+        picks[position] = alternative
@@ -0,0 +1,52 @@
+from sqlmodel import Session, select, delete
+
+from app.models.optimization_result import OptimizationResult
+
+
+class OptimizationResultRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def get(self, request_hash: str, optimizer_version: str) -> OptimizationResult | None:
+        return self.session.exec(
+            select(OptimizationResult)
+            .where(OptimizationResult.request_hash == request_hash)
+            .where(OptimizationResult.optimizer_version == optimizer_version)
+        ).first()
+
+
+    def list_by_zone(self, zone_id: int) -> list[OptimizationResult]:
+        return self.session.exec(
+            select(OptimizationResult).where(OptimizationResult.zone_id == zone_id)
+        ).all()
+
+
+    def save(self, result: OptimizationResult) -> OptimizationResult:
+        """
+        Insert `result`, or replace the stored response of the same request hash and version.
+        A zone link of the stored result is kept unless `result` has its own.
+        """
+        existing = self.get(result.request_hash, result.optimizer_version)
+        if existing is None:
+            self.session.add(result)
+            self.session.flush()
+            return result
+
+        existing.response = result.response
+        existing.run_seconds = result.run_seconds
+        if result.zone_id is not None:
+            existing.zone_id = result.zone_id
+        self.session.flush()
+        return existing
+
+
+    def delete_stale(self, optimizer_version: str) -> int:
+        """
+        Delete results of every other optimizer version, return how many were deleted.
+        """
+        deleted = self.session.exec(
+            delete(OptimizationResult).where(OptimizationResult.optimizer_version != optimizer_version)
+        )
+        self.session.flush()
+        return deleted.rowcount
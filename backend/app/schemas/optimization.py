@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel
 
 
@@ -31,6 +33,19 @@ class PlantOptimizationResult(BaseModel):
     actual_volume_liters: float
     assigned_drippers: list[DripperAllocation]
 
+class OptimizationDiagnostics(BaseModel):
+    candidates_per_plant: list[int] # After reduction, in request order
+    nodes_visited: int
+    leaves_evaluated: int # Complete selections reached
+    infeasible_t_rejections: int # Branches cut because the T windows did not intersect
+    inventory_rejections: int # Branches cut because a limited dripper type ran out
+    bound_prunes: int # Branches cut because they could not beat the incumbent
+    generation_seconds: float
+    warm_start_seconds: float
+    search_seconds: float # Including the warm start
+    build_seconds: float = 0.0
+    previous_plants_reused: int = 0 # Plants that kept their allocation from the previous solution (incremental mode)
+
 class PerPlantOptimizationResponse(BaseModel):
     plants: list[PlantOptimizationResult]
     total_drippers_used: int
@@ -40,6 +55,199 @@ class PerPlantOptimizationResponse(BaseModel):
     total_flow_lph: float
     base_irrigation_time_seconds: float
 
+    # False when the search ran out of its time budget and returned the best solution found so far
+    proven_optimal: bool = True
+    emitters_lower_bound: int | None = None # No solution can use fewer emitters
+    optimality_gap: float = 0.0 # (total_drippers_used - emitters_lower_bound) / total_drippers_used
+    warm_start_drippers_used: int | None = None # Emitters of the greedy warm start solution, None if it found none
+
+    diagnostics: OptimizationDiagnostics | None = None # Only when requested
+
+
+class ReoptimizationRequest(BaseModel):
+    """
+    Edited zone together with the solution of its previous version.
+    """
+    request: PerPlantOptimizationRequest
+    previous: PerPlantOptimizationResponse
+
+
+class ParetoFrontResponse(BaseModel):
+    """
+    Non-dominated trade-offs between emitters and irrigation time, fewest emitters first.
+    Each alternative's optimality_gap is relative to the fewest-emitter alternative.
+    """
+    alternatives: list[PerPlantOptimizationResponse]
+    complete: bool # False when the time budget ran out before the whole front was searched
+    diagnostics: OptimizationDiagnostics | None = None # Of the whole search, only when requested
+
+
+class TopKResponse(BaseModel):
+    """
+    Best distinct solutions, best first. Each alternative's optimality_gap is relative to the best one.
+    """
+    alternatives: list[PerPlantOptimizationResponse]
+    complete: bool # False when the time budget ran out before the search finished
+    diagnostics: OptimizationDiagnostics | None = None # Of the whole search, only when requested
+
+
+class RelaxationParameter(str, Enum):
+    TOLERANCE = "tolerance" # tolerance_percent of every plant
+    MAX_EMITTERS = "max_emitters" # max_emitter_quantity of every plant
+
+class RelaxedPlant(BaseModel):
+    plant_id: str
+    tolerance_percent: float
+    max_emitter_quantity: int
+
+class RelaxedOptimizationResponse(BaseModel):
+    """
+    Solution of the nearest feasible version of a request: the smallest relaxation of
+    one parameter, added to every plant, that has a solution.
+    """
+    result: PerPlantOptimizationResponse
+    parameter: RelaxationParameter
+    relaxation: float # Added to the parameter of every plant, 0 when the request was feasible as it is
+    plants: list[RelaxedPlant] # Parameters the result satisfies, in request order
+    probes: int # Feasibility checks run by the relaxation search
+
+
+# Admission Schemas
+
+class PlantComplexity(BaseModel):
+    plant_id: str
+    candidates: int # Upper bound of the plant's candidates, exact when `exact`
+    exact: bool # The reduced candidate list was already cached
+    search_space_log10: float | None = None # Share of the plant in the search space, None if it has no candidates
+
+class ComplexityEstimate(BaseModel):
+    """
+    Pre-flight size of a request's search, computed before any search runs.
+    """
+    plants: list[PlantComplexity] # In request order
+    search_space_log10: float | None # Selections to search (interchangeable plants counted once), None if a plant has no candidates
+    recommended_engine: str # Engine the `auto` engine runs
+    admitted: bool
+    rejected_plants: list[str] = [] # Plants with more candidates than allowed
+    reason: str | None = None # Why the request is not admitted
+
+
+# Streaming Schemas
+
+class OptimizationImprovement(BaseModel):
+    """
+    Strictly better solution found while the optimization is still running.
+    """
+    total_drippers_used: int
+    base_irrigation_time_seconds: float
+    elapsed_seconds: float
+    nodes_explored: int
+
+
+# Batch Schemas
+
+class BatchOptimizationItem(PerPlantOptimizationRequest):
+    zone_id: int | None = None # Optional id of the zone, echoed in the result
+
+class BatchOptimizationRequest(BaseModel):
+    items: list[BatchOptimizationItem]
+
+class BatchOptimizationResultItem(BaseModel):
+    index: int # Position of the item in the request
+    zone_id: int | None = None
+    result: PerPlantOptimizationResponse | None = None
+    error: str | None = None
+
+class BatchOptimizationResponse(BaseModel):
+    items: list[BatchOptimizationResultItem] # In request order
+    succeeded: int
+    failed: int
+
+
+# Job Schemas
+
+class OptimizationJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class OptimizationJobRead(BaseModel):
+    job_id: str
+    status: OptimizationJobStatus
+    progress: float # 0..1, share of the search done
+    result: PerPlantOptimizationResponse | None = None
+    error: str | None = None
+
+
+# Monitoring Schemas
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+class ResultCacheStats(BaseModel):
+    hits: int
+    misses: int
+    expired: int
+    evictions: int
+    size: int
+    max_size: int
+    hit_ratio: float
+    saved_seconds: float # Run time of the cached runs, summed over all hits
+    store_hits: int = 0 # Hits served by the persistent result store
+    store_errors: int = 0
+
+class SessionStats(BaseModel):
+    hits: int
+    misses: int
+    expired: int
+    evictions: int
+    size: int
+    max_size: int
+
+class OptimizationRunStats(BaseModel):
+    active: int
+    cancelled_disconnected: int
+    cancelled_superseded: int
+
+class SlowRun(BaseModel):
+    total_seconds: float
+    timed_out: bool
+    plant_count: int
+    candidates_per_plant: list[int]
+    nodes_visited: int
+
+class SearchStats(BaseModel):
+    runs: int
+    timeouts: int
+    warm_start_found: int
+    warm_start_optimal: int
+    mean_warm_start_gap: float
+    mean_first_solution_seconds: float
+
+    # Totals over all runs, including timed out ones
+    nodes_visited: int
+    leaves_evaluated: int
+    infeasible_t_rejections: int
+    inventory_rejections: int
+    bound_prunes: int
+    generation_seconds: float
+    search_seconds: float
+    build_seconds: float
+
+    slowest_runs: list[SlowRun] # Slowest first
+
+class OptimizationMetricsResponse(BaseModel):
+    candidate_cache: CacheStats
+    runs: OptimizationRunStats
+    search: SearchStats
+    results: ResultCacheStats
+    sessions: SessionStats
+
 
 # Error Response Schema
 
@@ -0,0 +1,12 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import optimization
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(optimization.router, prefix="/optimization")
+    return TestClient(app)
@@ -0,0 +1,81 @@
+from itertools import product
+
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, MAX_TIME_HOURS
+from app.schemas.optimization import PerPlantOptimizationRequest
+
+
+# --------- shared requests ---------
+
+def mixed_inventory_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "p1", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "p2", "target_volume_liters": 12, "tolerance_percent": 15, "max_emitter_quantity": 4},
+            {"plant_id": "p3", "target_volume_liters": 5, "tolerance_percent": 20, "max_emitter_quantity": 3}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 1}
+        ]
+    )
+
+
+def hedge_row_request(count):
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": f"shrub_{i}", "target_volume_liters": 16, "tolerance_percent": 5, "max_emitter_quantity": 8}
+            for i in range(count)
+        ],
+        available_drippers=[
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 3},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 4},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d1", "flow_rate_lph": 1.3, "count": None}
+        ]
+    )
+
+
+# --------- request payloads ---------
+
+TWO_PLANT_REQUEST_DATA = {
+    "plants": [
+        {"plant_id": "p1", "target_volume_liters": 10, "tolerance_percent": 10, "max_emitter_quantity": 5},
+        {"plant_id": "p2", "target_volume_liters": 20, "tolerance_percent": 20, "max_emitter_quantity": 10}
+    ],
+    "available_drippers": [
+        {"dripper_id": "dripper_a", "flow_rate_lph": 2, "count": None},
+        {"dripper_id": "dripper_b", "flow_rate_lph": 5, "count": None}
+    ]
+}
+
+# 0% tolerance on 10 l with a single 1 l/h emitter cannot be met
+INFEASIBLE_REQUEST_DATA = {
+    "plants": [{"plant_id": "p1", "target_volume_liters": 10, "tolerance_percent": 0, "max_emitter_quantity": 1}],
+    "available_drippers": [{"dripper_id": "tiny", "flow_rate_lph": 1, "count": None}]
+}
+
+
+# --------- brute force ---------
+
+def feasible_objectives(request):
+    """
+    (emitters, T in hours) of every feasible combination of unreduced candidates, one per plant.
+    """
+    optimizer = PerPlantOptimizer(request)
+    candidate_lists = [optimizer._generate_candidates_for_plant(plant) for plant in request.plants]
+
+    objectives = []
+    for selection in product(*candidate_lists):
+        t_min = max(c.t_min for c in selection)
+        if t_min > min(min(c.t_max for c in selection), MAX_TIME_HOURS):
+            continue
+        usage = [0] * len(optimizer._limits)
+        for c in selection:
+            for i, count in c.limited:
+                usage[i] += count
+        if any(limit is not None and used > limit for used, limit in zip(usage, optimizer._limits)):
+            continue
+        objectives.append((sum(c.emitters for c in selection), t_min))
+
+    return objectives
@@ -0,0 +1,138 @@
+from pytest import raises
+
+from app.optimization.admission import (
+    OPTIMIZATION_EXACT_MAX_LOG10,
+    OPTIMIZATION_MAX_PLANT_CANDIDATES,
+    RequestTooComplexException,
+    estimate_complexity,
+    _combination_count
+)
+from app.optimization.candidate_cache import CandidateCache
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.milp_optimizer import MilpOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.optimization.sweep_line_optimizer import SweepLineOptimizer
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.tests.helpers import hedge_row_request, mixed_inventory_request
+
+
+def _exploding_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "small", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "huge", "target_volume_liters": 400, "tolerance_percent": 10, "max_emitter_quantity": 60}
+        ],
+        available_drippers=[
+            {"dripper_id": f"d{i}", "flow_rate_lph": 1 + i * 0.7, "count": None}
+            for i in range(8)
+        ]
+    )
+
+
+def test_candidate_bound_is_exact_without_the_time_limit():
+    # Brute force of the vectors with 1 to 5 emitters, limits 2 and unlimited twice
+    limits = [2, None, None]
+    expected = sum(
+        1
+        for a in range(3) for b in range(6) for c in range(6)
+        if 1 <= a + b + c <= 5
+    )
+    assert _combination_count(5, limits, cap=1000) == expected
+    assert _combination_count(5, [0, 0], cap=1000) == 0
+
+    # Bound of the generated candidates, exact once the reduced list is cached
+    request = mixed_inventory_request()
+    optimizer = PerPlantOptimizer(request, candidate_cache=CandidateCache())
+    for plant, estimated in zip(request.plants, estimate_complexity(request, candidate_cache=None).plants):
+        assert not estimated.exact
+        assert estimated.candidates >= len(optimizer._generate_candidates_for_plant(plant))
+
+    cache = CandidateCache()
+    PerPlantOptimizer(request, candidate_cache=cache).optimize()
+    diagnostics = PerPlantOptimizer(request, include_diagnostics=True).optimize().diagnostics
+    estimate = estimate_complexity(request, candidate_cache=cache)
+    assert [plant.candidates for plant in estimate.plants] == diagnostics.candidates_per_plant
+    assert all(plant.exact for plant in estimate.plants)
+    assert cache.stats()["hits"] == 0
+
+
+def test_engine_follows_the_search_space():
+    # Interchangeable plants count as multisets
+    hedge = estimate_complexity(hedge_row_request(6), candidate_cache=None)
+    assert hedge.search_space_log10 < 6 * 3
+    assert hedge.recommended_engine == "native"
+
+    assert estimate_complexity(hedge_row_request(6), candidate_cache=None, exact_max_log10=5).recommended_engine == "milp"
+    assert estimate_complexity(hedge_row_request(6), candidate_cache=None, exact_max_log10=5, solver_max_log10=10).recommended_engine == "sweep_line"
+
+    assert isinstance(create_optimizer(mixed_inventory_request(), OptimizationEngine.AUTO), PerPlantOptimizer)
+    assert type(create_optimizer(hedge_row_request(20), OptimizationEngine.AUTO)) in (MilpOptimizer, SweepLineOptimizer)
+
+
+def test_exploding_plants_are_rejected(client):
+    estimate = estimate_complexity(_exploding_request(), candidate_cache=None)
+
+    assert not estimate.admitted
+    assert estimate.rejected_plants == ["huge"]
+    assert "huge" in estimate.reason
+
+    # The dry run answers either way, optimizing is rejected before any candidate is generated
+    dry_run = client.post("/optimization/per-plant/estimate", json=_exploding_request().model_dump())
+    assert dry_run.status_code == 200
+    assert dry_run.json()["rejected_plants"] == ["huge"]
+
+    for path in ("/optimization/per-plant", "/optimization/per-plant/stream", "/optimization/per-plant/top-k", "/optimization/jobs"):
+        response = client.post(path, json=_exploding_request().model_dump())
+        assert response.status_code == 422
+        assert response.json()["detail"]["plants"] == ["huge"]
+        assert response.json()["detail"]["estimate"]["plants"][1]["candidates"] > OPTIMIZATION_MAX_PLANT_CANDIDATES
+
+    response = client.post("/optimization/per-plant?engine=auto", json=mixed_inventory_request().model_dump())
+    assert response.status_code == 200
+
+
+def _distinct_plants_request():
+    # Few candidates per plant, but no two plants are interchangeable
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": f"p{i}", "target_volume_liters": 6 + i, "tolerance_percent": 10, "max_emitter_quantity": 6}
+            for i in range(15)
+        ],
+        available_drippers=[
+            {"dripper_id": f"d{i}", "flow_rate_lph": 1 + i * 0.7, "count": None}
+            for i in range(8)
+        ]
+    )
+
+
+def test_large_search_spaces_are_admitted_on_every_engine(client):
+    request = _distinct_plants_request()
+    estimate = estimate_complexity(request, candidate_cache=None)
+
+    # Far above the exact range of `auto`, but branch and bound only visits a few thousand nodes
+    assert estimate.admitted
+    assert estimate.search_space_log10 > OPTIMIZATION_EXACT_MAX_LOG10
+    assert abs(sum(plant.search_space_log10 for plant in estimate.plants) - estimate.search_space_log10) < 0.1
+    assert type(create_optimizer(request, OptimizationEngine.AUTO)) in (MilpOptimizer, SweepLineOptimizer)
+
+    response = client.post("/optimization/per-plant", json=request.model_dump())
+    assert response.status_code == 200
+    assert response.json()["proven_optimal"]
+
+    # Interchangeable plants share their multisets
+    hedge = estimate_complexity(hedge_row_request(4), candidate_cache=None)
+    assert len({plant.search_space_log10 for plant in hedge.plants}) == 1
+
+
+def test_too_many_candidates_are_rejected_on_every_engine(client):
+    request = _exploding_request()
+
+    for engine in OptimizationEngine:
+        with raises(RequestTooComplexException):
+            create_optimizer(request, engine)
+
+        response = client.post(f"/optimization/per-plant?engine={engine.value}", json=request.model_dump())
+        assert response.status_code == 422
+        plants = response.json()["detail"]["estimate"]["plants"]
+        assert [plant["plant_id"] for plant in plants] == ["small", "huge"]
+        assert plants[0]["search_space_log10"] > 0
@@ -0,0 +1,61 @@
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.candidate_cache import CandidateCache
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+
+
+def _hedge_request(drippers):
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": f"shrub_{i}", "target_volume_liters": 12, "tolerance_percent": 10, "max_emitter_quantity": 6}
+            for i in range(4)
+        ],
+        available_drippers=drippers
+    )
+
+
+def test_lru_counts_hits_misses_and_evictions():
+    cache = CandidateCache(max_size=2)
+
+    assert cache.get_or_create("a", lambda: 1) == 1
+    assert cache.get_or_create("b", lambda: 2) == 2
+    assert cache.get_or_create("a", lambda: 100) == 1     # hit, "a" becomes most recent
+    assert cache.get_or_create("c", lambda: 3) == 3       # evicts "b"
+    assert cache.get_or_create("b", lambda: 20) == 20     # miss again, evicts "a"
+
+    assert cache.stats() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "max_size": 2}
+
+
+def test_identical_plants_share_candidates():
+    cache = CandidateCache(max_size=8)
+    request = _hedge_request([
+        {"dripper_id": "small", "flow_rate_lph": 2, "count": None},
+        {"dripper_id": "big", "flow_rate_lph": 4, "count": None}
+    ])
+
+    optimizer = PerPlantOptimizer(request, candidate_cache=cache)
+    optimizer.optimize()
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 3
+    assert all(candidates is optimizer._plant_candidates[0] for candidates in optimizer._plant_candidates)
+
+
+def test_reordered_catalog_reuses_candidates_and_keeps_request_order():
+    cache = CandidateCache(max_size=8)
+    drippers = [
+        {"dripper_id": "big", "flow_rate_lph": 4, "count": None},
+        {"dripper_id": "small", "flow_rate_lph": 2, "count": 3}
+    ]
+
+    first = PerPlantOptimizer(_hedge_request(drippers), candidate_cache=cache).optimize()
+    second = PerPlantOptimizer(_hedge_request(list(reversed(drippers))), candidate_cache=cache).optimize()
+
+    assert cache.stats()["misses"] == 1
+    assert first.total_drippers_used == second.total_drippers_used
+    assert first.base_irrigation_time_seconds == second.base_irrigation_time_seconds
+
+    # Allocations are reported in the dripper order of each request
+    for result, order in ((first, ["big", "small"]), (second, ["small", "big"])):
+        for plant in result.plants:
+            ids = [alloc.dripper_id for alloc in plant.assigned_drippers]
+            assert ids == [dripper_id for dripper_id in order if dripper_id in ids]
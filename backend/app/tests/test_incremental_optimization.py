@@ -0,0 +1,132 @@
+import pytest
+
+from app.optimization import sessions
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, PreviousSolution
+from app.optimization.sessions import SolutionSessionStore, solution_sessions
+from app.tests.helpers import hedge_row_request, mixed_inventory_request
+
+
+def _edited(request, plant_index, **changes):
+    plants = list(request.plants)
+    plants[plant_index] = plants[plant_index].model_copy(update=changes)
+    return request.model_copy(update={"plants": plants})
+
+
+def _without_seed(response):
+    return response.model_copy(update={"warm_start_drippers_used": None, "diagnostics": None})
+
+
+@pytest.fixture
+def client(client):
+    solution_sessions.clear()
+    yield client
+    solution_sessions.clear()
+
+
+# --------- incremental optimizer ---------
+
+def test_incremental_result_matches_fresh_run():
+    for request in (mixed_inventory_request(), hedge_row_request(6)):
+        first = PerPlantOptimizer(request)
+        previous = PreviousSolution(first.optimize(), first.candidate_lists)
+
+        for edited in (request, _edited(request, 1, target_volume_liters=request.plants[1].target_volume_liters + 1.5)):
+            incremental = PerPlantOptimizer(edited, previous_solution=previous, include_diagnostics=True).optimize()
+            fresh = PerPlantOptimizer(edited).optimize()
+
+            assert _without_seed(incremental) == _without_seed(fresh)
+            assert incremental.diagnostics.previous_plants_reused >= len(edited.plants) - 1
+
+
+def test_unchanged_plants_reuse_previous_candidates():
+    request = mixed_inventory_request()
+    first = PerPlantOptimizer(request, candidate_cache=None)
+    previous = PreviousSolution(first.optimize(), first.candidate_lists)
+
+    edited = _edited(request, 0, tolerance_percent=12)
+    second = PerPlantOptimizer(edited, candidate_cache=None, previous_solution=previous)
+    second.optimize()
+
+    for key, candidates in second.candidate_lists.items():
+        if key in first.candidate_lists:
+            assert candidates is first.candidate_lists[key]
+    assert len(set(second.candidate_lists) - set(first.candidate_lists)) == 1
+
+
+def test_previous_solution_seeds_the_search():
+    request = mixed_inventory_request()
+    previous = PreviousSolution(PerPlantOptimizer(request).optimize())
+
+    seeded = PerPlantOptimizer(request, warm_start=False, previous_solution=previous, include_diagnostics=True).optimize()
+    unseeded = PerPlantOptimizer(request, warm_start=False, include_diagnostics=True).optimize()
+
+    assert seeded.warm_start_drippers_used == previous.response.total_drippers_used
+    assert seeded.diagnostics.previous_plants_reused == len(request.plants)
+    assert seeded.diagnostics.nodes_visited < unseeded.diagnostics.nodes_visited
+
+
+def test_unusable_previous_solution_falls_back_to_warm_start():
+    request = mixed_inventory_request()
+    previous = PreviousSolution(PerPlantOptimizer(request).optimize())
+
+    # Removing the limited drippers invalidates every previous allocation using them
+    edited = request.model_copy(update={"available_drippers": [
+        dripper for dripper in request.available_drippers if dripper.count is None
+    ]})
+    result = PerPlantOptimizer(edited, previous_solution=previous).optimize()
+
+    assert _without_seed(result) == _without_seed(PerPlantOptimizer(edited).optimize())
+
+
+# --------- session store ---------
+
+def test_session_store_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(sessions, "monotonic", lambda: now[0])
+    store = SolutionSessionStore(ttl_seconds=10, max_size=2)
+    previous = PreviousSolution(PerPlantOptimizer(mixed_inventory_request()).optimize())
+
+    store.put("a", previous)
+    store.put("b", previous)
+    assert store.get("a") is previous
+    store.put("c", previous)    # evicts "b", the least recently used
+
+    assert store.get("b") is None
+    now[0] += 11
+    assert store.get("a") is None
+    assert store.stats() == {"hits": 1, "misses": 2, "expired": 1, "evictions": 1, "size": 1, "max_size": 2}
+
+
+# --------- API ---------
+
+def test_session_requests_are_reoptimized_incrementally(client):
+    request = mixed_inventory_request()
+    headers = {"X-Optimization-Session": "wizard"}
+
+    first = client.post("/optimization/per-plant", json=request.model_dump(), headers=headers)
+    assert first.status_code == 200
+
+    edited = _edited(request, 2, target_volume_liters=6)
+    second = client.post("/optimization/per-plant?diagnostics=true", json=edited.model_dump(), headers=headers)
+    assert second.status_code == 200
+    assert second.json()["diagnostics"]["previous_plants_reused"] >= 2
+
+    fresh = PerPlantOptimizer(edited).optimize()
+    assert second.json()["total_drippers_used"] == fresh.total_drippers_used
+    assert second.json()["plants"] == [plant.model_dump() for plant in fresh.plants]
+    assert solution_sessions.stats()["hits"] == 1
+
+
+def test_reoptimize_endpoint(client):
+    request = hedge_row_request(4)
+    previous = PerPlantOptimizer(request).optimize()
+    edited = _edited(request, 0, tolerance_percent=8)
+
+    response = client.post(
+        "/optimization/per-plant/reoptimize?diagnostics=true",
+        json={"request": edited.model_dump(), "previous": previous.model_dump()}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["diagnostics"]["previous_plants_reused"] >= 3
+    assert response.json()["total_drippers_used"] == PerPlantOptimizer(edited).optimize().total_drippers_used
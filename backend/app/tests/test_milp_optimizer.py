@@ -0,0 +1,91 @@
+import pytest
+
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.milp_optimizer import MilpOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, NoSolutionException
+
+
+def _nursery_request(plant_count):
+    return PerPlantOptimizationRequest(
+        plants=[
+            {
+                "plant_id": f"p{i}",
+                "target_volume_liters": 6 + (i % 5) * 2,
+                "tolerance_percent": 10 + (i % 3) * 5,
+                "max_emitter_quantity": 5
+            }
+            for i in range(plant_count)
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": plant_count // 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 3}
+        ]
+    )
+
+
+def test_milp_matches_native_engine_with_limited_inventory():
+    pytest.importorskip("scipy")
+    request = _nursery_request(6)
+
+    native = PerPlantOptimizer(request).optimize()
+    optimizer = MilpOptimizer(request)
+    result = optimizer.optimize()
+
+    assert not optimizer.used_fallback
+    assert result.total_drippers_used == native.total_drippers_used
+    assert result.base_irrigation_time_seconds == native.base_irrigation_time_seconds
+
+    used = {d.dripper_id: d.count for d in result.drippers_used_detail}
+    assert used.get("d4", 0) <= 3
+    assert used.get("d8", 0) <= 3
+
+
+def test_milp_solves_large_nursery_zone():
+    pytest.importorskip("scipy")
+    request = _nursery_request(24)
+
+    optimizer = MilpOptimizer(request)
+    result = optimizer.optimize()
+
+    assert not optimizer.used_fallback
+    assert len(result.plants) == 24
+    used = {d.dripper_id: d.count for d in result.drippers_used_detail}
+    assert used.get("d4", 0) <= 12
+    assert used.get("d8", 0) <= 3
+
+
+def test_milp_reports_infeasible_inventory():
+    pytest.importorskip("scipy")
+    request = PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "p1", "target_volume_liters": 10, "tolerance_percent": 0, "max_emitter_quantity": 1},
+            {"plant_id": "p2", "target_volume_liters": 10, "tolerance_percent": 0, "max_emitter_quantity": 1}
+        ],
+        available_drippers=[{"dripper_id": "big", "flow_rate_lph": 5, "count": 1}]
+    )
+
+    with pytest.raises(NoSolutionException):
+        MilpOptimizer(request).optimize()
+
+
+def test_milp_falls_back_to_native_engine(monkeypatch):
+    request = _nursery_request(4)
+    monkeypatch.setattr(MilpOptimizer, "_solve_milp", lambda self: False)
+
+    optimizer = MilpOptimizer(request)
+    result = optimizer.optimize()
+
+    assert optimizer.used_fallback
+    assert result == PerPlantOptimizer(request).optimize()
+
+
+def test_milp_handles_empty_zone():
+    request = PerPlantOptimizationRequest(plants=[], available_drippers=[{"dripper_id": "d2", "flow_rate_lph": 2, "count": None}])
+
+    optimizer = MilpOptimizer(request)
+    result = optimizer.optimize()
+
+    assert result == PerPlantOptimizer(request).optimize()
+    assert result.total_drippers_used == 0
+    assert not optimizer.used_fallback
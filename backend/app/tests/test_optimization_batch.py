@@ -0,0 +1,92 @@
+import pytest
+
+from app.optimization import batch
+from app.optimization.batch import BatchOptimizer, BatchTooLargeException
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.schemas.optimization import BatchOptimizationItem
+
+
+DRIPPERS = [
+    {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+    {"dripper_id": "d4", "flow_rate_lph": 4, "count": 3},
+    {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+]
+
+
+def _zone(zone_id, volumes):
+    return {
+        "zone_id": zone_id,
+        "plants": [
+            {"plant_id": f"{zone_id}-p{i}", "target_volume_liters": volume, "tolerance_percent": 10, "max_emitter_quantity": 5}
+            for i, volume in enumerate(volumes)
+        ],
+        "available_drippers": DRIPPERS
+    }
+
+
+ZONES = [
+    _zone(1, [6, 9, 12]),
+    # 0% tolerance on 10 l with a single emitter cannot be met
+    {
+        "zone_id": 2,
+        "plants": [{"plant_id": "x", "target_volume_liters": 10, "tolerance_percent": 0, "max_emitter_quantity": 1}],
+        "available_drippers": [{"dripper_id": "tiny", "flow_rate_lph": 1, "count": None}]
+    },
+    _zone(3, [16, 16, 16, 16]),
+    _zone(None, [5])
+]
+
+
+@pytest.fixture(params=[1, 2], ids=["in-thread", "process-pool"])
+def batch_optimizer(request):
+    optimizer = BatchOptimizer(workers=request.param)
+    yield optimizer
+    optimizer.shutdown()
+
+
+def test_batch_returns_results_and_errors_per_item(batch_optimizer):
+    items = [BatchOptimizationItem(**zone) for zone in ZONES]
+
+    response = batch_optimizer.optimize(items)
+
+    assert (response.succeeded, response.failed) == (3, 1)
+    assert [item.index for item in response.items] == [0, 1, 2, 3]
+    assert [item.zone_id for item in response.items] == [1, 2, 3, None]
+
+    failed = response.items[1]
+    assert failed.result is None and "No candidates found" in failed.error
+
+    for item, batch_item in zip(items, response.items):
+        if batch_item.error is None:
+            assert batch_item.result == PerPlantOptimizer(item).optimize()
+
+
+def test_batch_does_not_wait_for_workers_past_the_runtime_limit(monkeypatch):
+    # Starting the spawned workers alone takes longer than the limit
+    monkeypatch.setattr(batch, "BATCH_ITEM_OVERHEAD_SECONDS", 0)
+    optimizer = BatchOptimizer(workers=2)
+
+    try:
+        response = optimizer.optimize([BatchOptimizationItem(**zone) for zone in ZONES], time_budget_seconds=0.001)
+    finally:
+        optimizer.shutdown()
+
+    assert response.failed == len(ZONES)
+    assert {item.error for item in response.items} == {"Optimization timed out"}
+
+
+def test_batch_size_is_limited():
+    optimizer = BatchOptimizer(workers=1, max_items=2)
+
+    with pytest.raises(BatchTooLargeException):
+        optimizer.optimize([BatchOptimizationItem(**zone) for zone in ZONES])
+
+
+def test_batch_endpoint(client):
+    response = client.post("/optimization/per-plant/batch", json={"items": ZONES[:2]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["items"][0]["result"]["total_drippers_used"] > 0
+    assert body["items"][1]["error"]
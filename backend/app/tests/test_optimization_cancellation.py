@@ -0,0 +1,158 @@
+import asyncio
+from threading import Event
+from time import monotonic, sleep
+
+import pytest
+
+from app.api.v1.optimization import _run_until_disconnected, _stream_until_disconnected
+from app.optimization import per_plant_optimizer
+from app.optimization.cancellation import CancellationReason, OptimizationRunRegistry, optimization_runs
+from app.optimization.parallel_optimizer import ParallelOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, OptimizationCancelledException
+from app.optimization.streaming import stream_optimization
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.tests.helpers import TWO_PLANT_REQUEST_DATA, hedge_row_request
+
+
+def test_newer_run_of_session_supersedes_older():
+    registry = OptimizationRunRegistry()
+
+    first = registry.start("wizard")
+    other_session = registry.start("other")
+    second = registry.start("wizard")
+
+    assert first.cancelled and first.reason == CancellationReason.SUPERSEDED
+    assert not second.cancelled and not other_session.cancelled
+    assert registry.stats() == {"active": 3, "cancelled_disconnected": 0, "cancelled_superseded": 1}
+
+
+def test_finished_runs_are_not_cancelled():
+    registry = OptimizationRunRegistry()
+
+    with registry.run("wizard") as token:
+        pass
+
+    assert not registry.cancel(token, CancellationReason.DISCONNECTED)
+    assert not token.cancelled
+    assert registry.start("wizard") is not token
+    assert registry.stats()["cancelled_disconnected"] == 0
+
+
+def test_cancelled_token_stops_the_search(monkeypatch):
+    monkeypatch.setattr(per_plant_optimizer, "RUNTIME_CHECK_INTERVAL", 1)
+    registry = OptimizationRunRegistry()
+    token = registry.start()
+
+    # Cancel as soon as the first solution is found
+    optimizer = PerPlantOptimizer(
+        hedge_row_request(6),
+        cancellation_token=token,
+        on_improvement=lambda improvement: registry.cancel(token, CancellationReason.DISCONNECTED)
+    )
+
+    with pytest.raises(OptimizationCancelledException):
+        optimizer.optimize()
+    assert registry.stats()["cancelled_disconnected"] == 1
+
+
+def test_cancelled_token_stops_candidate_generation(monkeypatch):
+    monkeypatch.setattr(per_plant_optimizer, "RUNTIME_CHECK_INTERVAL", 1)
+    registry = OptimizationRunRegistry()
+    token = registry.start()
+    checkpoint = PerPlantOptimizer._generation_checkpoint
+
+    # Cancel a few steps into the generation of the first plant
+    def cancel_after_steps(self):
+        if self._generation_steps == 3:
+            registry.cancel(token, CancellationReason.DISCONNECTED)
+        checkpoint(self)
+
+    monkeypatch.setattr(PerPlantOptimizer, "_generation_checkpoint", cancel_after_steps)
+    optimizer = PerPlantOptimizer(hedge_row_request(2), candidate_cache=None, vectorized_generation=False, cancellation_token=token)
+
+    with pytest.raises(OptimizationCancelledException):
+        optimizer.optimize()
+    assert optimizer._generation_steps == 4
+
+
+def test_cancellation_reaches_parallel_workers():
+    registry = OptimizationRunRegistry()
+    token = registry.start()
+
+    # The parent sees improvements when partitions finish, the remaining workers must stop
+    optimizer = ParallelOptimizer(
+        hedge_row_request(6),
+        workers=2,
+        cancellation_token=token,
+        on_improvement=lambda improvement: registry.cancel(token, CancellationReason.DISCONNECTED)
+    )
+
+    with pytest.raises(OptimizationCancelledException):
+        optimizer.optimize()
+
+
+def test_request_supersedes_running_request_of_same_session(client):
+    before = client.get("/optimization/metrics").json()["runs"]
+    running = optimization_runs.start("wizard-session")
+
+    response = client.post(
+        "/optimization/per-plant",
+        json=TWO_PLANT_REQUEST_DATA,
+        headers={"X-Optimization-Session": "wizard-session"}
+    )
+
+    assert response.status_code == 200
+    assert running.cancelled
+    optimization_runs.finish(running)
+
+    runs = client.get("/optimization/metrics").json()["runs"]
+    assert runs["cancelled_superseded"] == before["cancelled_superseded"] + 1
+    assert runs["active"] == before["active"]
+
+
+class _DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+def _wait_for_cancellation(optimizer):
+    while not optimizer.cancellation_token.cancelled:
+        sleep(0.01)
+    optimizer._check_cancelled()
+
+
+def _disconnected_count():
+    return optimization_runs.stats()["cancelled_disconnected"]
+
+
+def test_disconnect_cancels_the_running_request():
+    before = _disconnected_count()
+    token = optimization_runs.start()
+    optimizer = PerPlantOptimizer(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA), cancellation_token=token)
+
+    with pytest.raises(OptimizationCancelledException):
+        asyncio.run(_run_until_disconnected(_DisconnectedRequest(), token, lambda: _wait_for_cancellation(optimizer)))
+    optimization_runs.finish(token)
+
+    assert token.reason == CancellationReason.DISCONNECTED
+    assert _disconnected_count() == before + 1
+
+
+def test_disconnect_cancels_the_stream_waiting_for_its_next_event(monkeypatch):
+    # The search sends no event until it is cancelled
+    monkeypatch.setattr(PerPlantOptimizer, "optimize", _wait_for_cancellation)
+    before = _disconnected_count()
+    disconnected = Event()
+    events = stream_optimization(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA), disconnected=disconnected)
+
+    async def receive():
+        return [chunk async for chunk in _stream_until_disconnected(_DisconnectedRequest(), events, disconnected)]
+
+    started = monotonic()
+    assert asyncio.run(receive()) == []
+
+    # The stream notices the disconnect at its next poll
+    while _disconnected_count() == before and monotonic() - started < 5:
+        sleep(0.01)
+    assert _disconnected_count() == before + 1
+    assert monotonic() - started < 1
@@ -0,0 +1,97 @@
+from time import sleep, time
+
+import pytest
+
+from app.api.v1 import optimization
+from app.optimization.jobs import OptimizationJobManager, JobQueueFullException
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.schemas.optimization import OptimizationJobStatus, PerPlantOptimizationRequest
+from app.tests.helpers import INFEASIBLE_REQUEST_DATA, TWO_PLANT_REQUEST_DATA
+
+
+def _wait_until_finished(get_job, timeout=10):
+    deadline = time() + timeout
+    while time() < deadline:
+        job = get_job()
+        if job.status in (OptimizationJobStatus.COMPLETED, OptimizationJobStatus.FAILED):
+            return job
+        sleep(0.01)
+    raise AssertionError("Optimization job did not finish in time")
+
+
+@pytest.fixture
+def manager():
+    manager = OptimizationJobManager(workers=1, ttl_seconds=60)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_completes_with_optimizer_result(manager):
+    request = PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA)
+
+    job = manager.submit(request)
+    job = _wait_until_finished(lambda: manager.get(job.job_id))
+
+    assert job.status == OptimizationJobStatus.COMPLETED
+    assert job.progress == 1.0
+    assert job.result == PerPlantOptimizer(request).optimize()
+
+
+def test_job_reports_no_solution(manager):
+    job = manager.submit(PerPlantOptimizationRequest(**INFEASIBLE_REQUEST_DATA))
+    job = _wait_until_finished(lambda: manager.get(job.job_id))
+
+    assert job.status == OptimizationJobStatus.FAILED
+    assert "No candidates found" in job.error
+
+
+def test_finished_jobs_expire_after_ttl():
+    manager = OptimizationJobManager(workers=1, ttl_seconds=0)
+    job = manager.submit(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA))
+    _wait_until_finished(lambda: manager._jobs[job.job_id])
+
+    assert manager.get(job.job_id) is None
+    manager.shutdown()
+
+
+def test_finished_jobs_are_bounded():
+    manager = OptimizationJobManager(workers=1, max_kept=2)
+    jobs = []
+    for _ in range(3):
+        job = manager.submit(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA))
+        _wait_until_finished(lambda: manager._jobs[job.job_id])
+        jobs.append(job)
+
+    # The optimizer is released once the job finished
+    assert all(job.optimizer is None and job.progress == 1.0 for job in jobs)
+
+    manager.submit(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA))
+    assert manager.get(jobs[0].job_id) is None
+    assert manager.get(jobs[1].job_id) is None
+    assert manager.get(jobs[2].job_id) is jobs[2]
+    manager.shutdown()
+
+
+def test_pending_jobs_are_bounded():
+    manager = OptimizationJobManager(workers=1, max_pending=0)
+
+    with pytest.raises(JobQueueFullException):
+        manager.submit(PerPlantOptimizationRequest(**TWO_PLANT_REQUEST_DATA))
+    manager.shutdown()
+
+
+def test_job_endpoints(client):
+    response = client.post("/optimization/jobs", json=TWO_PLANT_REQUEST_DATA)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    def get_job():
+        response = client.get(f"/optimization/jobs/{job_id}")
+        assert response.status_code == 200
+        return optimization.OptimizationJobRead(**response.json())
+
+    job = _wait_until_finished(get_job)
+    assert job.status == OptimizationJobStatus.COMPLETED
+    assert job.result.total_drippers_used > 0
+
+    assert client.get("/optimization/jobs/unknown").status_code == 404
@@ -0,0 +1,57 @@
+from app.optimization.metrics import SearchMetrics
+from app.schemas.optimization import OptimizationDiagnostics
+
+
+def _diagnostics(search_seconds, nodes=10):
+    return OptimizationDiagnostics(
+        candidates_per_plant=[3, 4],
+        nodes_visited=nodes,
+        leaves_evaluated=2,
+        infeasible_t_rejections=1,
+        inventory_rejections=1,
+        bound_prunes=3,
+        generation_seconds=0.0,
+        warm_start_seconds=0.0,
+        search_seconds=search_seconds
+    )
+
+
+def test_search_metrics_aggregate_runs():
+    metrics = SearchMetrics(slowest_runs_kept=2)
+
+    metrics.record_run(_diagnostics(0.1), timed_out=False, first_solution_seconds=0.02, warm_start_emitters=10, final_emitters=8)
+    metrics.record_run(_diagnostics(0.3), timed_out=False, first_solution_seconds=0.04, warm_start_emitters=None, final_emitters=5)
+    metrics.record_run(_diagnostics(30.0, nodes=1000), timed_out=True)
+
+    stats = metrics.stats()
+    assert stats["runs"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["nodes_visited"] == 1020
+    assert stats["bound_prunes"] == 9
+    assert stats["warm_start_found"] == 1
+    assert stats["warm_start_optimal"] == 0
+    assert abs(stats["mean_warm_start_gap"] - 0.2) < 1e-9
+    assert abs(stats["mean_first_solution_seconds"] - 0.03) < 1e-9
+
+    # Only the slowest runs are kept, slowest first
+    assert [(run["total_seconds"], run["timed_out"]) for run in stats["slowest_runs"]] == [(30.0, True), (0.3, False)]
+    assert stats["slowest_runs"][0]["candidates_per_plant"] == [3, 4]
+
+
+def test_diagnostics_are_opt_in_over_the_api(client):
+    data = {
+        "plants": [{"plant_id": "p1", "target_volume_liters": 10, "tolerance_percent": 10, "max_emitter_quantity": 5}],
+        "available_drippers": [{"dripper_id": "d2", "flow_rate_lph": 2, "count": None}]
+    }
+    runs_before = client.get("/optimization/metrics").json()["search"]["runs"]
+
+    plain = client.post("/optimization/per-plant", json=data).json()
+    detailed = client.post("/optimization/per-plant", params={"diagnostics": True}, json=data).json()
+
+    assert plain["diagnostics"] is None
+    assert len(detailed["diagnostics"]["candidates_per_plant"]) == 1
+    assert detailed["diagnostics"]["nodes_visited"] >= 1
+
+    search = client.get("/optimization/metrics").json()["search"]
+    assert search["runs"] == runs_before + 2
+    assert search["slowest_runs"]
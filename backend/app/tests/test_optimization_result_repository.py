@@ -0,0 +1,66 @@
+from sqlmodel import SQLModel, create_engine, Session
+import pytest
+
+from app.models.optimization_result import OptimizationResult
+from app.models.zone import Zone
+from app.repositories.optimization_result_repository import OptimizationResultRepository
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", echo=False)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        yield session
+
+
+def _result(request_hash="abc", optimizer_version="2", **fields):
+    return OptimizationResult(
+        request_hash=request_hash,
+        optimizer_version=optimizer_version,
+        response={"total_drippers_used": 3},
+        run_seconds=1.5,
+        **fields
+    )
+
+
+def test_save_and_get_result(session: Session):
+    repo = OptimizationResultRepository(session)
+
+    repo.save(_result())
+    session.commit()
+
+    loaded = repo.get("abc", "2")
+    assert loaded is not None
+    assert loaded.response == {"total_drippers_used": 3}
+    assert repo.get("abc", "1") is None
+
+
+def test_save_replaces_result_of_same_request_and_version(session: Session):
+    repo = OptimizationResultRepository(session)
+    zone = Zone(node_id=1, name="Z1", relay_pin=1, irrigation_mode="per_plant")
+    session.add(zone)
+    session.flush()
+
+    repo.save(_result(zone_id=zone.id))
+    repo.save(OptimizationResult(request_hash="abc", optimizer_version="2", response={"total_drippers_used": 2}, run_seconds=0.5))
+    session.commit()
+
+    stored = repo.list_by_zone(zone.id)
+    assert len(stored) == 1
+    assert stored[0].response == {"total_drippers_used": 2}
+
+
+def test_delete_stale_versions(session: Session):
+    repo = OptimizationResultRepository(session)
+    repo.save(_result(optimizer_version="1"))
+    repo.save(_result(optimizer_version="2"))
+    repo.save(_result(request_hash="def", optimizer_version="1"))
+    session.commit()
+
+    assert repo.delete_stale("2") == 2
+    session.commit()
+
+    assert repo.get("abc", "1") is None
+    assert repo.get("abc", "2") is not None
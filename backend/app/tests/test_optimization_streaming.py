@@ -0,0 +1,108 @@
+import json
+from threading import BoundedSemaphore
+
+from pytest import raises
+
+from app.optimization import streaming
+from app.optimization.admission import RequestTooComplexException
+from app.optimization.cancellation import optimization_runs
+from app.optimization.result_cache import result_cache
+from app.optimization.streaming import stream_optimization
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.tests.helpers import INFEASIBLE_REQUEST_DATA
+
+
+# Branch and bound finds several improving solutions on this zone
+REQUEST_DATA = {
+    "plants": [
+        {"plant_id": "p1", "target_volume_liters": 10, "tolerance_percent": 10, "max_emitter_quantity": 6},
+        {"plant_id": "p2", "target_volume_liters": 7, "tolerance_percent": 10, "max_emitter_quantity": 6},
+        {"plant_id": "p3", "target_volume_liters": 20, "tolerance_percent": 5, "max_emitter_quantity": 6},
+        {"plant_id": "p4", "target_volume_liters": 17, "tolerance_percent": 5, "max_emitter_quantity": 6}
+    ],
+    "available_drippers": [
+        {"dripper_id": "d8", "flow_rate_lph": 8, "count": 2},
+        {"dripper_id": "d4", "flow_rate_lph": 4, "count": 3},
+        {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+        {"dripper_id": "d1", "flow_rate_lph": 1.3, "count": None}
+    ]
+}
+
+
+def _parse_events(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], lines["data"]))
+    return events
+
+
+def test_stream_ends_with_the_optimization_result(client):
+    expected = client.post("/optimization/per-plant", json=REQUEST_DATA).json()
+
+    response = client.post("/optimization/per-plant/stream", json=REQUEST_DATA)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_events(response.text)
+    assert events[-1][0] == "result"
+    assert json.loads(events[-1][1]) == expected
+
+    improvements = [json.loads(data) for event, data in events[:-1]]
+    assert all(event == "improvement" for event, _ in events[:-1])
+    keys = [(i["total_drippers_used"], i["base_irrigation_time_seconds"]) for i in improvements]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_stream_reports_errors(client):
+    events = _parse_events(client.post("/optimization/per-plant/stream", json=INFEASIBLE_REQUEST_DATA).text)
+
+    assert [event for event, _ in events] == ["error"]
+    assert "No candidates found" in events[0][1]
+
+
+def test_stream_throttles_improvements():
+    request = PerPlantOptimizationRequest(**REQUEST_DATA)
+
+    # Both runs have to search, a cached result is streamed without improvements
+    result_cache.clear()
+    unthrottled = _parse_events("".join(stream_optimization(request, min_interval=0)))
+    result_cache.clear()
+    throttled = _parse_events("".join(stream_optimization(request, min_interval=60)))
+
+    assert len(unthrottled) > 2
+    # Only the first improvement goes out before the result
+    assert [event for event, _ in throttled] == ["improvement", "result"]
+    first = json.loads(throttled[0][1])
+    expected_first = json.loads(unthrottled[0][1])
+    assert first["total_drippers_used"] == expected_first["total_drippers_used"]
+    assert first["nodes_explored"] == expected_first["nodes_explored"]
+    assert throttled[-1] == unthrottled[-1]
+
+
+def test_rejected_stream_releases_its_run():
+    request = PerPlantOptimizationRequest(
+        plants=[{"plant_id": "huge", "target_volume_liters": 400, "tolerance_percent": 10, "max_emitter_quantity": 60}],
+        available_drippers=[{"dripper_id": f"d{i}", "flow_rate_lph": 1 + i * 0.7, "count": None} for i in range(8)]
+    )
+    before = optimization_runs.stats()["active"]
+
+    with raises(RequestTooComplexException):
+        stream_optimization(request, session_id="rejected-stream")
+
+    assert optimization_runs.stats()["active"] == before
+
+
+def test_streams_beyond_the_pool_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(streaming, "_slots", BoundedSemaphore(1))
+
+    # The slot is released once each run finished
+    for _ in range(2):
+        response = client.post("/optimization/per-plant/stream", json=REQUEST_DATA)
+        assert _parse_events(response.text)[-1][0] == "result"
+
+    streaming._slots.acquire()
+    response = client.post("/optimization/per-plant/stream", json=REQUEST_DATA)
+
+    assert response.status_code == 503
@@ -0,0 +1,81 @@
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization import parallel_optimizer
+from app.optimization.cancellation import CancellationReason, OptimizationRunRegistry
+from app.optimization.parallel_optimizer import ParallelOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+
+
+def _mixed_zone_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "rose", "target_volume_liters": 9, "tolerance_percent": 8, "max_emitter_quantity": 5},
+            {"plant_id": "hedge_1", "target_volume_liters": 14, "tolerance_percent": 10, "max_emitter_quantity": 6},
+            {"plant_id": "hedge_2", "target_volume_liters": 14, "tolerance_percent": 10, "max_emitter_quantity": 6},
+            {"plant_id": "tree", "target_volume_liters": 30, "tolerance_percent": 12, "max_emitter_quantity": 8},
+            {"plant_id": "herbs", "target_volume_liters": 4, "tolerance_percent": 20, "max_emitter_quantity": 3}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d3", "flow_rate_lph": 3.3, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 4},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 2}
+        ]
+    )
+
+
+def test_parallel_search_matches_sequential_search():
+    request = _mixed_zone_request()
+
+    sequential = PerPlantOptimizer(request).optimize()
+    parallel = ParallelOptimizer(request, workers=2).optimize()
+
+    assert parallel == sequential
+
+
+def test_partitions_follow_search_order_and_symmetry():
+    request = PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": f"shrub_{i}", "target_volume_liters": 12, "tolerance_percent": 10, "max_emitter_quantity": 3}
+            for i in range(3)
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2}
+        ]
+    )
+    optimizer = ParallelOptimizer(request, workers=64)
+    result = optimizer.optimize()
+
+    tasks = optimizer._partition_tasks()
+    assert tasks == sorted(tasks)
+    assert all(i <= j for i, j in tasks)
+    assert result == PerPlantOptimizer(request).optimize()
+
+
+def test_parallel_search_handles_empty_zone():
+    request = PerPlantOptimizationRequest(plants=[], available_drippers=[{"dripper_id": "d2", "flow_rate_lph": 2, "count": None}])
+
+    assert ParallelOptimizer(request, workers=2).optimize() == PerPlantOptimizer(request).optimize()
+
+
+def test_searches_share_one_pool():
+    request = _mixed_zone_request()
+
+    first = ParallelOptimizer(request, workers=2).optimize()
+    pool = parallel_optimizer._pool
+    second = ParallelOptimizer(request, workers=2).optimize()
+
+    assert pool is not None and parallel_optimizer._pool is pool
+    assert first == second
+
+
+def test_cancellation_after_the_search_is_ignored():
+    registry = OptimizationRunRegistry()
+    token = registry.start()
+    request = _mixed_zone_request()
+
+    result = ParallelOptimizer(request, workers=2, cancellation_token=token).optimize()
+
+    # The shared memory of the search is released, the forwarded cancellation must not touch it
+    assert registry.cancel(token, CancellationReason.DISCONNECTED)
+    assert result == PerPlantOptimizer(request).optimize()
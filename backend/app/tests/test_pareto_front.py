@@ -0,0 +1,88 @@
+from app.optimization import per_plant_optimizer
+from app.optimization.pareto_front import ParetoFrontOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.tests.helpers import feasible_objectives, hedge_row_request, mixed_inventory_request
+
+
+def _brute_force_front(request):
+    """
+    Non-dominated (emitters, T in seconds) points over every feasible combination of candidates.
+    """
+    points = {(emitters, round(T * 3600, 2)) for emitters, T in feasible_objectives(request)}
+    return sorted(
+        (emitters, T) for emitters, T in points
+        if not any((e, t) != (emitters, T) and e <= emitters and t <= T for e, t in points)
+    )
+
+
+def _points(front):
+    return [(alternative.total_drippers_used, alternative.base_irrigation_time_seconds) for alternative in front.alternatives]
+
+
+def test_front_matches_brute_force():
+    interchangeable = PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "a1", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "b", "target_volume_liters": 12, "tolerance_percent": 15, "max_emitter_quantity": 4},
+            {"plant_id": "a2", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 1}
+        ]
+    )
+
+    for request in (mixed_inventory_request(), interchangeable, hedge_row_request(2)):
+        front = ParetoFrontOptimizer(request).optimize_front()
+
+        assert front.complete
+        assert _points(front) == _brute_force_front(request)
+
+
+def test_fewest_emitter_alternative_is_the_native_result():
+    request = hedge_row_request(4)
+
+    front = ParetoFrontOptimizer(request).optimize_front()
+    native = PerPlantOptimizer(request, warm_start=False).optimize()
+
+    assert len(front.alternatives) > 1
+    assert front.alternatives[0] == native
+    assert ParetoFrontOptimizer(request).optimize() == native
+
+    # Every alternative is a complete allocation of the zone
+    for alternative in front.alternatives:
+        assert [plant.plant_id for plant in alternative.plants] == [plant.plant_id for plant in request.plants]
+
+
+def test_time_budget_returns_partial_front(monkeypatch):
+    # Fake clock that passes the deadline once the first alternative is archived
+    clock = [0.0]
+    record_solution = ParetoFrontOptimizer._record_solution
+
+    def record_and_expire(self, total_emitters, chosen_T):
+        record_solution(self, total_emitters, chosen_T)
+        clock[0] = 1000.0
+
+    monkeypatch.setattr(per_plant_optimizer, "time", lambda: clock[0])
+    monkeypatch.setattr(per_plant_optimizer, "RUNTIME_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(ParetoFrontOptimizer, "_record_solution", record_and_expire)
+
+    front = ParetoFrontOptimizer(hedge_row_request(4), time_budget_seconds=5).optimize_front()
+
+    assert not front.complete
+    assert len(front.alternatives) == 1
+    assert not front.alternatives[0].proven_optimal
+
+
+def test_front_endpoint(client):
+    request = mixed_inventory_request()
+
+    response = client.post("/optimization/per-plant/front?diagnostics=true", json=request.model_dump())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(a["total_drippers_used"], a["base_irrigation_time_seconds"]) for a in body["alternatives"]] == _brute_force_front(request)
+    assert body["complete"]
+    assert body["diagnostics"]["nodes_visited"] > 0
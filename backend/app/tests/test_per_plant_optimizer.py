@@ -1,4 +1,6 @@
-from pytest import fixture
+from itertools import product
+
+from pytest import fixture, raises
 
 from app.schemas.optimization import (
     PerPlantOptimizationRequest,
@@ -6,7 +8,10 @@ from app.schemas.optimization import (
     DripperAllocation,
     PlantOptimizationResult
 )
-from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.optimization import per_plant_optimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, SearchStrategy, MAX_TIME_HOURS
+from app.optimization.sweep_line_optimizer import SweepLineOptimizer
+from app.tests.helpers import hedge_row_request, mixed_inventory_request
 
 @fixture
 def one_plant_request():
@@ -229,3 +234,321 @@ def test_volume_time_flow_consistency():
     assert abs(computed_volume - result.total_base_volume_liters) < 0.01
 
 
+
+
+# --------- branch and bound vs brute force ---------
+
+def test_branch_and_bound_matches_brute_force(two_plants_request):
+    for request in (two_plants_request, mixed_inventory_request()):
+        brute_force = PerPlantOptimizer(request, strategy=SearchStrategy.BRUTE_FORCE).optimize()
+        branch_and_bound = PerPlantOptimizer(request, strategy=SearchStrategy.BRANCH_AND_BOUND).optimize()
+
+        assert branch_and_bound == brute_force
+
+
+def test_branch_and_bound_solves_six_plant_zone():
+    request = PerPlantOptimizationRequest(
+        plants=[
+            {
+                "plant_id": f"p{i}",
+                "target_volume_liters": 6 + i,
+                "tolerance_percent": 15,
+                "max_emitter_quantity": 8
+            }
+            for i in range(6)
+        ],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1, "count": None},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": None},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+        ]
+    )
+
+    result = PerPlantOptimizer(request).optimize()
+
+    assert len(result.plants) == 6
+    for plant, plant_result in zip(request.plants, result.plants):
+        tolerance = plant.target_volume_liters * plant.tolerance_percent / 100
+        assert plant.target_volume_liters - tolerance - 0.01 <= plant_result.actual_volume_liters
+        assert plant_result.actual_volume_liters <= plant.target_volume_liters + tolerance + 0.01
+
+
+# --------- candidate reduction ---------
+
+def test_reduce_candidates_removes_dominated_and_duplicates(two_plants_request):
+    optimizer = PerPlantOptimizer(two_plants_request)
+    plant = two_plants_request.plants[1]
+
+    candidates = optimizer._generate_candidates_for_plant(plant)
+    reduced = optimizer._reduce_candidates(candidates)
+
+    assert 0 < len(reduced) < len(candidates)
+
+    # With unlimited drippers only one candidate per flow survives, the one with fewest emitters
+    flows = [c.flow for c in reduced]
+    assert len(flows) == len(set(flows))
+    for candidate in reduced:
+        same_flow = [c for c in candidates if c.flow == candidate.flow]
+        assert candidate.emitters == min(c.emitters for c in same_flow)
+
+
+def test_reduce_candidates_keeps_optimum(monkeypatch):
+    request = mixed_inventory_request()
+
+    reduced = PerPlantOptimizer(request).optimize()
+
+    monkeypatch.setattr(PerPlantOptimizer, "_reduce_candidates", lambda self, candidates: candidates)
+    unreduced = PerPlantOptimizer(request, strategy=SearchStrategy.BRUTE_FORCE, candidate_cache=None).optimize()
+
+    assert reduced.total_drippers_used == unreduced.total_drippers_used
+    assert reduced.base_irrigation_time_seconds == unreduced.base_irrigation_time_seconds
+
+
+def test_reduce_candidates_matches_pairwise_dominance():
+    request = PerPlantOptimizationRequest(
+        plants=[{"plant_id": "p1", "target_volume_liters": 30, "tolerance_percent": 10, "max_emitter_quantity": 7}],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1, "count": None},
+            {"dripper_id": "d1_3", "flow_rate_lph": 1.3, "count": 3},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": 4},
+            {"dripper_id": "d3_3", "flow_rate_lph": 3.3, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+        ]
+    )
+    optimizer = PerPlantOptimizer(request, candidate_cache=None)
+    candidates = optimizer._generate_candidates_for_plant(request.plants[0])
+
+    def usage(candidate):
+        used = [0] * len(optimizer._limits)
+        for dripper_index, count in candidate.limited:
+            used[dripper_index] += count
+        return used
+
+    def dominates(a, b):
+        return (
+            a.t_min <= b.t_min and min(a.t_max, MAX_TIME_HOURS) >= min(b.t_max, MAX_TIME_HOURS)
+            and a.emitters <= b.emitters and all(x <= y for x, y in zip(usage(a), usage(b)))
+        )
+
+    reduced = optimizer._reduce_candidates(candidates)
+
+    # Every candidate is dominated by a kept one, and no kept candidate dominates another
+    assert all(any(dominates(kept, candidate) for kept in reduced) for candidate in candidates)
+    assert not any(a is not b and dominates(a, b) for a in reduced for b in reduced)
+
+
+# --------- candidate generation ---------
+
+def test_generation_skips_flows_outside_admissible_window():
+    request = PerPlantOptimizationRequest(
+        plants=[{
+            "plant_id": "p1",
+            "target_volume_liters": 40,
+            "tolerance_percent": 10,
+            "max_emitter_quantity": 6
+        }],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1, "count": None},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": 3},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+        ]
+    )
+    plant = request.plants[0]
+    min_volume = plant.target_volume_liters * 0.9
+
+    candidates = PerPlantOptimizer(request)._generate_candidates_for_plant(plant)
+
+    # Same candidates as filtering the full enumeration by t_min <= MAX_TIME_HOURS
+    expected = set()
+    for counts in product(range(7), range(4), range(7)):
+        flow = counts[0] * 1 + counts[1] * 2 + counts[2] * 8
+        if 0 < sum(counts) <= 6 and min_volume / flow <= MAX_TIME_HOURS:
+            expected.add(tuple((i, count) for i, count in enumerate(counts) if count > 0))
+
+    assert {c.allocations for c in candidates} == expected
+    assert len(candidates) == len(expected)
+
+
+def test_equal_flows_are_exact():
+    # 1.1 + 2.2 != 3.3 in floats, the flows and T windows in integer units are equal
+    request = PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "a", "target_volume_liters": 6.6, "tolerance_percent": 5, "max_emitter_quantity": 2},
+            {"plant_id": "b", "target_volume_liters": 6.6, "tolerance_percent": 5.0, "max_emitter_quantity": 2}
+        ],
+        available_drippers=[
+            {"dripper_id": "d1_1", "flow_rate_lph": 1.1, "count": None},
+            {"dripper_id": "d2_2", "flow_rate_lph": 2.2, "count": 1},
+            {"dripper_id": "d3_3", "flow_rate_lph": 3.3, "count": None}
+        ]
+    )
+    optimizer = PerPlantOptimizer(request)
+    plant = request.plants[0]
+
+    candidates = optimizer._generate_candidates_for_plant(plant)
+    combined = next(c for c in candidates if len(c.allocations) == 2 and c.emitters == 2 and c.flow == 3300)
+    single = next(c for c in candidates if c.allocations == ((2, 1),))
+    assert (combined.t_min, combined.t_max) == (single.t_min, single.t_max) == (2.0 * 0.95, 2.0 * 1.05)
+
+    # Same flow and usage of limited drippers are merged into the fewest emitters
+    reduced = optimizer._reduce_candidates(candidates)
+    assert [c.allocations for c in reduced if c.flow == 3300] == [((2, 1),)]
+
+    result = optimizer.optimize()
+    assert result.base_irrigation_time_seconds == 2.0 * 0.95 * 3600
+    assert [plant.actual_volume_liters for plant in result.plants] == [6.27, 6.27]
+
+
+# --------- interchangeable plants ---------
+
+def test_interchangeable_plants_match_brute_force():
+    request = PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "a1", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "b", "target_volume_liters": 12, "tolerance_percent": 15, "max_emitter_quantity": 4},
+            {"plant_id": "a2", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "a3", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 1}
+        ]
+    )
+
+    brute_force = PerPlantOptimizer(request, strategy=SearchStrategy.BRUTE_FORCE).optimize()
+    branch_and_bound = PerPlantOptimizer(request).optimize()
+
+    assert branch_and_bound == brute_force
+    assert [p.plant_id for p in branch_and_bound.plants] == ["a1", "b", "a2", "a3"]
+
+
+def test_hedge_row_of_identical_shrubs():
+    request = hedge_row_request(10)
+
+    result = PerPlantOptimizer(request).optimize()
+
+    assert [p.plant_id for p in result.plants] == [f"shrub_{i}" for i in range(10)]
+    used = {d.dripper_id: d.count for d in result.drippers_used_detail}
+    assert used.get("d8", 0) <= 3
+    assert used.get("d4", 0) <= 4
+    for plant in result.plants:
+        assert 15.2 - 0.01 <= plant.actual_volume_liters <= 16.8 + 0.01
+
+
+# --------- anytime search ---------
+
+def _expire_after_first_solution(monkeypatch):
+    """
+    Fake clock that passes every deadline once the first solution is recorded.
+    """
+    clock = [0.0]
+    record_solution = PerPlantOptimizer._record_solution
+
+    def record_and_expire(self, total_emitters, chosen_T):
+        record_solution(self, total_emitters, chosen_T)
+        clock[0] = 1000.0
+
+    monkeypatch.setattr(per_plant_optimizer, "time", lambda: clock[0])
+    monkeypatch.setattr(per_plant_optimizer, "RUNTIME_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(PerPlantOptimizer, "_record_solution", record_and_expire)
+
+
+def test_time_budget_returns_best_solution_so_far(monkeypatch):
+    request = hedge_row_request(6)
+    optimum = PerPlantOptimizer(request).optimize()
+    assert optimum.proven_optimal
+    assert optimum.emitters_lower_bound == optimum.total_drippers_used
+    assert optimum.optimality_gap == 0
+
+    _expire_after_first_solution(monkeypatch)
+    result = PerPlantOptimizer(request, time_budget_seconds=5).optimize()
+
+    assert not result.proven_optimal
+    assert result.emitters_lower_bound <= optimum.total_drippers_used <= result.total_drippers_used
+    gap = (result.total_drippers_used - result.emitters_lower_bound) / result.total_drippers_used
+    assert abs(result.optimality_gap - gap) < 1e-3
+    assert len(result.plants) == 6
+
+
+def test_timeout_without_time_budget(monkeypatch):
+    _expire_after_first_solution(monkeypatch)
+
+    with raises(TimeoutError):
+        PerPlantOptimizer(hedge_row_request(6)).optimize()
+
+
+def test_time_budget_covers_candidate_generation(monkeypatch):
+    # Every clock reading takes a second, the deadline passes while the first plant is generated
+    clock = [0.0]
+
+    def tick():
+        clock[0] += 1.0
+        return clock[0]
+
+    monkeypatch.setattr(per_plant_optimizer, "time", tick)
+    monkeypatch.setattr(per_plant_optimizer, "RUNTIME_CHECK_INTERVAL", 1)
+    optimizer = PerPlantOptimizer(hedge_row_request(2), candidate_cache=None, vectorized_generation=False, time_budget_seconds=5)
+
+    with raises(TimeoutError):
+        optimizer.optimize()
+
+    assert optimizer.diagnostics.candidates_per_plant == []
+    assert optimizer.diagnostics.nodes_visited == 0
+    assert optimizer._generation_steps < 10
+
+
+# --------- warm start ---------
+
+def test_warm_start_does_not_change_the_result(two_plants_request):
+    for request in (two_plants_request, mixed_inventory_request(), hedge_row_request(6)):
+        seeded = PerPlantOptimizer(request).optimize()
+        unseeded = PerPlantOptimizer(request, warm_start=False).optimize()
+
+        assert unseeded.warm_start_drippers_used is None
+        assert seeded.warm_start_drippers_used >= seeded.total_drippers_used
+        assert seeded.model_copy(update={"warm_start_drippers_used": None}) == unseeded
+
+
+def test_warm_start_is_returned_when_search_is_interrupted(monkeypatch):
+    def interrupted_search(self):
+        raise per_plant_optimizer.SearchInterrupted()
+
+    monkeypatch.setattr(PerPlantOptimizer, "_search", interrupted_search)
+    request = hedge_row_request(6)
+
+    result = PerPlantOptimizer(request, time_budget_seconds=5).optimize()
+
+    assert not result.proven_optimal
+    assert result.total_drippers_used == result.warm_start_drippers_used
+    assert result.emitters_lower_bound <= result.total_drippers_used
+
+    # Same selection as the sweep line engine, which runs the same greedy sweep
+    monkeypatch.undo()
+    sweep = SweepLineOptimizer(request).optimize()
+    assert result.plants == sweep.plants
+    assert result.base_irrigation_time_seconds == sweep.base_irrigation_time_seconds
+
+
+# --------- diagnostics ---------
+
+def test_diagnostics_count_the_search(two_plants_request):
+    request = mixed_inventory_request()
+
+    brute_force = PerPlantOptimizer(request, strategy=SearchStrategy.BRUTE_FORCE, include_diagnostics=True).optimize()
+    branch_and_bound = PerPlantOptimizer(request, include_diagnostics=True).optimize()
+
+    counts = brute_force.diagnostics.candidates_per_plant
+    assert counts == branch_and_bound.diagnostics.candidates_per_plant
+    assert len(counts) == len(request.plants)
+
+    # Brute force reaches every leaf, each one is rejected or compared with the incumbent
+    leaves = counts[0] * counts[1] * counts[2]
+    assert brute_force.diagnostics.leaves_evaluated == leaves
+    assert brute_force.diagnostics.infeasible_t_rejections + brute_force.diagnostics.inventory_rejections < leaves
+
+    assert branch_and_bound.diagnostics.nodes_visited < brute_force.diagnostics.nodes_visited
+    assert branch_and_bound.diagnostics.leaves_evaluated < leaves
+
+    assert PerPlantOptimizer(two_plants_request).optimize().diagnostics is None
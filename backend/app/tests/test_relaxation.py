@@ -0,0 +1,132 @@
+from pytest import raises
+
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, NoSolutionException, MAX_RUNTIME_SECONDS
+from app.optimization.relaxation import NearestFeasibleOptimizer, _FeasibilityProbe
+from app.schemas.optimization import PerPlantOptimizationRequest, RelaxationParameter
+from app.tests.helpers import hedge_row_request, mixed_inventory_request
+
+
+def _infeasible_request():
+    # No common T within 1-2% tolerance for 3 emitters per plant and this inventory
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "a", "target_volume_liters": 8, "tolerance_percent": 1, "max_emitter_quantity": 3},
+            {"plant_id": "b", "target_volume_liters": 11, "tolerance_percent": 1, "max_emitter_quantity": 3},
+            {"plant_id": "c", "target_volume_liters": 13.7, "tolerance_percent": 2, "max_emitter_quantity": 3}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 1}
+        ]
+    )
+
+
+def test_derived_candidates_match_generated_ones():
+    for request in (_infeasible_request(), hedge_row_request(2)):
+        for parameter in RelaxationParameter:
+            relaxation = NearestFeasibleOptimizer(request, parameter, max_tolerance_percent=5, max_emitters=3, tolerance_step_percent=0.5)
+            relaxation._generate_combinations()
+
+            for steps in range(relaxation.max_steps + 1):
+                relaxed = relaxation._relaxed_request(steps)
+                cache = relaxation._candidate_cache(steps)
+                direct = PerPlantOptimizer(relaxed, candidate_cache=None)
+                for plant in relaxed.plants:
+                    expected = direct._reduce_candidates(direct._generate_candidates_for_plant(plant))
+                    assert cache.peek((direct._plant_key(plant), direct._catalog_key)) == expected
+
+
+def test_smallest_tolerance_relaxation():
+    request = _infeasible_request()
+    with raises(NoSolutionException):
+        PerPlantOptimizer(request).optimize()
+
+    relaxed = NearestFeasibleOptimizer(request).optimize()
+
+    assert relaxed.parameter == RelaxationParameter.TOLERANCE
+    assert relaxed.relaxation == 0.6
+    assert [plant.tolerance_percent for plant in relaxed.plants] == [1.6, 1.6, 2.6]
+
+    # One step less has no solution, the result is the one of the relaxed request
+    tighter = NearestFeasibleOptimizer(request)._relaxed_request(5)
+    with raises(NoSolutionException):
+        PerPlantOptimizer(tighter).optimize()
+    assert relaxed.result == PerPlantOptimizer(NearestFeasibleOptimizer(request)._relaxed_request(6)).optimize()
+
+
+def test_smallest_emitter_relaxation():
+    request = _infeasible_request()
+
+    relaxed = NearestFeasibleOptimizer(request, RelaxationParameter.MAX_EMITTERS).optimize()
+
+    assert relaxed.relaxation == 7
+    assert [plant.max_emitter_quantity for plant in relaxed.plants] == [10, 10, 10]
+    assert [plant.tolerance_percent for plant in relaxed.plants] == [1, 1, 2]
+    with raises(NoSolutionException):
+        PerPlantOptimizer(NearestFeasibleOptimizer(request, RelaxationParameter.MAX_EMITTERS)._relaxed_request(6)).optimize()
+
+    # Beyond the widest relaxation
+    with raises(NoSolutionException):
+        NearestFeasibleOptimizer(request, RelaxationParameter.MAX_EMITTERS, max_emitters=4).optimize()
+
+
+def test_feasible_request_is_not_relaxed():
+    request = mixed_inventory_request()
+
+    relaxed = NearestFeasibleOptimizer(request).optimize()
+
+    assert (relaxed.relaxation, relaxed.probes) == (0, 0)
+    assert relaxed.result == PerPlantOptimizer(request).optimize()
+
+
+def test_relaxation_runs_share_the_runtime_limit(monkeypatch):
+    budgets = []
+    arguments = NearestFeasibleOptimizer._optimizer_arguments
+
+    def recorded_arguments(self):
+        result = arguments(self)
+        budgets.append(result["time_budget_seconds"])
+        return result
+
+    monkeypatch.setattr(NearestFeasibleOptimizer, "_optimizer_arguments", recorded_arguments)
+    relaxed = NearestFeasibleOptimizer(_infeasible_request()).optimize()
+
+    # The unrelaxed run, the probes and the final optimization
+    assert len(budgets) == relaxed.probes + 2
+    assert budgets[0] <= MAX_RUNTIME_SECONDS / len(budgets)
+    assert all(budget <= MAX_RUNTIME_SECONDS for budget in budgets)
+
+
+def test_interrupted_probe_is_inconclusive(monkeypatch):
+    probe = _FeasibilityProbe.optimize
+
+    # The probe of the smallest relaxation, 0.6 points, runs out of time
+    def interrupted_at_smallest(self):
+        if self.request.plants[0].tolerance_percent == 1.6:
+            raise TimeoutError("Optimization exceeded maximum runtime")
+        return probe(self)
+
+    monkeypatch.setattr(_FeasibilityProbe, "optimize", interrupted_at_smallest)
+
+    assert NearestFeasibleOptimizer(_infeasible_request()).optimize().relaxation == 0.7
+
+
+def test_interrupted_widest_probe_times_out(monkeypatch):
+    def interrupted(self):
+        raise TimeoutError("Optimization exceeded maximum runtime")
+
+    monkeypatch.setattr(_FeasibilityProbe, "optimize", interrupted)
+
+    with raises(TimeoutError):
+        NearestFeasibleOptimizer(_infeasible_request()).optimize()
+
+
+def test_nearest_feasible_endpoint(client):
+    response = client.post("/optimization/per-plant/nearest-feasible?parameter=max_emitters", json=_infeasible_request().model_dump())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["relaxation"] == 7
+    assert body["result"]["total_drippers_used"] > 0
+    assert client.post("/optimization/per-plant", json=_infeasible_request().model_dump()).status_code == 400
@@ -0,0 +1,170 @@
+from pytest import fixture
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.zone import Zone
+from app.optimization import result_cache as result_cache_module
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.optimization.result_cache import ResultCache, request_fingerprint
+from app.optimization.result_store import ResultStore
+from app.optimization.sweep_line_optimizer import SweepLineOptimizer
+from app.repositories.optimization_result_repository import OptimizationResultRepository
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.tests.helpers import hedge_row_request, mixed_inventory_request
+
+
+def _reordered(request):
+    return PerPlantOptimizationRequest(
+        plants=list(reversed(request.plants)),
+        available_drippers=list(reversed(request.available_drippers))
+    )
+
+
+def _failing_search(self):
+    raise AssertionError("The search should not run on a cache hit")
+
+
+def test_fingerprint_is_canonical():
+    request = mixed_inventory_request()
+    data = request.model_dump()
+    data["plants"][0]["target_volume_liters"] = int(data["plants"][0]["target_volume_liters"])
+
+    key = request_fingerprint(request, "PerPlantOptimizer")
+    assert request_fingerprint(_reordered(request), "PerPlantOptimizer") == key
+    assert request_fingerprint(PerPlantOptimizationRequest(**data), "PerPlantOptimizer") == key
+
+    edited = request.model_copy(update={"plants": [request.plants[0].model_copy(update={"tolerance_percent": 11})] + request.plants[1:]})
+    assert request_fingerprint(edited, "PerPlantOptimizer") != key
+    assert request_fingerprint(request, "SweepLineOptimizer") != key
+
+    duplicate_ids = request.model_copy(update={"plants": [request.plants[0], request.plants[0]]})
+    assert request_fingerprint(duplicate_ids) is None
+
+
+def test_identical_request_is_answered_from_the_cache(monkeypatch):
+    cache = ResultCache()
+    request = mixed_inventory_request()
+
+    expected = PerPlantOptimizer(request, result_cache=cache).optimize()
+    monkeypatch.setattr(PerPlantOptimizer, "_search", _failing_search)
+
+    assert PerPlantOptimizer(request, result_cache=cache).optimize() == expected
+
+    # Same zone entered in another order, the result follows the order of the request
+    reordered = _reordered(request)
+    result = PerPlantOptimizer(reordered, result_cache=cache).optimize()
+    monkeypatch.undo()
+    assert result == PerPlantOptimizer(reordered).optimize()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 2 / 3
+    assert stats["saved_seconds"] > 0
+
+
+def test_only_proven_optimal_results_are_cached():
+    cache = ResultCache()
+
+    # The sweep line result is a heuristic with limited drippers
+    heuristic = SweepLineOptimizer(hedge_row_request(4), result_cache=cache).optimize()
+    assert not heuristic.proven_optimal
+
+    PerPlantOptimizer(hedge_row_request(4), result_cache=cache, include_diagnostics=True).optimize()
+
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["hits"] == 0
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache_module, "monotonic", lambda: now[0])
+    cache = ResultCache(max_size=1, ttl_seconds=10)
+    request = mixed_inventory_request()
+    response = PerPlantOptimizer(request).optimize()
+
+    cache.put("a", response, 1.0)
+    cache.put("b", response, 1.0)
+    assert cache.get("a", request) is None
+    assert cache.get("b", request) == response
+
+    now[0] += 11
+    assert cache.get("b", request) is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expired"], stats["size"]) == (1, 1, 0)
+
+
+# --------- persistent store ---------
+
+@fixture
+def store():
+    engine = create_engine("sqlite://", echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return ResultStore(engine, optimizer_version="2")
+
+
+def test_stored_results_are_shared_between_caches(monkeypatch, store):
+    request = mixed_inventory_request()
+    expected = PerPlantOptimizer(request, result_cache=ResultCache(store=store)).optimize()
+
+    # Another worker (or the process after a restart) starts with an empty cache
+    cache = ResultCache(store=store)
+    monkeypatch.setattr(PerPlantOptimizer, "_search", _failing_search)
+    optimizer = PerPlantOptimizer(request, result_cache=cache)
+
+    assert optimizer.optimize() == expected
+    assert store.link_zone(optimizer.result_key, 7)
+    assert cache.stats()["store_hits"] == 1
+
+    # A new optimizer version does not read older results and purges them
+    newer = ResultStore(store.engine, optimizer_version="3")
+    assert newer.get(optimizer.result_key) is None
+    assert newer.purge_stale() == 1
+    assert store.get(optimizer.result_key) is None
+
+
+def test_linking_a_result_again_replaces_its_zone(store):
+    optimizer = PerPlantOptimizer(mixed_inventory_request(), result_cache=ResultCache(store=store))
+    optimizer.optimize()
+
+    assert store.link_zone(optimizer.result_key, 7)
+    assert store.link_zone(optimizer.result_key, 8)
+
+    with Session(store.engine) as session:
+        repository = OptimizationResultRepository(session)
+        assert repository.list_by_zone(7) == []
+        assert [result.request_hash for result in repository.list_by_zone(8)] == [optimizer.result_key]
+
+
+def test_results_are_linked_to_existing_zones_only(client, monkeypatch, store):
+    with Session(store.engine) as session:
+        zone = Zone(node_id=1, name="Bed", relay_pin=3, irrigation_mode="even_area")
+        session.add(zone)
+        session.commit()
+        zone_id = zone.id
+
+    cache = result_cache_module.result_cache
+    cache.clear()
+    monkeypatch.setattr(cache, "store", store)
+    data = mixed_inventory_request().model_dump()
+
+    assert client.post(f"/optimization/per-plant?zone_id={zone_id + 1}", json=data).status_code == 404
+    assert client.post(f"/optimization/per-plant?zone_id={zone_id}", json=data).status_code == 200
+
+    with Session(store.engine) as session:
+        assert len(OptimizationResultRepository(session).list_by_zone(zone_id)) == 1
+
+
+def test_failing_store_does_not_fail_the_optimization():
+    class BrokenStore:
+        def get(self, key):
+            raise RuntimeError("database is locked")
+
+        def put(self, key, response, run_seconds):
+            raise RuntimeError("database is locked")
+
+    cache = ResultCache(store=BrokenStore())
+    result = PerPlantOptimizer(mixed_inventory_request(), result_cache=cache).optimize()
+
+    assert result.proven_optimal
+    assert cache.stats()["store_errors"] == 2
+    assert cache.stats()["size"] == 1
@@ -0,0 +1,85 @@
+from pytest import fixture
+
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.engines import OptimizationEngine, create_optimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, SearchStrategy
+from app.optimization.sweep_line_optimizer import SweepLineOptimizer
+
+
+@fixture
+def unlimited_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": f"p{i}", "target_volume_liters": 5 + 3 * i, "tolerance_percent": 10 + i, "max_emitter_quantity": 6}
+            for i in range(5)
+        ],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1.2, "count": None},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": None},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+        ]
+    )
+
+
+@fixture
+def limited_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "p1", "target_volume_liters": 8, "tolerance_percent": 10, "max_emitter_quantity": 4},
+            {"plant_id": "p2", "target_volume_liters": 12, "tolerance_percent": 15, "max_emitter_quantity": 4},
+            {"plant_id": "p3", "target_volume_liters": 5, "tolerance_percent": 20, "max_emitter_quantity": 3}
+        ],
+        available_drippers=[
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 1}
+        ]
+    )
+
+
+def test_create_optimizer_selects_engine(unlimited_request):
+    assert isinstance(create_optimizer(unlimited_request, OptimizationEngine.SWEEP_LINE), SweepLineOptimizer)
+    assert type(create_optimizer(unlimited_request)) is PerPlantOptimizer
+
+
+def test_sweep_line_matches_brute_force_without_inventory_limits(unlimited_request):
+    small_request = unlimited_request.model_copy(update={"plants": unlimited_request.plants[:3]})
+
+    brute_force = PerPlantOptimizer(small_request, strategy=SearchStrategy.BRUTE_FORCE).optimize()
+    sweep = SweepLineOptimizer(small_request).optimize()
+
+    assert sweep.total_drippers_used == brute_force.total_drippers_used
+    assert sweep.base_irrigation_time_seconds == brute_force.base_irrigation_time_seconds
+
+
+def test_sweep_line_matches_branch_and_bound_without_inventory_limits(unlimited_request):
+    branch_and_bound = PerPlantOptimizer(unlimited_request).optimize()
+    sweep = SweepLineOptimizer(unlimited_request).optimize()
+
+    assert sweep.total_drippers_used == branch_and_bound.total_drippers_used
+    assert sweep.base_irrigation_time_seconds == branch_and_bound.base_irrigation_time_seconds
+
+
+def test_sweep_line_repairs_inventory(limited_request):
+    exact = PerPlantOptimizer(limited_request, strategy=SearchStrategy.BRUTE_FORCE).optimize()
+    sweep = SweepLineOptimizer(limited_request).optimize()
+
+    used = {d.dripper_id: d.count for d in sweep.drippers_used_detail}
+    assert used.get("d4", 0) <= 2
+    assert used.get("d8", 0) <= 1
+
+    # Repair is greedy, it can only be as good as the exact search
+    assert (sweep.total_drippers_used, sweep.base_irrigation_time_seconds) >= \
+        (exact.total_drippers_used, exact.base_irrigation_time_seconds)
+
+    for plant, request_plant in zip(sweep.plants, limited_request.plants):
+        tolerance = request_plant.target_volume_liters * request_plant.tolerance_percent / 100
+        assert request_plant.target_volume_liters - tolerance - 0.01 <= plant.actual_volume_liters
+        assert plant.actual_volume_liters <= request_plant.target_volume_liters + tolerance + 0.01
+
+
+def test_sweep_line_handles_empty_zone():
+    request = PerPlantOptimizationRequest(plants=[], available_drippers=[{"dripper_id": "d2", "flow_rate_lph": 2, "count": None}])
+
+    assert SweepLineOptimizer(request).optimize() == PerPlantOptimizer(request).optimize()
@@ -0,0 +1,61 @@
+from app.optimization.per_plant_optimizer import PerPlantOptimizer, SearchStrategy
+from app.optimization.top_k import TopKOptimizer
+from app.tests.helpers import feasible_objectives, hedge_row_request, mixed_inventory_request
+
+
+def _brute_force_objectives(request):
+    """
+    Sorted (emitters, T in seconds) of every feasible combination of candidates.
+    """
+    return [(emitters, round(T * 3600, 2)) for emitters, T in sorted(feasible_objectives(request))]
+
+
+def _objectives(response):
+    return [(a.total_drippers_used, a.base_irrigation_time_seconds) for a in response.alternatives]
+
+
+def test_top_k_matches_brute_force():
+    request = mixed_inventory_request()
+
+    top = TopKOptimizer(request, k=6).optimize_top_k()
+
+    assert top.complete
+    assert _objectives(top) == _brute_force_objectives(request)[:6]
+
+    # Distinct allocations, each one with its own summary
+    allocations = [
+        tuple(tuple((d.dripper_id, d.count) for d in plant.assigned_drippers) for plant in alternative.plants)
+        for alternative in top.alternatives
+    ]
+    assert len(set(allocations)) == len(allocations)
+    for alternative in top.alternatives:
+        assert sum(d.count for d in alternative.drippers_used_detail) == alternative.total_drippers_used
+
+
+def test_best_alternative_is_the_native_result():
+    for request in (mixed_inventory_request(), hedge_row_request(6)):
+        top = TopKOptimizer(request, k=4).optimize_top_k()
+        native = PerPlantOptimizer(request, warm_start=False).optimize()
+
+        assert top.alternatives[0] == native
+        assert len(top.alternatives) == 4
+
+
+def test_top_k_prunes_against_the_kth_best():
+    request = mixed_inventory_request()
+
+    brute_force = TopKOptimizer(request, k=3, strategy=SearchStrategy.BRUTE_FORCE, include_diagnostics=True).optimize_top_k()
+    branch_and_bound = TopKOptimizer(request, k=3, include_diagnostics=True).optimize_top_k()
+
+    assert _objectives(branch_and_bound) == _objectives(brute_force)
+    assert branch_and_bound.diagnostics.nodes_visited < brute_force.diagnostics.nodes_visited
+
+
+def test_top_k_endpoint(client):
+    request = mixed_inventory_request()
+
+    response = client.post("/optimization/per-plant/top-k?k=2", json=request.model_dump())
+
+    assert response.status_code == 200
+    assert [(a["total_drippers_used"], a["base_irrigation_time_seconds"]) for a in response.json()["alternatives"]] == _brute_force_objectives(request)[:2]
+    assert client.post("/optimization/per-plant/top-k?k=0", json=request.model_dump()).status_code == 422
@@ -0,0 +1,54 @@
+import pytest
+
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+
+np = pytest.importorskip("numpy")
+
+from app.optimization.vectorized_candidates import generate_candidates_vectorized  # noqa: E402
+
+
+@pytest.fixture
+def wide_catalog_request():
+    return PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "small", "target_volume_liters": 6, "tolerance_percent": 10, "max_emitter_quantity": 6},
+            {"plant_id": "large", "target_volume_liters": 40, "tolerance_percent": 15, "max_emitter_quantity": 8}
+        ],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1, "count": None},
+            {"dripper_id": "d1_6", "flow_rate_lph": 1.6, "count": 2},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": 3},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+        ]
+    )
+
+
+def _plant_bounds(plant):
+    min_volume, max_volume = PerPlantOptimizer._volume_window(plant)
+    return min_volume, max_volume, PerPlantOptimizer._min_flow(min_volume)
+
+
+def test_vectorized_rows_match_recursive_generation(wide_catalog_request):
+    optimizer = PerPlantOptimizer(wide_catalog_request, candidate_cache=None, vectorized_generation=False)
+
+    for plant in wide_catalog_request.plants:
+        recursive = optimizer._generate_candidates_for_plant(plant)
+        vectorized = generate_candidates_vectorized(optimizer, plant, *_plant_bounds(plant), merge_equivalent=False)
+
+        assert vectorized == recursive
+
+
+def test_vectorized_generation_reduces_to_same_candidates(wide_catalog_request):
+    recursive = PerPlantOptimizer(wide_catalog_request, candidate_cache=None, vectorized_generation=False)
+    vectorized = PerPlantOptimizer(wide_catalog_request, candidate_cache=None, vectorized_generation=True)
+
+    for plant in wide_catalog_request.plants:
+        merged = vectorized._generate_candidates_for_plant(plant)
+        full = recursive._generate_candidates_for_plant(plant)
+
+        assert len(merged) < len(full)
+        assert vectorized._reduce_candidates(merged) == recursive._reduce_candidates(full)
+
+    assert vectorized.optimize() == recursive.optimize()
@@ -0,0 +1,70 @@
+"""
+Compare a 40-zone batch on the process pool with optimizing the zones one by one.
+
+Run from the backend directory:
+
+    python -m benchmarks.batch_optimization [workers]
+"""
+import os
+import sys
+from time import perf_counter
+
+from app.optimization.batch import BatchOptimizer
+from app.optimization.candidate_cache import candidate_cache
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+from app.schemas.optimization import BatchOptimizationItem
+
+
+def node_zones(zone_count=40):
+    # Zones of one node share the dripper catalog, some plant sizes repeat across zones
+    return [
+        BatchOptimizationItem(
+            zone_id=f"zone_{zone}",
+            plants=[
+                {
+                    "plant_id": f"zone_{zone}_plant_{i}",
+                    "target_volume_liters": 4 + (zone * 7 + i * 3) % 17,
+                    "tolerance_percent": 10,
+                    "max_emitter_quantity": 6
+                }
+                for i in range(2 + zone % 4)
+            ],
+            available_drippers=[
+                {"dripper_id": "d1", "flow_rate_lph": 1.1, "count": None},
+                {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+                {"dripper_id": "d4", "flow_rate_lph": 4, "count": 3},
+                {"dripper_id": "d8", "flow_rate_lph": 8, "count": None}
+            ]
+        )
+        for zone in range(zone_count)
+    ]
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    items = node_zones()
+
+    candidate_cache.clear()
+    slowest = 0.0
+    start = perf_counter()
+    for item in items:
+        zone_start = perf_counter()
+        PerPlantOptimizer(item).optimize()
+        slowest = max(slowest, perf_counter() - zone_start)
+    sequential_time = perf_counter() - start
+
+    candidate_cache.clear()
+    optimizer = BatchOptimizer(workers=workers)
+    start = perf_counter()
+    response = optimizer.optimize(items)
+    batch_time = perf_counter() - start
+    optimizer.shutdown()
+
+    print(f"cpu count: {os.cpu_count()}, workers: {workers}, zones: {len(items)}, failed: {response.failed}")
+    print(f"one by one:   {sequential_time:.2f}s")
+    print(f"batch:        {batch_time:.2f}s")
+    print(f"slowest zone: {slowest:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
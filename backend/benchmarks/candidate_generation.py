@@ -0,0 +1,87 @@
+"""
+Compare recursive and NumPy candidate generation (including candidate reduction,
+which is what every optimizer run pays per distinct plant).
+
+Run from the backend directory:
+
+    python -m benchmarks.candidate_generation
+"""
+from time import perf_counter
+
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+
+
+# Same plant/dripper setup as the optimizer test fixtures
+FIXTURES = {
+    "fixture: 1 plant, 2 drippers": PerPlantOptimizationRequest(
+        plants=[{"plant_id": "plant_1", "target_volume_liters": 10, "tolerance_percent": 10, "max_emitter_quantity": 5}],
+        available_drippers=[
+            {"dripper_id": "dripper_a", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "dripper_b", "flow_rate_lph": 5, "count": None}
+        ]
+    ),
+    "fixture: 2 plants, 2 drippers": PerPlantOptimizationRequest(
+        plants=[
+            {"plant_id": "plant_1", "target_volume_liters": 10, "tolerance_percent": 10, "max_emitter_quantity": 5},
+            {"plant_id": "plant_2", "target_volume_liters": 20, "tolerance_percent": 20, "max_emitter_quantity": 10}
+        ],
+        available_drippers=[
+            {"dripper_id": "dripper_a", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "dripper_b", "flow_rate_lph": 5, "count": None}
+        ]
+    ),
+}
+
+FLOW_RATES = [0.5, 1, 1.6, 2, 3, 4, 6, 8, 12, 16]
+
+
+def synthetic_request(dripper_types, max_emitter_quantity):
+    return PerPlantOptimizationRequest(
+        plants=[{
+            "plant_id": "plant_1",
+            "target_volume_liters": 30,
+            "tolerance_percent": 10,
+            "max_emitter_quantity": max_emitter_quantity
+        }],
+        available_drippers=[
+            {"dripper_id": f"d{i}", "flow_rate_lph": FLOW_RATES[i], "count": 3 if i % 3 == 2 else None}
+            for i in range(dripper_types)
+        ]
+    )
+
+
+def time_generation(request, vectorized, repeat=3):
+    optimizer = PerPlantOptimizer(request, candidate_cache=None, vectorized_generation=vectorized)
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        candidates = [
+            optimizer._reduce_candidates(optimizer._generate_candidates_for_plant(plant))
+            for plant in request.plants
+        ]
+        best = min(best, perf_counter() - start)
+    return best, candidates
+
+
+def main():
+    cases = dict(FIXTURES)
+    for dripper_types, max_emitter_quantity in ((4, 8), (6, 8), (6, 12), (8, 10), (10, 8)):
+        cases[f"synthetic: {dripper_types} drippers, max {max_emitter_quantity} emitters"] = \
+            synthetic_request(dripper_types, max_emitter_quantity)
+
+    print(f"{'case':<42} {'generated':>10} {'kept':>6} {'recursive':>11} {'numpy':>11} {'speed-up':>9}")
+    for name, request in cases.items():
+        recursive_time, recursive = time_generation(request, vectorized=False)
+        numpy_time, vectorized = time_generation(request, vectorized=True)
+        assert recursive == vectorized, name
+
+        optimizer = PerPlantOptimizer(request, candidate_cache=None, vectorized_generation=False)
+        generated = sum(len(optimizer._generate_candidates_for_plant(plant)) for plant in request.plants)
+        kept = sum(len(c) for c in recursive)
+        print(f"{name:<42} {generated:>10} {kept:>6} {recursive_time * 1000:>9.1f}ms {numpy_time * 1000:>9.1f}ms "
+              f"{recursive_time / numpy_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measure the speed-up of the parallel search engine against the worker count.
+
+Run from the backend directory:
+
+    python -m benchmarks.parallel_search [max_workers]
+"""
+import os
+import sys
+from time import perf_counter
+
+from app.schemas.optimization import PerPlantOptimizationRequest
+from app.optimization.candidate_cache import CandidateCache
+from app.optimization.parallel_optimizer import ParallelOptimizer
+from app.optimization.per_plant_optimizer import PerPlantOptimizer
+
+
+def heavy_zone_request(plant_count=5):
+    # Distinct plants with two limited dripper types, a few seconds of sequential search
+    return PerPlantOptimizationRequest(
+        plants=[
+            {
+                "plant_id": f"plant_{i}",
+                "target_volume_liters": 8 + i * 3.1,
+                "tolerance_percent": 6 + i % 3,
+                "max_emitter_quantity": 7
+            }
+            for i in range(plant_count)
+        ],
+        available_drippers=[
+            {"dripper_id": "d1", "flow_rate_lph": 1.1, "count": None},
+            {"dripper_id": "d2", "flow_rate_lph": 2, "count": None},
+            {"dripper_id": "d3", "flow_rate_lph": 3.3, "count": None},
+            {"dripper_id": "d4", "flow_rate_lph": 4, "count": plant_count // 2},
+            {"dripper_id": "d8", "flow_rate_lph": 8, "count": 2}
+        ]
+    )
+
+
+def timed(optimizer):
+    start = perf_counter()
+    result = optimizer.optimize()
+    return perf_counter() - start, result
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    request = heavy_zone_request()
+
+    # Warm candidate cache, so only the search is measured
+    cache = CandidateCache()
+    sequential_time, expected = timed(PerPlantOptimizer(request, candidate_cache=cache))
+    sequential_time, expected = timed(PerPlantOptimizer(request, candidate_cache=cache))
+
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'workers':>7} {'time':>9} {'speed-up':>9}")
+    print(f"{'seq':>7} {sequential_time:>8.2f}s {1:>8.2f}x")
+
+    workers = 1
+    while workers <= max_workers:
+        parallel_time, result = timed(ParallelOptimizer(request, workers=workers, candidate_cache=cache))
+        assert result == expected
+        print(f"{workers:>7} {parallel_time:>8.2f}s {sequential_time / parallel_time:>8.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()